@@ -0,0 +1,237 @@
+"""Local stand-ins for the external services used by the pipeline.
+
+Each service is a small aiohttp application with configurable latency and
+error rate: the Hacker News Firebase API, article hosts serving real-sized
+HTML, an OpenAI-compatible chat completions endpoint and the subset of the
+Notion API used by NotionPublisher.
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict
+
+from aiohttp import web
+
+COMMENTS_PER_STORY = 20
+REPLIES_PER_COMMENT = 3
+COMMENT_ID_OFFSET = 10_000_000
+
+_WORDS = (
+    "the of and to in is that for it as with was on be by this are from at or an have not "
+    "they which one you were all we can her has there been if more when will would who so no "
+    "system data model network latency memory kernel compiler database protocol release "
+    "performance security research open source hardware software cloud browser"
+).split()
+
+
+@dataclass
+class ServiceConfig:
+    """Simulated behaviour of one service: mean latency in seconds, error rate in [0, 1]
+    and, if non-zero, the number of concurrent requests it serves before answering 429."""
+    latency: float = 0.0
+    error_rate: float = 0.0
+    capacity: int = 0
+
+
+async def _simulate(config: ServiceConfig, error_status: int = 503) -> None:
+    """Sleep for a jittered latency and randomly fail with `error_status`."""
+    if config.latency:
+        await asyncio.sleep(random.uniform(0.5, 1.5) * config.latency)
+    if config.error_rate and random.random() < config.error_rate:
+        raise _error(error_status)
+
+
+def _error(status: int) -> web.HTTPException:
+    error = web.HTTPException(headers={"Retry-After": "0.1"})
+    error.set_status(status)
+    return error
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(_WORDS) for _ in range(rng.randint(8, 25))]
+    return " ".join(words).capitalize() + "."
+
+
+def make_article_html(story_id: int, paragraphs: int) -> str:
+    """Build a deterministic article page with navigation and footer boilerplate."""
+    rng = random.Random(story_id)
+    nav = "".join(f'<li><a href="/section/{i}">Section {i}</a></li>' for i in range(40))
+    body = "".join(
+        "<p>" + " ".join(_sentence(rng) for _ in range(rng.randint(3, 7))) + "</p>" for _ in range(paragraphs)
+    )
+    footer = "".join(f'<a href="/legal/{i}">Legal link {i}</a>' for i in range(30))
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\">"
+        f"<title>Benchmark article {story_id}</title>"
+        "<script>" + "var x = 1;" * 2000 + "</script></head><body>"
+        f"<nav><ul>{nav}</ul></nav><main><article class='post-body'>"
+        f"<h1>Benchmark article {story_id}</h1>{body}</article></main>"
+        f"<footer>{footer}</footer></body></html>"
+    )
+
+
+def build_hn_app(config: ServiceConfig, story_count: int, article_base_url: str) -> web.Application:
+    """Hacker News Firebase API: topstories.json and item/{id}.json."""
+
+    async def top_stories(request: web.Request) -> web.Response:
+        await _simulate(config)
+        return web.json_response(list(range(1, story_count + 1)))
+
+    async def item(request: web.Request) -> web.Response:
+        await _simulate(config)
+        item_id = int(request.match_info["item_id"])
+        now = int(time.time())
+        if item_id < COMMENT_ID_OFFSET:
+            first_comment = COMMENT_ID_OFFSET + item_id * 1000
+            return web.json_response({
+                "id": item_id,
+                "type": "story",
+                "by": "bench",
+                "time": now - 3600,
+                "title": f"Benchmark story {item_id}",
+                "url": f"{article_base_url}/article/{item_id}",
+                "kids": [first_comment + k * 10 for k in range(COMMENTS_PER_STORY)],
+                "score": 100,
+            })
+        is_reply = item_id % 10 != 0
+        kids = [] if is_reply else [item_id + r for r in range(1, REPLIES_PER_COMMENT + 1)]
+        return web.json_response({
+            "id": item_id,
+            "type": "comment",
+            "by": "bench",
+            "time": now - 1800,
+            "text": _sentence(random.Random(item_id)) * 3,
+            "kids": kids,
+        })
+
+    app = web.Application()
+    app.router.add_get("/v0/topstories.json", top_stories)
+    app.router.add_get("/v0/item/{item_id}.json", item)
+    return app
+
+
+def build_article_app(config: ServiceConfig, paragraphs: int) -> web.Application:
+    """Article host serving real-sized HTML pages."""
+    cache: Dict[int, bytes] = {}
+
+    async def article(request: web.Request) -> web.Response:
+        await _simulate(config)
+        story_id = int(request.match_info["story_id"])
+        if story_id not in cache:
+            cache[story_id] = make_article_html(story_id, paragraphs).encode()
+        return web.Response(body=cache[story_id], content_type="text/html", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/article/{story_id}", article)
+    return app
+
+
+def build_llm_app(config: ServiceConfig) -> web.Application:
+    """OpenAI-compatible /v1/chat/completions endpoint."""
+    in_flight = 0
+
+    async def chat_completions(request: web.Request) -> web.StreamResponse:
+        nonlocal in_flight
+        if config.capacity and in_flight >= config.capacity:
+            raise _error(429)
+        in_flight += 1
+        try:
+            return await _complete(request)
+        finally:
+            in_flight -= 1
+
+    async def _complete(request: web.Request) -> web.StreamResponse:
+        await _simulate(config, error_status=random.choice([429, 500]))
+        payload = await request.json()
+        prompt_tokens = sum(len(message.get("content", "")) for message in payload.get("messages", [])) // 4
+        content = "Benchmark summary. " * 20
+        if payload.get("response_format"):
+            content = json.dumps({
+                "summary": content,
+                "comment_summary": "Benchmark comment summary.",
+                "keywords": ["benchmark"],
+                "category": {"primary": "Technology"},
+                "sentiment": {"label": "neutral", "score": 0.0},
+            })
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": prompt_tokens + len(content) // 4,
+        }
+        if payload.get("stream"):
+            return await _stream_completion(request, payload.get("model"), content, usage)
+        return web.json_response({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post("/v1/chat/completions", chat_completions)
+    return app
+
+
+async def _stream_completion(request: web.Request, model: str, content: str, usage: dict) -> web.StreamResponse:
+    """Send a completion as server-sent events in a few chunks, followed by a usage chunk."""
+    response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+    await response.prepare(request)
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+    step = max(1, len(content) // 5)
+    pieces = [content[i:i + step] for i in range(0, len(content), step)]
+    for index, piece in enumerate(pieces):
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "delta": {"role": "assistant", "content": piece} if index == 0 else {"content": piece},
+                "finish_reason": "stop" if index == len(pieces) - 1 else None,
+            }],
+        }
+        await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+    final = {
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [],
+        "usage": usage,
+    }
+    await response.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode())
+    await response.write_eof()
+    return response
+
+
+def build_notion_app(config: ServiceConfig) -> web.Application:
+    """The subset of the Notion API used by NotionPublisher."""
+
+    async def handle(request: web.Request) -> web.Response:
+        await _simulate(config, error_status=429)
+        if request.method in ("POST", "PATCH"):
+            await request.read()
+        path = request.path
+        if path.startswith("/v1/databases/"):
+            return web.json_response({
+                "object": "database",
+                "id": request.match_info["tail"],
+                "data_sources": [{"id": "bench-data-source", "name": "Benchmark"}],
+            })
+        if path.endswith("/query") or path.endswith("/children"):
+            return web.json_response({"object": "list", "results": [], "has_more": False, "next_cursor": None})
+        return web.json_response({"object": "page" if "pages" in path else "block", "id": str(uuid.uuid4())})
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_route("*", "/v1/{tail:.*}", handle)
+    return app
@@ -0,0 +1,257 @@
+"""End-to-end benchmark of the digest pipeline against local mock services.
+
+The mock Hacker News API, article hosts, LLM endpoint and Notion API run in
+this process; every batch size is run by a fresh worker subprocess that
+points the real Orchestrator at them. Reports stories/minute, per-stage
+p50/p95 latency and peak RSS per batch size.
+
+Usage:
+    python -m benchmarks.pipeline_benchmark --sizes 10 100 1000 --llm-latency 1.5 --json bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the digest pipeline against local mock services.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000], help="Batch sizes (TOP_N_NEWS) to run.")
+    parser.add_argument("--hn-latency", type=float, default=0.02, help="Mean Hacker News API latency in seconds.")
+    parser.add_argument("--article-latency", type=float, default=0.2, help="Mean article download latency in seconds.")
+    parser.add_argument("--llm-latency", type=float, default=1.0, help="Mean LLM completion latency in seconds.")
+    parser.add_argument(
+        "--llm-capacity", type=int, default=0, help="Concurrent LLM requests served before answering 429 (0: no limit)."
+    )
+    parser.add_argument("--notion-latency", type=float, default=0.1, help="Mean Notion API latency in seconds.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests each service fails.")
+    parser.add_argument("--paragraphs", type=int, default=60, help="Paragraphs per mock article (~80KB HTML at 60).")
+    parser.add_argument("--json", dest="json_path", help="Also write the results to this JSON file.")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+class MockServices:
+    """Runs the mock services on ephemeral localhost ports in a background event loop."""
+
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.urls: Dict[str, str] = {}
+        self._loop = asyncio.new_event_loop()
+        self._runners: List[web.AppRunner] = []
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+
+    def start(self) -> Dict[str, str]:
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self.urls
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _serve(self, app: web.Application) -> str:
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        self._runners.append(runner)
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def _start(self):
+        from benchmarks.mock_services import (
+            ServiceConfig,
+            build_article_app,
+            build_hn_app,
+            build_llm_app,
+            build_notion_app,
+        )
+
+        args = self.args
+        self.urls["article"] = await self._serve(
+            build_article_app(ServiceConfig(args.article_latency, args.error_rate), args.paragraphs)
+        )
+        self.urls["hn"] = await self._serve(
+            build_hn_app(ServiceConfig(args.hn_latency, args.error_rate), max(args.sizes), self.urls["article"])
+        )
+        self.urls["llm"] = await self._serve(build_llm_app(ServiceConfig(args.llm_latency, args.error_rate, args.llm_capacity)))
+        self.urls["notion"] = await self._serve(build_notion_app(ServiceConfig(args.notion_latency, args.error_rate)))
+
+    async def _stop(self):
+        for runner in self._runners:
+            await runner.cleanup()
+
+
+def worker_env(urls: Dict[str, str], size: int, workdir: str) -> Dict[str, str]:
+    """Environment for a worker run: dummy credentials, mock base URLs and no local caches."""
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key.upper() not in ("ALL_PROXY", "HTTP_PROXY", "HTTPS_PROXY", "SOCKS_PROXY", "PROXY_URL")
+    }
+    env.update({
+        "PYTHONPATH": REPO_ROOT + os.pathsep + env.get("PYTHONPATH", ""),
+        "LLM_API_KEY": "benchmark",
+        "LLM_BASE_URL": f"{urls['llm']}/v1",
+        "NOTION_TOKEN": "benchmark",
+        "NOTION_DATABASE_ID": "benchmark-database",
+        "TEST_NOTION_DATABASE_ID": "benchmark-database",
+        "NOTION_BASE_URL": urls["notion"],
+        "NOTION_RATE_LIMIT": "1000",
+        "TELEGRAM_BOT_TOKEN": "123456:benchmark",
+        "TELEGRAM_CHAT_ID": "0",
+        "HN_API_BASE_URL": f"{urls['hn']}/v0",
+        "HTTP_HOST_RATE": "100000",
+        "HTTP_HOST_BURST": "100000",
+        "HTTP_HOST_CONCURRENCY": "256",
+        "TOP_N_NEWS": str(size),
+        "DEDUP_ENABLED": "False",
+        "LLM_CACHE_ENABLED": "False",
+        "HTTP_CACHE_ENABLED": "False",
+        "CHECKPOINT_PATH": os.path.join(workdir, "checkpoints.sqlite3"),
+        "NEAR_DUPLICATE_INDEX_PATH": os.path.join(workdir, "near_duplicates.sqlite3"),
+        "ARCHIVE_DIR": os.path.join(workdir, "archive"),
+        "MEMORY_SPOOL_DIR": os.path.join(workdir, "spool"),
+        "EXTRACTION_PROFILES_PATH": os.path.join(workdir, "extraction_profiles.sqlite3"),
+        "METRICS_JSON_PATH": os.path.join(workdir, "run_report.json"),
+        "LOG_LEVEL": "WARNING",
+        "TEST_MODE": "False",
+    })
+    return env
+
+
+async def run_worker() -> Dict[str, Any]:
+    """Run one Orchestrator pass in this process and return its measurements."""
+    import aiohttp
+
+    from main import Orchestrator
+    from data_acquisition.web_scraper import WebScraper
+    from notification.base import Notifier
+    from utils.metrics import (
+        LLM_CONCURRENCY_LIMIT,
+        LLM_REQUESTS,
+        STAGE_DURATION,
+        STAGE_ITEMS,
+        STAGE_PEAK_RSS,
+        percentile,
+    )
+
+    class NullNotifier(Notifier):
+        async def send_notification(self, message: str, status: str) -> bool:
+            return True
+
+    async with aiohttp.ClientSession() as session:
+        orchestrator = Orchestrator(session=session)
+        orchestrator.notifier = NullNotifier()
+        stage_names = [stage.name for stage in orchestrator.stages()]
+        start = time.perf_counter()
+        try:
+            await orchestrator.run()
+        finally:
+            WebScraper.shutdown()
+        duration = time.perf_counter() - start
+
+    published = STAGE_ITEMS.value(stage="publish", outcome="passed")
+    stages = {}
+    for stage in stage_names:
+        samples = STAGE_DURATION.samples(stage=stage)
+        stages[stage] = {
+            "count": len(samples),
+            "p50": percentile(samples, 0.5),
+            "p95": percentile(samples, 0.95),
+            "peak_rss_mb": STAGE_PEAK_RSS.value(stage=stage) / 2**20,
+        }
+    return {
+        "duration_seconds": duration,
+        "published": published,
+        "stories_per_minute": published / duration * 60 if duration else 0.0,
+        "stages": stages,
+        "llm_requests": LLM_REQUESTS.total(),
+        "llm_concurrency_limit": LLM_CONCURRENCY_LIMIT.value(),
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_size(urls: Dict[str, str], size: int) -> Dict[str, Any]:
+    """Run a batch size in a fresh subprocess so memory and metrics start from zero."""
+    with tempfile.TemporaryDirectory(prefix="digest-bench-") as workdir:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.pipeline_benchmark", "--worker", str(size)],
+            cwd=workdir,
+            env=worker_env(urls, size, workdir),
+            capture_output=True,
+            text=True,
+        )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark worker for {size} stories failed:\n{completed.stderr}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["stories"] = size
+    return result
+
+
+def format_table(results: List[Dict[str, Any]]) -> str:
+    def ms(value):
+        return f"{value * 1000:.0f}" if value is not None else "-"
+
+    # Every run goes through the same stages, in pipeline order
+    stage_names = list(results[0]["stages"]) if results else []
+    header = ["stories", "published", "seconds", "stories/min"]
+    header += [f"{stage} p50/p95 ms" for stage in stage_names]
+    header += ["LLM calls", "LLM limit", "peak RSS MB"]
+    rows = [header]
+    for result in results:
+        row = [
+            str(result["stories"]),
+            f"{result['published']:.0f}",
+            f"{result['duration_seconds']:.1f}",
+            f"{result['stories_per_minute']:.1f}",
+        ]
+        row += [f"{ms(result['stages'][stage]['p50'])}/{ms(result['stages'][stage]['p95'])}" for stage in stage_names]
+        row += [
+            f"{result['llm_requests']:.0f}",
+            f"{result['llm_concurrency_limit']:.0f}",
+            f"{result['peak_rss_mb']:.0f}",
+        ]
+        rows.append(row)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    return "\n".join("  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in rows)
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        print(json.dumps(asyncio.run(run_worker())))
+        return
+
+    services = MockServices(args)
+    urls = services.start()
+    results = []
+    try:
+        for size in args.sizes:
+            print(f"Running {size} stories...", file=sys.stderr)
+            results.append(run_size(urls, size))
+    finally:
+        services.stop()
+
+    print(format_table(results))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
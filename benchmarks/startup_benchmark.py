@@ -0,0 +1,87 @@
+"""Startup-time benchmark based on `python -X importtime`.
+
+Imports a module (`main` by default) in fresh interpreters, reports the
+median cumulative import time, the slowest top-level imports and whether
+any of the heavy client libraries were loaded.
+
+Usage:
+    python -m benchmarks.startup_benchmark --repeat 5 --top 15
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("openai", "notion_client", "telegram", "trafilatura", "aiohttp")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Measure the import time of the digest entry point.")
+    parser.add_argument("--module", default="main", help="Module to import.")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of fresh interpreters to average over.")
+    parser.add_argument("--top", type=int, default=10, help="Number of slowest top-level imports to list.")
+    return parser.parse_args()
+
+
+def import_times(module: str) -> Dict[str, Tuple[int, int]]:
+    """Import `module` in a fresh interpreter and return {module: (self_us, cumulative_us)}."""
+    env = dict(os.environ)
+    env.setdefault("LLM_API_KEY", "benchmark")
+    env.setdefault("NOTION_TOKEN", "benchmark")
+    env.setdefault("NOTION_DATABASE_ID", "benchmark")
+    env.setdefault("TEST_NOTION_DATABASE_ID", "benchmark")
+    env.setdefault("TELEGRAM_BOT_TOKEN", "benchmark")
+    env.setdefault("TELEGRAM_CHAT_ID", "0")
+    env["LOG_FILE"] = os.devnull
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{completed.stderr}")
+
+    times: Dict[str, Tuple[int, int]] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header line
+        # Nesting is kept as indentation: " main", "   main's imports", ...
+        times[name.rstrip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def main():
+    args = parse_args()
+    runs = [import_times(args.module) for _ in range(args.repeat)]
+    totals = [run[f" {args.module}"][1] for run in runs]
+    last = runs[-1]
+
+    print(f"import {args.module}: median {statistics.median(totals) / 1000:.1f} ms "
+          f"(min {min(totals) / 1000:.1f}, max {max(totals) / 1000:.1f}, {args.repeat} runs)")
+
+    direct: List[Tuple[str, int]] = sorted(
+        ((name.strip(), cumulative) for name, (_, cumulative) in last.items()
+         if name.startswith("   ") and not name.startswith("    ")),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    print(f"\nSlowest direct imports of {args.module} (last run):")
+    for name, cumulative in direct[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    loaded = {name.strip() for name in last}
+    print("\nHeavy client libraries:")
+    for module in HEAVY_MODULES:
+        print(f"  {module:<14} {'loaded' if module in loaded else 'not loaded'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,14 @@
 LLM_MODELS = {
     "summarize_content": "gemini-2.5-pro",
-    "summarize_comments": "gemini-2.5-flash"
+    "summarize_comments": "gemini-2.5-flash",
+    "analyze_story": "gemini-2.5-pro",
+}
+
+# USD per million tokens, used for cost accounting in the run report
+LLM_MODEL_PRICES = {
+    "gemini-2.5-pro": {"prompt": 1.25, "completion": 10.0},
+    "gemini-2.5-flash": {"prompt": 0.30, "completion": 2.50},
+    "gemini-2.5-flash-lite": {"prompt": 0.10, "completion": 0.40},
 }
 
 LLM_SETTINGS = {
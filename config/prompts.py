@@ -1,5 +1,16 @@
 PROMPTS = {
     "summarize_content": "Please summarize the following news article: {content}",
+    "summarize_chunk": "Please summarize part {index} of {total} of the following news article: {content}",
+    "merge_summaries": "The following are summaries of consecutive parts of one news article. "
+                       "Combine them into a single coherent summary of the article: {content}",
     "summarize_comments": "Please summarize the key points from these comments: {content}",
+    "analyze_story": "Analyze the following news article and its reader comments. Respond with a JSON object "
+                     "matching the given schema: `summary` summarizes the article, `comment_summary` summarizes "
+                     "the key points of the comments (null if there are none), `keywords` lists 3-8 keywords, "
+                     "`category` gives a primary and optional secondary topics, `sentiment` gives a label "
+                     "(positive, neutral or negative) and a score from -1 to 1, `key_entities` lists the persons, "
+                     "organizations and locations mentioned, and `factual_claims` lists the main claims with a "
+                     "verification_status of verified, unverified or disputed.\n\n"
+                     "Article:\n{content}\n\nComments:\n{comments}",
     "system_message": "You are a helpful assistant."
 }
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -10,20 +10,189 @@ class Settings(BaseSettings):
     LLM_API_KEY: str
     LLM_TIMEOUT: Optional[int] = 15 # Default to 60 seconds
 
+    NOTION_BASE_URL: str = "https://api.notion.com"
     NOTION_TOKEN: str
     NOTION_DATABASE_ID: str
     TEST_NOTION_DATABASE_ID: str
+    NOTION_RATE_LIMIT: float = 3.0  # Requests per second across all publishes
+    NOTION_MAX_RETRIES: int = 5
 
     TELEGRAM_BOT_TOKEN: str
     TELEGRAM_CHAT_ID: str
 
     PROXY_URL: Optional[str] = None
 
+    # Shared HTTP client: per-host token bucket and concurrency, retries and circuit breaker
+    HTTP_HOST_RATE: float = 10.0  # Requests per second
+    HTTP_HOST_BURST: float = 20.0
+    HTTP_HOST_CONCURRENCY: int = 8
+    HTTP_HOST_LIMITS: Dict[str, Dict[str, float]] = {
+        "hacker-news.firebaseio.com": {"rate": 50, "burst": 100, "concurrency": 32},
+    }
+    HTTP_MAX_RETRIES: int = 3
+    HTTP_BACKOFF_BASE: float = 0.5
+    HTTP_BACKOFF_MAX: float = 30.0
+    HTTP_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    HTTP_CIRCUIT_RESET_TIMEOUT: float = 60.0
+
     LOG_LEVEL: str = "DEBUG"
+    # Log file written by the background logging thread; LOG_JSON switches it to JSON lines
+    LOG_FILE: str = "app.log"
+    LOG_FILE_LEVEL: str = "DEBUG"
+    LOG_JSON: bool = False
+    # Max DEBUG records per call site and window (seconds); 0 disables sampling
+    LOG_DEBUG_RATE_LIMIT: int = 20
+    LOG_DEBUG_RATE_WINDOW: float = 1.0
+
+    # Run metrics: Prometheus textfile (for node_exporter) and/or JSON run report
+    METRICS_TEXTFILE_PATH: Optional[str] = None
+    METRICS_JSON_PATH: Optional[str] = "data/run_report.json"
 
+    HN_API_BASE_URL: str = "https://hacker-news.firebaseio.com/v0"
     TOP_N_NEWS: int = 10
     TOP_M_COMMENTS: int = 5
 
+    # Comment tree crawl: max item requests per story, reply depth and parallelism
+    COMMENT_CRAWL_BUDGET: int = 30
+    COMMENT_CRAWL_MAX_DEPTH: int = 2
+    COMMENT_CRAWL_CONCURRENCY: int = 10
+
+    # Per-stage worker counts for the story processing pipeline
+    PIPELINE_FETCH_CONCURRENCY: int = 10
+    PIPELINE_SCRAPE_CONCURRENCY: int = 5
+    PIPELINE_FINGERPRINT_CONCURRENCY: int = 2
+    # Summarize workers only bound the stories in flight; LLM requests are
+    # limited by the adaptive controller (LLM_ADAPTIVE_CONCURRENCY)
+    PIPELINE_SUMMARIZE_CONCURRENCY: int = 16
+    PIPELINE_PUBLISH_CONCURRENCY: int = 3
+
+    # --daemon: seconds between front-page polls; with DAEMON_WATCH_UPDATES,
+    # unpublished front-page stories are retried when updates.json lists them
+    DAEMON_INTERVAL: float = 300.0
+    DAEMON_WATCH_UPDATES: bool = False
+
+    # Shared work queue for --workers/--queue-worker: a claimed job is leased
+    # for QUEUE_VISIBILITY_TIMEOUT seconds (renewed while it is processed) and
+    # retried after the lease expires, up to QUEUE_MAX_ATTEMPTS claims
+    QUEUE_PATH: str = "data/work_queue.sqlite3"
+    QUEUE_VISIBILITY_TIMEOUT: float = 300.0
+    QUEUE_MAX_ATTEMPTS: int = 3
+    QUEUE_WORKER_CONCURRENCY: int = 4
+    QUEUE_POLL_INTERVAL: float = 2.0
+
+    # Memory-bounded mode: extracted article bodies are spooled to disk between
+    # stages and dropped once a story is finished, so memory does not grow with TOP_N_NEWS
+    MEMORY_BOUNDED: bool = False
+    MEMORY_SPOOL_DIR: str = "data/spool"
+
+    # Article downloads: accepted Content-Types and maximum bytes read per page
+    SCRAPER_CONTENT_TYPES: List[str] = ["text/html", "application/xhtml+xml", "text/plain"]
+    SCRAPER_MAX_BYTES: int = 5 * 1024 * 1024
+
+    # Article extraction runs in a "process" or "thread" pool off the event loop
+    EXTRACTION_EXECUTOR: str = "process"
+    EXTRACTION_WORKERS: Optional[int] = None  # Defaults to the number of CPUs
+    # Parse budget of one page, enforced inside process workers; the caller also waits up to
+    # EXTRACTION_QUEUE_GRACE more seconds, so time spent waiting for a free worker is not counted
+    EXTRACTION_TIMEOUT: float = 10.0
+    EXTRACTION_QUEUE_GRACE: float = 30.0
+    EXTRACTION_MAX_HTML_CHARS: int = 5_000_000
+
+    # Per-domain extraction profiles: an XPath selector, configured here or learned from
+    # a successful trafilatura run, is tried with a plain lxml pass before trafilatura
+    EXTRACTION_PROFILES_ENABLED: bool = True
+    EXTRACTION_PROFILES_PATH: str = "data/extraction_profiles.sqlite3"
+    EXTRACTION_SELECTORS: Dict[str, str] = {
+        "github.com": "//article[contains(concat(' ', @class, ' '), ' markdown-body ')]",
+        "en.wikipedia.org": "//div[@id='mw-content-text']/div[contains(@class, 'mw-parser-output')]/p",
+    }
+    EXTRACTION_PROFILE_MIN_CHARS: int = 200
+    EXTRACTION_PROFILE_MAX_FAILURES: int = 3
+    # Learn a selector once trafilatura has extracted this many pages of a domain, and
+    # check every Nth profile extraction against trafilatura (0 disables the check)
+    EXTRACTION_PROFILE_LEARN_AFTER: int = 3
+    EXTRACTION_PROFILE_VERIFY_EVERY: int = 20
+
+    # Per-story stage checkpoints used by --resume
+    CHECKPOINT_ENABLED: bool = True
+    CHECKPOINT_PATH: str = "data/checkpoints.sqlite3"
+    CHECKPOINT_KEEP_RUNS: int = 7
+
+    # Persistent HTTP response cache with conditional GET revalidation
+    HTTP_CACHE_ENABLED: bool = False
+    HTTP_CACHE_PATH: str = "data/http_cache.sqlite3"
+    HTTP_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    HTTP_CACHE_DEFAULT_TTL: float = 6 * 60 * 60
+    HTTP_CACHE_HOST_TTLS: Dict[str, float] = {"hacker-news.firebaseio.com": 5 * 60}
+
+    # Index of already published stories, checked before scraping and summarizing
+    DEDUP_ENABLED: bool = True
+    DEDUP_INDEX_PATH: str = "data/dedup_index.sqlite3"
+
+    # Append-only archive of published digests: gzip segments with article
+    # bodies stored once per content hash, indexed by unique_id, date and domain
+    ARCHIVE_ENABLED: bool = True
+    ARCHIVE_DIR: str = "data/archive"
+    ARCHIVE_SEGMENT_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # MinHash LSH index of summarized articles; near-duplicates (other outlets,
+    # URL variants) reuse the earlier summary and link to it instead of calling the LLM
+    NEAR_DUPLICATE_ENABLED: bool = True
+    NEAR_DUPLICATE_INDEX_PATH: str = "data/near_duplicates.sqlite3"
+    NEAR_DUPLICATE_THRESHOLD: float = 0.8
+    NEAR_DUPLICATE_MIN_WORDS: int = 100
+    # Articles indexed longer ago are forgotten (0 keeps them forever)
+    NEAR_DUPLICATE_RETENTION_DAYS: float = 30
+    MINHASH_NUM_PERM: int = 64
+    MINHASH_BANDS: int = 16
+    MINHASH_SHINGLE_SIZE: int = 5
+
+    # Local cache of LLM completions keyed by model, prompt and sampling params
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "data/llm_cache.sqlite3"
+    LLM_CACHE_TTL: float = 7 * 24 * 60 * 60
+    LLM_CACHE_MAX_ENTRIES: int = 5000
+
+    # Articles above LLM_CHUNK_TOKENS are summarized map-reduce style; input
+    # beyond LLM_STORY_TOKEN_BUDGET (estimated tokens) is dropped
+    LLM_CHUNK_TOKENS: int = 8000
+    LLM_STORY_TOKEN_BUDGET: int = 48000
+    # Summarize article and comments in one JSON-schema call that also fills
+    # keywords, category, sentiment, entities and claims; falls back to two calls
+    LLM_STRUCTURED_OUTPUT: bool = False
+
+    # Model routing: small inputs, unhealthy models (recent p95 latency or error
+    # rate) and the per-run cost ceiling (USD) move requests to a cheaper model.
+    # Every --queue-worker process has its own ceiling, so N workers may spend N times it
+    LLM_ROUTING_ENABLED: bool = True
+    LLM_ROUTER_SMALL_INPUT_TOKENS: int = 1500
+    LLM_ROUTER_LATENCY_TARGET: float = 20.0
+    LLM_ROUTER_MAX_ERROR_RATE: float = 0.3
+    LLM_ROUTER_WINDOW_SECONDS: float = 300.0
+    LLM_ROUTER_MIN_SAMPLES: int = 5
+    LLM_COST_CEILING: Optional[float] = None
+
+    # Stream completions; with hedging, a duplicate request (optionally to a
+    # second endpoint) is sent when the first token is later than the observed
+    # LLM_HEDGE_QUANTILE, and the slower of the two is cancelled
+    LLM_STREAMING: bool = True
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_BASE_URL: Optional[str] = None
+    LLM_HEDGE_API_KEY: Optional[str] = None
+    LLM_HEDGE_QUANTILE: float = 0.9
+    LLM_HEDGE_MIN_SAMPLES: int = 10
+    LLM_HEDGE_INITIAL_DELAY: float = 5.0
+
+    # Adaptive (AIMD) limit on in-flight LLM requests: grows by about one per
+    # round trip while latency stays under the target, and is multiplied by
+    # LLM_CONCURRENCY_BACKOFF on 429, 5xx or timeouts
+    LLM_ADAPTIVE_CONCURRENCY: bool = True
+    LLM_CONCURRENCY_INITIAL: int = 4
+    LLM_CONCURRENCY_MIN: int = 1
+    LLM_CONCURRENCY_MAX: int = 64
+    LLM_CONCURRENCY_BACKOFF: float = 0.5
+    LLM_CONCURRENCY_LATENCY_TARGET: Optional[float] = 30.0
+
     TEST_MODE: bool = False
 
     model_config = SettingsConfigDict(
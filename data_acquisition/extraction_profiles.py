@@ -0,0 +1,315 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from urllib.parse import urlsplit
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PROFILE = "profile"
+FULL = "full"
+FALLBACK = "fallback"
+EMPTY = "empty"
+TIERS = (PROFILE, FULL, FALLBACK, EMPTY)
+
+# Tables are dropped like trafilatura does with include_tables=False (infoboxes, navboxes, ...)
+NOISE_TAGS = ("script", "style", "noscript", "nav", "aside", "footer", "form", "button", "svg", "iframe", "table")
+# Selected text that is mostly link text is a navigation or index block, not an article
+MAX_LINK_DENSITY = 0.5
+BLOCK_TAGS = (
+    "p", "div", "section", "article", "li", "pre", "blockquote", "br",
+    "h1", "h2", "h3", "h4", "h5", "h6", "figcaption", "dd", "dt",
+)
+PARAGRAPH_TAGS = ("p", "li", "pre", "blockquote", "h1", "h2", "h3", "h4", "h5", "h6", "td", "dd")
+CONTAINER_TAGS = ("article", "main", "section", "div")
+
+
+class ProfilePlan(NamedTuple):
+    """How to extract the next page of a domain: its learned selector, and whether to learn or verify one."""
+    selector: Optional[str]
+    learn: bool
+    verify: bool
+
+
+class Extraction(NamedTuple):
+    """Result of an extraction job: the text, the tier that produced it and a newly learned selector."""
+    content: Optional[str]
+    tier: str
+    learned_selector: Optional[str] = None
+
+
+def profile_domain(url: str) -> Optional[str]:
+    """The domain an extraction profile is kept for: the lowercase host without "www."."""
+    host = urlsplit(url).hostname
+    if not host:
+        return None
+    return host[4:] if host.startswith("www.") else host
+
+
+def parse_html(html_content: str):
+    """Parse a HTML document with lxml, or return None if it has no elements."""
+    import lxml.html
+    from lxml import etree
+
+    try:
+        return lxml.html.fromstring(html_content)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.split())
+
+
+def _probes(content: str, limit: int = 20) -> List[str]:
+    """Beginnings of up to `limit` distinctive (long) paragraphs of an extracted text, evenly spread."""
+    probes = [_normalize(line.lstrip("-* "))[:60] for line in content.splitlines() if len(line) >= 40]
+    return probes[::max(1, len(probes) // limit)]
+
+
+def covers(text: str, reference: str) -> bool:
+    """Whether `text` holds most paragraphs of a reference extraction without being much longer."""
+    probes = _probes(reference)
+    normalized = _normalize(text)
+    found = sum(1 for probe in probes if probe in normalized)
+    return found >= 0.8 * len(probes) and len(text) <= 3 * len(reference)
+
+
+def select_text(tree, selector: str, min_chars: int) -> Optional[str]:
+    """Text of the elements an XPath selector matches, one block per line; None if too short.
+
+    The matched elements are stripped of scripts, navigation and similar
+    noise in place, so the tree must not be reused afterwards.
+    """
+    from lxml import etree
+
+    try:
+        elements = [element for element in tree.xpath(selector) if isinstance(element, etree.ElementBase)]
+    except etree.XPathError as e:
+        logger.warning(f"Invalid extraction selector {selector!r}: {e}")
+        return None
+    parts = []
+    link_chars = 0
+    for element in elements:
+        etree.strip_elements(element, etree.Comment, *NOISE_TAGS, with_tail=False)
+        link_chars += sum(len(_normalize(link.text_content())) for link in element.iter("a"))
+        for block in element.iter(*BLOCK_TAGS):
+            block.tail = "\n" + (block.tail or "")
+            if block.tag != "br":
+                block.text = "\n" + (block.text or "")
+        lines = (_normalize(line) for line in element.text_content().split("\n"))
+        parts.extend(line for line in lines if line)
+    text = "\n".join(parts)
+    if len(text) < max(min_chars, 1) or link_chars > MAX_LINK_DENSITY * len(text):
+        return None
+    return text
+
+
+def learn_selector(html_content: str, content: str) -> Optional[str]:
+    """Find an XPath selector for the element holding an extracted article in its page.
+
+    Three distinctive paragraphs of the extracted text are located in the
+    page; the closest common container with an id or class attribute becomes
+    the selector, provided it matches exactly one element and its text
+    covers the article without being much larger. Returns None otherwise.
+    """
+    probes = _probes(content)
+    if len(probes) < 3:
+        return None
+    probes = [probes[0], probes[len(probes) // 2], probes[-1]]
+
+    tree = parse_html(html_content)
+    if tree is None:
+        return None
+    leaves = []
+    for probe in probes:
+        leaf = next(
+            (element for element in tree.iter(*PARAGRAPH_TAGS) if probe in _normalize(element.text_content())),
+            None,
+        )
+        if leaf is None:
+            return None
+        leaves.append(leaf)
+
+    ancestors = [list(leaf.iterancestors()) for leaf in leaves]
+    common = next(
+        (element for element in [leaves[0], *ancestors[0]]
+         if all(element is leaf or element in chain for leaf, chain in zip(leaves[1:], ancestors[1:]))),
+        None,
+    )
+    while common is not None and common.tag not in ("body", "html"):
+        if common.tag in CONTAINER_TAGS:
+            selector = _element_selector(common)
+            if selector:
+                break
+        common = common.getparent()
+    else:
+        return None
+
+    if len(tree.xpath(selector)) != 1:
+        return None
+    selected = select_text(parse_html(html_content), selector, 1)
+    return selector if selected and covers(selected, content) else None
+
+
+def _element_selector(element) -> Optional[str]:
+    """An XPath selector for an element by its id, or else by its tag and class attribute."""
+    element_id, element_class = element.get("id"), element.get("class")
+    if element_id and "'" not in element_id:
+        return f"//*[@id='{element_id}']"
+    if element_class and "'" not in element_class:
+        return f"//{element.tag}[@class='{element_class}']"
+    return None
+
+
+def json_ld_article_body(tree) -> Optional[str]:
+    """The articleBody of the page's schema.org JSON-LD, which JS-rendered sites often still embed."""
+    for script in tree.xpath("//script[@type='application/ld+json']/text()"):
+        try:
+            data = json.loads(script)
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                body = item.get("articleBody")
+                if isinstance(body, str) and body.strip():
+                    return body.strip()
+                stack.extend(value for value in item.values() if isinstance(value, (dict, list)))
+    return None
+
+
+class ExtractionProfileStore:
+    """Per-domain extraction profiles in a local SQLite file.
+
+    Keeps the learned XPath selector of each domain and how often each
+    extraction tier produced its content. Selectors are only learned for
+    domains seen repeatedly, and a domain whose learning failed is not
+    tried again. A learned selector that misses `max_failures` times in a
+    row is dropped, so it can be learned again after a site redesign.
+    """
+
+    def __init__(self, path: str, max_failures: int):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_failures = max_failures
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS profiles (
+                domain TEXT PRIMARY KEY,
+                selector TEXT,
+                selector_failures INTEGER NOT NULL DEFAULT 0,
+                profile_hits INTEGER NOT NULL DEFAULT 0,
+                full_hits INTEGER NOT NULL DEFAULT 0,
+                fallback_hits INTEGER NOT NULL DEFAULT 0,
+                empty_hits INTEGER NOT NULL DEFAULT 0,
+                learn_failed INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def selector(self, domain: str) -> Optional[str]:
+        """The learned selector of a domain, if there is one."""
+        return self.plan(domain, learn_after=0, verify_every=0).selector
+
+    def plan(self, domain: str, learn_after: int, verify_every: int) -> ProfilePlan:
+        """Decide how to extract the next page of a domain.
+
+        A selector is learned once trafilatura has extracted `learn_after`
+        pages of the domain (counting this one), and every `verify_every`-th
+        profile extraction is checked against trafilatura.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT selector, profile_hits, full_hits, learn_failed FROM profiles WHERE domain = ?", (domain,)
+            ).fetchone()
+        selector, profile_hits, full_hits, learn_failed = row or (None, 0, 0, 0)
+        return ProfilePlan(
+            selector=selector,
+            learn=selector is None and not learn_failed and full_hits + 1 >= learn_after,
+            verify=verify_every > 0 and (profile_hits + 1) % verify_every == 0,
+        )
+
+    def record(
+        self,
+        domain: str,
+        tier: str,
+        tried_selector: bool = False,
+        tried_learning: bool = False,
+        learned_selector: Optional[str] = None,
+    ):
+        """Count an extraction of a domain by the tier that produced it, and store the outcome of learning."""
+        if tier not in TIERS:
+            raise ValueError(f"Unknown extraction tier: {tier}")
+        with self._lock:
+            self._conn.execute(
+                f"""
+                INSERT INTO profiles (domain, {tier}_hits, updated_at) VALUES (?, 1, ?)
+                ON CONFLICT (domain) DO UPDATE SET
+                    {tier}_hits = {tier}_hits + 1, updated_at = excluded.updated_at
+                """,
+                (domain, time.time()),
+            )
+            if tier == PROFILE:
+                self._conn.execute("UPDATE profiles SET selector_failures = 0 WHERE domain = ?", (domain,))
+            elif tried_selector:
+                self._conn.execute(
+                    "UPDATE profiles SET selector_failures = selector_failures + 1 WHERE domain = ?", (domain,)
+                )
+                dropped = self._conn.execute(
+                    "UPDATE profiles SET selector = NULL, selector_failures = 0, learn_failed = 0 "
+                    "WHERE domain = ? AND selector IS NOT NULL AND selector_failures >= ?",
+                    (domain, self.max_failures),
+                ).rowcount
+                if dropped:
+                    logger.info(f"Dropped the learned extraction selector of {domain} after {self.max_failures} misses.")
+            if learned_selector:
+                self._conn.execute(
+                    "UPDATE profiles SET selector = ?, selector_failures = 0 WHERE domain = ?",
+                    (learned_selector, domain),
+                )
+                logger.info(f"Learned extraction selector for {domain}: {learned_selector}")
+            elif tried_learning and tier == FULL:
+                self._conn.execute("UPDATE profiles SET learn_failed = 1 WHERE domain = ?", (domain,))
+            self._conn.commit()
+
+    def stats(self, domain: str) -> Dict[str, Any]:
+        """Extraction counts by tier and the success rate of the selector of one domain."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT selector, profile_hits, full_hits, fallback_hits, empty_hits FROM profiles WHERE domain = ?",
+                (domain,),
+            ).fetchone()
+        if row is None:
+            return {}
+        selector, *counts = row
+        stats: Dict[str, Any] = {"selector": selector}
+        stats.update(zip(TIERS, counts))
+        total = sum(counts)
+        stats["success_rate"] = (total - stats[EMPTY]) / total if total else 0.0
+        stats["profile_rate"] = stats[PROFILE] / total if total else 0.0
+        return stats
+
+    def describe(self) -> Dict[str, Any]:
+        """Number of domains and learned selectors, and extraction counts by tier, for inspection."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), COUNT(selector), COALESCE(SUM(profile_hits), 0), COALESCE(SUM(full_hits), 0), "
+                "COALESCE(SUM(fallback_hits), 0), COALESCE(SUM(empty_hits), 0) FROM profiles"
+            ).fetchone()
+        return dict(zip(("domains", "selectors", *TIERS), row))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,11 +1,16 @@
 import asyncio
-from typing import Any, Dict, List, Optional
+import heapq
+import itertools
+import math
+from typing import Any, Dict, List, Optional, Set
 
 import aiohttp
 
+from config.settings import settings
 from data_acquisition.base import DataSource
 from utils.http_client import http_get
 from utils.logger import get_logger
+from utils.metrics import HN_ITEMS
 
 logger = get_logger(__name__)
 
@@ -13,58 +18,115 @@ logger = get_logger(__name__)
 class HackerNewsDataSource(DataSource):
     """Data source for Hacker News."""
 
-    BASE_URL = "https://hacker-news.firebaseio.com/v0"
+    BASE_URL = settings.HN_API_BASE_URL
+    # Replies start with a fraction of their parent's score in the crawl frontier
+    REPLY_DECAY = 0.5
 
     def __init__(self, session: aiohttp.ClientSession):
         self.session = session
 
-    async def fetch_top_stories(self, count: int) -> List[Dict[str, Any]]:
-        """Fetch top stories from Hacker News."""
-        logger.debug(f"Fetching top {count} stories.")
+    async def fetch_top_story_ids(self, count: int) -> List[int]:
+        """Fetch the IDs of the current top stories on Hacker News."""
+        logger.debug("Fetching top %d story IDs.", count)
         top_stories_url = f"{self.BASE_URL}/topstories.json"
         story_ids = await http_get(self.session, top_stories_url)
+        HN_ITEMS.inc(kind="topstories")
         if not story_ids:
             logger.info("No top story IDs found.")
             return []
+        return story_ids[:count]
+
+    async def fetch_updated_item_ids(self) -> Set[int]:
+        """Fetch the IDs of the items that changed recently (updates.json)."""
+        updates = await http_get(self.session, f"{self.BASE_URL}/updates.json")
+        HN_ITEMS.inc(kind="updates")
+        return set((updates or {}).get("items", []))
 
+    async def fetch_top_stories(self, count: int) -> List[Dict[str, Any]]:
+        """Fetch top stories from Hacker News."""
+        logger.debug("Fetching top %d stories.", count)
+        story_ids = await self.fetch_top_story_ids(count)
         tasks = [
-            self.fetch_story_details(story_id) for story_id in story_ids[:count]
+            self.fetch_story_details(story_id) for story_id in story_ids
         ]
         stories = await asyncio.gather(*tasks)
         return [story for story in stories if story]
 
     async def fetch_story_details(self, story_id: int) -> Optional[Dict[str, Any]]:
         """Fetch details for a specific story."""
-        logger.debug(f"Fetching details for story ID: {story_id}.")
+        logger.debug("Fetching details for story ID: %s.", story_id)
         story_url = f"{self.BASE_URL}/item/{story_id}.json"
+        # Stories keep changing (kids, score, descendants), so they are always revalidated
         details = await http_get(self.session, story_url)
+        HN_ITEMS.inc(kind="story")
         if not details:
             logger.info(f"No details found for story ID: {story_id}.")
         return details
 
     async def fetch_comments(self, comment_ids: List[int], count: int) -> List[Dict[str, Any]]:
-        """Fetch a number of comments for a story."""
-        # 这里多获取50%
-        fetch_limit = int(count * 1.2)
-        if fetch_limit > len(comment_ids):
-            fetch_limit = len(comment_ids)
-        logger.debug(f"Fetching {count} comments for comment IDs: {comment_ids}.")
+        """Fetch the best `count` comments of a thread with a budgeted tree crawl.
+
+        The thread is walked breadth-first from the top-level comments. Each
+        comment gets a priority from its rank among its siblings and from its
+        parent's score, and the frontier is expanded highest priority first
+        until COMMENT_CRAWL_BUDGET item requests have been made. A comment's
+        own score grows with its number of replies, so busy subtrees are
+        explored before quiet ones.
+        """
         if not comment_ids:
             logger.info("No comment IDs provided.")
             return []
+        budget = max(settings.COMMENT_CRAWL_BUDGET, count)
+        logger.debug("Crawling comments from %d top-level IDs with a budget of %d.", len(comment_ids), budget)
 
-        tasks = [
-            self._fetch_comment(comment_id) for comment_id in comment_ids[:fetch_limit]
-        ]
-        comments = await asyncio.gather(*tasks)
-        comments_filtered = [comment for comment in comments if comment and not comment.get("deleted")]
-        return comments_filtered[:count]
+        order = itertools.count()
+        # Heap entries: (-priority, insertion order, depth, comment ID)
+        frontier = [(-1.0 / (1 + rank), next(order), 0, comment_id) for rank, comment_id in enumerate(comment_ids)]
+        heapq.heapify(frontier)
+        pending: Dict[asyncio.Task, tuple] = {}
+        scored: List[tuple] = []
+        requests = 0
+
+        try:
+            while frontier or pending:
+                while frontier and len(pending) < settings.COMMENT_CRAWL_CONCURRENCY and requests < budget:
+                    negative_priority, _, depth, comment_id = heapq.heappop(frontier)
+                    task = asyncio.create_task(self._fetch_comment(comment_id))
+                    pending[task] = (-negative_priority, depth)
+                    requests += 1
+                if not pending:
+                    break
+
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    priority, depth = pending.pop(task)
+                    comment = task.result()
+                    if not comment or comment.get("deleted") or comment.get("dead"):
+                        continue
+                    kids = comment.get("kids", [])
+                    score = priority * (1 + math.log1p(len(kids)))
+                    scored.append((score, next(order), comment))
+                    if depth < settings.COMMENT_CRAWL_MAX_DEPTH:
+                        for rank, kid in enumerate(kids):
+                            heapq.heappush(
+                                frontier,
+                                (-score * self.REPLY_DECAY / (1 + rank), next(order), depth + 1, kid),
+                            )
+        finally:
+            for task in pending:
+                task.cancel()
+
+        scored.sort(key=lambda entry: (-entry[0], entry[1]))
+        logger.debug("Comment crawl made %d requests and found %d comments.", requests, len(scored))
+        return [comment for _, _, comment in scored[:count]]
 
     async def _fetch_comment(self, comment_id: int) -> Optional[Dict[str, Any]]:
         """Fetch a single comment."""
-        logger.debug(f"Fetching details for comment ID: {comment_id}.")
+        logger.debug("Fetching details for comment ID: %s.", comment_id)
         comment_url = f"{self.BASE_URL}/item/{comment_id}.json"
+        # Comments keep changing after their edit window (kids, dead, deleted), so they are revalidated too
         comment = await http_get(self.session, comment_url)
+        HN_ITEMS.inc(kind="comment")
         if not comment:
             logger.info(f"No details found for comment ID: {comment_id}.")
         return comment
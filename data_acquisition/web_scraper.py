@@ -1,35 +1,261 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
 import aiohttp
-import trafilatura
-from typing import Optional
 
+from config.settings import settings
+from data_acquisition.extraction_profiles import (
+    EMPTY,
+    FALLBACK,
+    FULL,
+    PROFILE,
+    Extraction,
+    ExtractionProfileStore,
+    ProfilePlan,
+    covers,
+    json_ld_article_body,
+    learn_selector,
+    parse_html,
+    profile_domain,
+    select_text,
+)
 from utils.http_client import http_get
-from utils.logger import get_logger
+from utils.logger import configure_worker_logging, get_logger
+from utils.metrics import EXTRACTION_DURATION, EXTRACTIONS
 
 logger = get_logger(__name__)
 
 
+def _extract_main_content(
+    html_content: str,
+    selector: Optional[str] = None,
+    learn: bool = False,
+    verify: bool = False,
+    min_chars: int = 0,
+) -> Extraction:
+    """Extract the main text of a HTML document, cheapest tier first. Executed inside the extraction executor.
+
+    A known selector of the page's domain is applied with a plain lxml pass;
+    trafilatura only runs when it misses, and the fallback tier (trafilatura
+    favoring recall, then the page's JSON-LD articleBody) only when
+    trafilatura finds nothing. With `verify`, trafilatura runs anyway and
+    profile text that does not match its result is discarded. With `learn`,
+    a selector for the next pages of the domain is derived from a successful
+    trafilatura extraction.
+    """
+    profile_content = None
+    if selector:
+        tree = parse_html(html_content)
+        profile_content = select_text(tree, selector, min_chars) if tree is not None else None
+        if profile_content and not verify:
+            return Extraction(profile_content, PROFILE)
+
+    # Imported here so that only the extraction workers pay for loading trafilatura
+    import trafilatura
+
+    content = trafilatura.extract(
+        html_content,
+        include_comments=False,
+        include_tables=False,
+        no_fallback=True,
+    )
+    if profile_content and (not content or covers(profile_content, content)):
+        return Extraction(profile_content, PROFILE)
+    if content:
+        return Extraction(content, FULL, learn_selector(html_content, content) if learn else None)
+
+    content = trafilatura.extract(
+        html_content,
+        include_comments=False,
+        include_tables=False,
+        favor_recall=True,
+    )
+    if not content:
+        tree = parse_html(html_content)
+        content = json_ld_article_body(tree) if tree is not None else None
+    return Extraction(content, FALLBACK if content else EMPTY)
+
+
+class ExtractionDeadlineExceeded(BaseException):
+    """Raised inside an extraction worker process whose job ran past its deadline.
+
+    A BaseException, so that the broad `except Exception` blocks inside
+    trafilatura do not swallow it and keep the worker busy.
+    """
+
+
+@contextmanager
+def _deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Interrupt the enclosed code after `seconds` with ExtractionDeadlineExceeded.
+
+    Only takes effect in the main thread of a worker process, where SIGALRM
+    can be used without disturbing the pipeline; elsewhere it does nothing.
+    """
+    if (
+        not seconds
+        or not hasattr(signal, "setitimer")
+        or multiprocessing.parent_process() is None
+        or threading.current_thread() is not threading.main_thread()
+    ):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise ExtractionDeadlineExceeded()
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_in_worker(deadline: Optional[float], *args) -> Extraction:
+    """Run `_extract_main_content` in the extraction executor, giving up after `deadline` seconds in a worker process."""
+    with _deadline(deadline):
+        return _extract_main_content(*args)
+
+
 class WebScraper:
     """A web scraper to extract main content from URLs."""
 
-    @staticmethod
-    async def fetch_and_extract_content(session: aiohttp.ClientSession, url: str) -> Optional[str]:
-        logger.debug(f"Fetching and extracting content from URL: {url}")
+    _executor: Optional[Executor] = None
+    _profiles: Optional[ExtractionProfileStore] = None
+
+    @classmethod
+    def get_executor(cls) -> Executor:
+        """Return the shared extraction executor, creating it on first use."""
+        if cls._executor is None:
+            workers = settings.EXTRACTION_WORKERS or os.cpu_count() or 1
+            if settings.EXTRACTION_EXECUTOR == "process":
+                try:
+                    cls._executor = ProcessPoolExecutor(max_workers=workers, initializer=configure_worker_logging)
+                except (ImportError, NotImplementedError, OSError) as e:
+                    logger.warning(f"Process pool unavailable ({e}), falling back to a thread pool.")
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract")
+            logger.debug("Created %s with %d workers for extraction.", type(cls._executor).__name__, workers)
+        return cls._executor
+
+    @classmethod
+    def get_profiles(cls) -> Optional[ExtractionProfileStore]:
+        """Return the per-domain extraction profile store, or None if profiles are disabled."""
+        if cls._profiles is None and settings.EXTRACTION_PROFILES_ENABLED:
+            cls._profiles = ExtractionProfileStore(
+                settings.EXTRACTION_PROFILES_PATH, settings.EXTRACTION_PROFILE_MAX_FAILURES
+            )
+        return cls._profiles
+
+    @classmethod
+    def _shutdown_executor(cls):
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+    @classmethod
+    def shutdown(cls):
+        """Shut down the extraction executor without waiting for pending jobs, and close the profile store."""
+        cls._shutdown_executor()
+        if cls._profiles is not None:
+            cls._profiles.close()
+            cls._profiles = None
+
+    @classmethod
+    async def extract_content(cls, html_content: str, url: str = "") -> Optional[str]:
+        """Extract the main text of a HTML document off the event loop."""
+        if len(html_content) > settings.EXTRACTION_MAX_HTML_CHARS:
+            logger.info(
+                f"HTML from {url} is {len(html_content)} chars, truncating to "
+                f"{settings.EXTRACTION_MAX_HTML_CHARS} before extraction."
+            )
+            html_content = html_content[:settings.EXTRACTION_MAX_HTML_CHARS]
+
+        # Configured selectors take precedence; frequent domains without one learn it
+        domain = profile_domain(url) if url else None
+        profiles = cls.get_profiles() if domain else None
+        plan = (
+            await asyncio.to_thread(
+                profiles.plan, domain, settings.EXTRACTION_PROFILE_LEARN_AFTER, settings.EXTRACTION_PROFILE_VERIFY_EVERY
+            )
+            if profiles
+            else ProfilePlan(None, False, False)
+        )
+        configured = settings.EXTRACTION_SELECTORS.get(domain) if domain else None
+        selector = configured or plan.selector
+        learn = plan.learn and selector is None
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            extraction = await asyncio.wait_for(
+                loop.run_in_executor(
+                    cls.get_executor(),
+                    _extract_in_worker,
+                    settings.EXTRACTION_TIMEOUT,
+                    html_content,
+                    selector,
+                    learn,
+                    plan.verify,
+                    settings.EXTRACTION_PROFILE_MIN_CHARS,
+                ),
+                # A safety net: the parse itself is stopped at EXTRACTION_TIMEOUT inside the worker
+                timeout=settings.EXTRACTION_TIMEOUT + settings.EXTRACTION_QUEUE_GRACE,
+            )
+            EXTRACTION_DURATION.observe(time.perf_counter() - start, tier=extraction.tier)
+            EXTRACTIONS.inc(outcome="ok" if extraction.content else "empty", tier=extraction.tier)
+            if profiles:
+                await asyncio.to_thread(
+                    profiles.record,
+                    domain,
+                    extraction.tier,
+                    tried_selector=selector is not None,
+                    tried_learning=learn,
+                    learned_selector=extraction.learned_selector,
+                )
+            return extraction.content
+        except (asyncio.TimeoutError, ExtractionDeadlineExceeded):
+            # A process worker stops the job at its deadline, so pathological
+            # pages cannot keep every worker busy. Thread workers cannot be
+            # interrupted: the caller gives up after the grace period and the
+            # job finishes in the background.
+            EXTRACTIONS.inc(outcome="timeout")
+            logger.warning(f"Extraction of {url} timed out after {settings.EXTRACTION_TIMEOUT}s.")
+            return None
+        except BrokenProcessPool:
+            EXTRACTIONS.inc(outcome="error")
+            logger.error(f"Extraction worker died while processing {url}, recreating the pool.")
+            cls._shutdown_executor()
+            return None
+
+    @classmethod
+    async def fetch_and_extract_content(cls, session: aiohttp.ClientSession, url: str) -> Optional[str]:
         """Fetches content from a URL and extracts the main text."""
+        logger.debug("Fetching and extracting content from URL: %s", url)
         try:
-            # Use http_get to fetch raw HTML content as text
-            html_content = await http_get(session, url, response_type="text")
+            # Stream the raw HTML, skipping non-HTML documents and capping its size
+            html_content = await http_get(
+                session,
+                url,
+                response_type="text",
+                max_bytes=settings.SCRAPER_MAX_BYTES,
+                content_types=settings.SCRAPER_CONTENT_TYPES,
+            )
             if not html_content:
                 logger.info(f"No HTML content fetched from {url}.")
                 return None
 
-            # Use trafilatura to extract the main content
-            main_content = trafilatura.extract(
-                html_content,
-                include_comments=False,
-                include_tables=False,
-                no_fallback=True,
-            )
-            return main_content
+            # Extract the main content with the domain's profile, trafilatura or the fallback tier
+            return await cls.extract_content(html_content, url)
         except Exception as e:
             logger.error(f"Failed to fetch or extract content from {url}: {e}")
             return None
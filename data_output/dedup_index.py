@@ -0,0 +1,100 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def make_unique_id(url: str) -> str:
+    """Derive the digest unique_id from a story URL."""
+    return hashlib.md5(url.encode()).hexdigest()
+
+
+def make_content_hash(content: str) -> str:
+    """Hash extracted article text so the same article under another URL is recognised."""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class DedupIndex:
+    """Persistent index of stories that were already published, shared across runs."""
+
+    def __init__(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        # Shared by worker processes: WAL lets readers proceed during writes, and writers wait as long as the work queue
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS published_stories (
+                unique_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                content_hash TEXT,
+                title TEXT,
+                published_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_published_content_hash ON published_stories (content_hash)"
+        )
+        self._conn.commit()
+
+    def has_unique_id(self, unique_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM published_stories WHERE unique_id = ?", (unique_id,)
+            ).fetchone()
+        return row is not None
+
+    def has_content_hash(self, content_hash: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM published_stories WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        return row is not None
+
+    def record(
+        self,
+        unique_id: str,
+        url: str,
+        content_hash: Optional[str] = None,
+        title: Optional[str] = None,
+    ):
+        """Mark a story as published."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO published_stories VALUES (?, ?, ?, ?, ?)",
+                (unique_id, url, content_hash, title, time.time()),
+            )
+            self._conn.commit()
+
+    def record_urls(self, urls: Iterable[str]) -> int:
+        """Mark URLs published elsewhere (e.g. found in Notion) without touching known entries."""
+        rows = [(make_unique_id(url), url, time.time()) for url in urls]
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO published_stories (unique_id, url, published_at) VALUES (?, ?, ?)",
+                rows,
+            )
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def describe(self) -> Dict[str, Any]:
+        """Number of known stories and how many of them have a content hash, for inspection."""
+        with self._lock:
+            entries, hashed = self._conn.execute(
+                "SELECT COUNT(*), COUNT(content_hash) FROM published_stories"
+            ).fetchone()
+        return {"entries": entries, "with_content_hash": hashed}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
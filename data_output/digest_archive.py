@@ -0,0 +1,247 @@
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from data_output.dedup_index import make_content_hash
+from data_output.schemas import DailyDigest
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DIGESTS = "digests"
+BODIES = "bodies"
+
+# Kinds of digest versions: the one that was published, and later re-summaries
+PUBLISHED = "published"
+RESUMMARIZED = "resummarized"
+
+
+@dataclass
+class ArchivedStory:
+    """An archived digest, with its article body restored, and the comments it was summarized from."""
+    digest: DailyDigest
+    comments: List[Dict[str, Any]] = field(default_factory=list)
+    kind: str = PUBLISHED
+
+
+class DigestArchive:
+    """Append-only local archive of published digests.
+
+    Records are written to gzip segment files, one gzip member per record,
+    so any record can be read back from its offset without scanning the
+    segment. Article bodies are stored once per content hash in separate
+    segments; digest records only reference them. A SQLite index maps
+    unique_id, publication time and article domain to record offsets.
+    Every version of a story is kept: re-summaries are added next to the
+    published digest instead of replacing it, and reads return the latest.
+    Appends hold the index's write lock, so several worker processes can
+    share one archive.
+    """
+
+    def __init__(self, directory: str, segment_max_bytes: int):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(directory, "index.sqlite3"), timeout=30.0, isolation_level=None, check_same_thread=False
+        )
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS bodies (
+                content_hash TEXT PRIMARY KEY,
+                segment TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS digests (
+                unique_id TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL,
+                domain TEXT,
+                title TEXT,
+                published_at REAL,
+                archived_at REAL NOT NULL,
+                content_hash TEXT NOT NULL,
+                segment TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_digests_versions ON digests (unique_id, archived_at);
+            CREATE INDEX IF NOT EXISTS idx_digests_published ON digests (published_at);
+            CREATE INDEX IF NOT EXISTS idx_digests_domain ON digests (domain, published_at);
+            """
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def add(self, digest: DailyDigest, comments: Optional[List[Dict[str, Any]]] = None, kind: str = PUBLISHED) -> str:
+        """Archive a digest as a new version of its story and return its content hash."""
+        body = digest.core_content.original_content
+        content_hash = make_content_hash(body)
+        record = digest.model_dump(mode="json")
+        del record["core_content"]["original_content"]
+        record = {"digest": record, "content_hash": content_hash, "comments": comments or [], "kind": kind}
+        core = digest.core_content
+
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM bodies WHERE content_hash = ?", (content_hash,)).fetchone() is None:
+                segment, offset, length = self._append(BODIES, body.encode())
+                conn.execute(
+                    "INSERT INTO bodies VALUES (?, ?, ?, ?, ?)",
+                    (content_hash, segment, offset, length, len(body.encode())),
+                )
+            segment, offset, length = self._append(DIGESTS, json.dumps(record).encode())
+            conn.execute(
+                "INSERT INTO digests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    digest.unique_id,
+                    kind,
+                    core.url,
+                    urlsplit(core.url).hostname,
+                    core.title,
+                    core.publication_date.timestamp() if core.publication_date else None,
+                    time.time(),
+                    content_hash,
+                    segment,
+                    offset,
+                    length,
+                ),
+            )
+        return content_hash
+
+    def _append(self, kind: str, data: bytes) -> Tuple[str, int, int]:
+        """Append one gzip member to the current segment of `kind`; returns (segment, offset, length)."""
+        segment = self._current_segment(kind)
+        member = gzip.compress(data, compresslevel=6, mtime=0)
+        with open(os.path.join(self.directory, segment), "ab") as f:
+            offset = f.tell()
+            f.write(member)
+        return segment, offset, len(member)
+
+    def _current_segment(self, kind: str) -> str:
+        """The newest segment of `kind`, or a new one once it has reached the size limit."""
+        segments = sorted(name for name in os.listdir(self.directory) if name.startswith(f"{kind}-"))
+        if segments and os.path.getsize(os.path.join(self.directory, segments[-1])) < self.segment_max_bytes:
+            return segments[-1]
+        number = int(segments[-1].split("-")[1].split(".")[0]) + 1 if segments else 1
+        suffix = ".txt.gz" if kind == BODIES else ".jsonl.gz"
+        return f"{kind}-{number:06d}{suffix}"
+
+    def _read(self, files: Dict[str, Any], segment: str, offset: int, length: int) -> bytes:
+        if segment not in files:
+            files[segment] = open(os.path.join(self.directory, segment), "rb")
+        f = files[segment]
+        f.seek(offset)
+        return gzip.decompress(f.read(length))
+
+    def get_body(self, content_hash: str) -> Optional[str]:
+        """Return an archived article body by content hash."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segment, offset, length FROM bodies WHERE content_hash = ?", (content_hash,)
+            ).fetchone()
+        if row is None:
+            return None
+        files: Dict[str, Any] = {}
+        try:
+            return self._read(files, *row).decode()
+        finally:
+            for f in files.values():
+                f.close()
+
+    def get(self, unique_id: str, kind: Optional[str] = None) -> Optional[ArchivedStory]:
+        """Return the latest archived version of a story, optionally only among versions of one kind."""
+        where, params = "WHERE d.unique_id = ?", [unique_id]
+        if kind:
+            where += " AND d.kind = ?"
+            params.append(kind)
+        return next(self._load(f"{where} ORDER BY d.archived_at DESC, d.rowid DESC LIMIT 1", params), None)
+
+    def query(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        domain: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[ArchivedStory]:
+        """Iterate over the latest versions of archived stories published in [since, until), oldest first.
+
+        Optionally only stories from one domain are returned.
+        """
+        conditions = [
+            "d.rowid = (SELECT v.rowid FROM digests v WHERE v.unique_id = d.unique_id "
+            "ORDER BY v.archived_at DESC, v.rowid DESC LIMIT 1)"
+        ]
+        params: List[Any] = []
+        if since:
+            conditions.append("d.published_at >= ?")
+            params.append(since.timestamp())
+        if until:
+            conditions.append("d.published_at < ?")
+            params.append(until.timestamp())
+        if domain:
+            conditions.append("d.domain = ?")
+            params.append(domain)
+        where = f"WHERE {' AND '.join(conditions)}"
+        where += " ORDER BY d.published_at" + (f" LIMIT {int(limit)}" if limit else "")
+        return self._load(where, params)
+
+    def _load(self, where: str, params: List[Any]) -> Iterator[ArchivedStory]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT d.segment, d.offset, d.length, b.segment, b.offset, b.length
+                FROM digests d JOIN bodies b ON b.content_hash = d.content_hash {where}
+                """,
+                params,
+            ).fetchall()
+        files: Dict[str, Any] = {}
+        try:
+            for digest_location in rows:
+                record = json.loads(self._read(files, *digest_location[:3]))
+                record["digest"]["core_content"]["original_content"] = self._read(files, *digest_location[3:]).decode()
+                yield ArchivedStory(
+                    digest=DailyDigest.model_validate(record["digest"]),
+                    comments=record["comments"],
+                    kind=record.get("kind", PUBLISHED),
+                )
+        finally:
+            for f in files.values():
+                f.close()
+
+    def describe(self) -> Dict[str, Any]:
+        """Number of stories, digest versions and bodies, and their size on disk and uncompressed, for inspection."""
+        with self._lock:
+            digests, versions = self._conn.execute("SELECT COUNT(DISTINCT unique_id), COUNT(*) FROM digests").fetchone()
+            bodies, raw_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(raw_size), 0) FROM bodies").fetchone()
+        segments = [name for name in os.listdir(self.directory) if name.startswith((f"{DIGESTS}-", f"{BODIES}-"))]
+        return {
+            "digests": digests,
+            "versions": versions,
+            "bodies": bodies,
+            "body_bytes": raw_bytes,
+            "segment_bytes": sum(os.path.getsize(os.path.join(self.directory, name)) for name in segments),
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from data_processing.minhash import band_keys, estimate_similarity
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class NearDuplicate:
+    """A previously summarized story whose content is similar to a new one."""
+    unique_id: str
+    url: str
+    title: Optional[str]
+    summary: str
+    similarity: float
+
+
+def _pack(signature: List[int]) -> bytes:
+    return struct.pack(f"<{len(signature)}Q", *signature)
+
+
+def _unpack(blob: bytes) -> List[int]:
+    return list(struct.unpack(f"<{len(blob) // 8}Q", blob))
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash LSH index of summarized stories, shared across runs.
+
+    Signatures are split into bands; stories sharing a band bucket are
+    candidates, and only candidates whose estimated similarity reaches the
+    threshold are reported as near-duplicates. Stories indexed more than
+    `retention_days` ago are ignored and pruned whenever a story is added
+    (0 keeps them forever).
+    """
+
+    def __init__(self, path: str, bands: int, retention_days: float = 0):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.bands = bands
+        self.retention = retention_days * 24 * 60 * 60
+        self._lock = threading.Lock()
+        # Shared by worker processes: WAL lets readers proceed during writes, and writers wait as long as the work queue
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                unique_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                title TEXT,
+                signature BLOB NOT NULL,
+                summary TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket TEXT NOT NULL,
+                unique_id TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, unique_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_lsh_buckets_story ON lsh_buckets (unique_id);
+            CREATE INDEX IF NOT EXISTS idx_fingerprints_created ON fingerprints (created_at);
+            """
+        )
+        self._conn.commit()
+
+    def _cutoff(self) -> float:
+        """Creation time before which stories are past the retention window."""
+        return time.time() - self.retention if self.retention > 0 else float("-inf")
+
+    def find(self, signature: List[int], threshold: float) -> Optional[NearDuplicate]:
+        """Return the most similar indexed story at or above `threshold`, if any."""
+        keys = band_keys(signature, self.bands)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT f.unique_id, f.url, f.title, f.summary, f.signature FROM fingerprints f
+                WHERE f.created_at >= ? AND f.unique_id IN (
+                    SELECT unique_id FROM lsh_buckets WHERE {" OR ".join("(band = ? AND bucket = ?)" for _ in keys)}
+                )
+                """,
+                [self._cutoff(), *(value for band, key in enumerate(keys) for value in (band, key))],
+            ).fetchall()
+        best = None
+        for unique_id, url, title, summary, blob in rows:
+            similarity = estimate_similarity(signature, _unpack(blob))
+            if similarity >= threshold and (best is None or similarity > best.similarity):
+                best = NearDuplicate(unique_id, url, title, summary, similarity)
+        return best
+
+    def add(self, unique_id: str, url: str, signature: List[int], summary: str, title: Optional[str] = None):
+        """Index a summarized story with its article summary (without the comment summary), pruning expired ones."""
+        keys = band_keys(signature, self.bands)
+        with self._lock:
+            if self.retention > 0:
+                cutoff = self._cutoff()
+                self._conn.execute(
+                    "DELETE FROM lsh_buckets WHERE unique_id IN (SELECT unique_id FROM fingerprints WHERE created_at < ?)",
+                    (cutoff,),
+                )
+                self._conn.execute("DELETE FROM fingerprints WHERE created_at < ?", (cutoff,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?)",
+                (unique_id, url, title, _pack(signature), summary, time.time()),
+            )
+            self._conn.execute("DELETE FROM lsh_buckets WHERE unique_id = ?", (unique_id,))
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO lsh_buckets VALUES (?, ?, ?)",
+                [(band, key, unique_id) for band, key in enumerate(keys)],
+            )
+            self._conn.commit()
+
+    def describe(self) -> Dict[str, Any]:
+        """Number of indexed stories, for inspection."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM fingerprints").fetchone()[0]
+        return {"entries": entries}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
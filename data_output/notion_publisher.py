@@ -1,36 +1,210 @@
+import asyncio
+import time
 import notion_client
-from typing import Dict, Any
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+from notion_client.helpers import async_collect_paginated_api
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from config.settings import settings
 from data_output.base import Publisher
 from data_output.schemas import DailyDigest
 from utils.logger import get_logger
+from utils.metrics import NOTION_REQUEST_DURATION, NOTION_REQUESTS
+from utils.rate_limiter import TokenBucket, backoff_delay, parse_retry_after
 
 logger = get_logger(__name__)
 
+# Notion accepts at most this many blocks per create/append request
+MAX_BLOCKS_PER_REQUEST = 100
+
 
 class NotionPublisher(Publisher):
-    """Publisher for Notion."""
+    """Publisher for Notion.
+
+    All API calls share one token bucket so concurrent publishes stay within
+    Notion's request rate limit, and rate limited or failed calls are retried
+    with backoff. Digests are upserted by URL (from which `unique_id` is
+    derived), so retrying a failed run never creates duplicate pages.
+    """
 
     def __init__(self, database_id: str):
-        self.client = notion_client.AsyncClient(auth=settings.NOTION_TOKEN)
+        self.client = notion_client.AsyncClient(auth=settings.NOTION_TOKEN, base_url=settings.NOTION_BASE_URL)
         self.database_id = database_id
+        self._data_source_id: Optional[str] = None
+        self._rate_limiter = TokenBucket(rate=settings.NOTION_RATE_LIMIT, capacity=settings.NOTION_RATE_LIMIT)
 
     async def publish(self, digest: DailyDigest) -> bool:
-        logger.debug(f"Attempting to publish digest {digest.unique_id} to Notion.")
-        """Publish a DailyDigest object to Notion."""
+        """Create or update the Notion page of a DailyDigest."""
+        logger.debug("Attempting to publish digest %s to Notion.", digest.unique_id)
         properties = self._format_properties(digest)
+        blocks = self._format_body_blocks(digest)
         try:
-            await self.client.pages.create(
-                parent={"database_id": self.database_id},
-                properties=properties,
-            )
-            logger.info(f"Successfully published digest {digest.unique_id} to Notion.")
+            page_id = await self._find_page_id(digest)
+            created = False
+            if page_id is None:
+                page_id, created = await self._create_page(digest, properties, blocks[:MAX_BLOCKS_PER_REQUEST])
+            if created:
+                await self._append_blocks(
+                    page_id, blocks[MAX_BLOCKS_PER_REQUEST:], existing=min(len(blocks), MAX_BLOCKS_PER_REQUEST)
+                )
+                action = "published"
+            else:
+                await self._call(self.client.pages.update, page_id=page_id, properties=properties)
+                # The new body goes in before the old one is removed, so a failure
+                # in between leaves a page with duplicated content rather than none
+                old_block_ids = await self._list_block_ids(page_id)
+                await self._append_blocks(page_id, blocks, existing=len(old_block_ids))
+                await self._delete_blocks(old_block_ids)
+                action = "updated"
+            logger.info(f"Successfully {action} digest {digest.unique_id} in Notion.")
             return True
         except Exception as e:
             logger.error(f"Failed to publish digest {digest.unique_id} to Notion: {e}")
             return False
 
+    async def fetch_published_urls(self) -> List[str]:
+        """Return the URL of every page already in the Notion database."""
+        data_source_id = await self._get_data_source_id()
+        pages = await async_collect_paginated_api(
+            lambda **kwargs: self._call(self.client.data_sources.query, **kwargs),
+            data_source_id=data_source_id,
+        )
+        urls = [page.get("properties", {}).get("URL", {}).get("url") for page in pages]
+        return [url for url in urls if url]
+
+    async def _call(self, method: Callable[..., Awaitable[Any]], retries: Optional[int] = None, **kwargs) -> Any:
+        """Call a Notion endpoint within the rate limit, retrying 429 and 5xx responses up to `retries` times."""
+        endpoint = getattr(method, "__qualname__", "unknown")
+        retries = settings.NOTION_MAX_RETRIES if retries is None else retries
+        for attempt in range(retries + 1):
+            await self._rate_limiter.acquire()
+            start = time.perf_counter()
+            try:
+                result = await method(**kwargs)
+                NOTION_REQUEST_DURATION.observe(time.perf_counter() - start, endpoint=endpoint)
+                NOTION_REQUESTS.inc(endpoint=endpoint, outcome="ok")
+                return result
+            except HTTPResponseError as e:
+                NOTION_REQUESTS.inc(endpoint=endpoint, outcome=str(e.status))
+                if (e.status != 429 and e.status < 500) or attempt == retries:
+                    raise
+                delay = self._retry_delay(e, attempt)
+                logger.warning(f"Notion returned {e.status}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Whether a failed call may be repeated: a timeout, a 429 or a 5xx response."""
+        status = getattr(error, "status", None)
+        return status is None or status == 429 or status >= 500
+
+    @staticmethod
+    def _retry_delay(error: Exception, attempt: int) -> float:
+        """The Retry-After delay of a failed call, or else an exponential backoff delay."""
+        headers = getattr(error, "headers", None)
+        retry_after = parse_retry_after(headers.get("Retry-After") if headers else None)
+        if retry_after is not None:
+            return retry_after
+        return backoff_delay(attempt, settings.HTTP_BACKOFF_BASE, settings.HTTP_BACKOFF_MAX)
+
+    async def _create_page(
+        self, digest: DailyDigest, properties: Dict[str, Any], children: List[Dict[str, Any]]
+    ) -> Tuple[str, bool]:
+        """Create the page of a digest; returns its ID and whether this call created it.
+
+        `pages.create` is not idempotent: a 5xx or a timeout may come after
+        Notion stored the page. Before each retry the database is queried
+        again, and a page found there is returned to be updated instead.
+        """
+        for attempt in range(settings.NOTION_MAX_RETRIES + 1):
+            try:
+                page = await self._call(
+                    self.client.pages.create,
+                    retries=0,
+                    parent={"database_id": self.database_id},
+                    properties=properties,
+                    children=children,
+                )
+                return page["id"], True
+            except (HTTPResponseError, RequestTimeoutError) as e:
+                if not self._is_retryable(e) or attempt == settings.NOTION_MAX_RETRIES:
+                    raise
+                page_id = await self._find_page_id(digest)
+                if page_id:
+                    logger.info(f"Page of digest {digest.unique_id} was created despite the error, updating it.")
+                    return page_id, False
+                delay = self._retry_delay(e, attempt)
+                logger.warning(f"Creating a Notion page failed ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def _get_data_source_id(self) -> str:
+        """Resolve (and remember) the data source backing the configured database."""
+        if self._data_source_id is None:
+            database = await self._call(self.client.databases.retrieve, database_id=self.database_id)
+            self._data_source_id = database["data_sources"][0]["id"]
+        return self._data_source_id
+
+    async def _find_page_id(self, digest: DailyDigest) -> Optional[str]:
+        """Return the ID of the page already holding this digest, if any."""
+        response = await self._call(
+            self.client.data_sources.query,
+            data_source_id=await self._get_data_source_id(),
+            filter={"property": "URL", "url": {"equals": digest.core_content.url}},
+            page_size=1,
+        )
+        results = response.get("results", [])
+        return results[0]["id"] if results else None
+
+    async def _list_block_ids(self, page_id: str) -> List[str]:
+        """The IDs of the body blocks of a page."""
+        cursor = None
+        block_ids = []
+        while True:
+            kwargs = {"block_id": page_id, "page_size": MAX_BLOCKS_PER_REQUEST}
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            response = await self._call(self.client.blocks.children.list, **kwargs)
+            block_ids.extend(block["id"] for block in response.get("results", []))
+            if not response.get("has_more"):
+                break
+            cursor = response.get("next_cursor")
+        return block_ids
+
+    async def _delete_blocks(self, block_ids: List[str]):
+        """Delete body blocks of a page."""
+        await asyncio.gather(*[self._call(self.client.blocks.delete, block_id=block_id) for block_id in block_ids])
+
+    async def _append_blocks(self, page_id: str, blocks: List[Dict[str, Any]], existing: int):
+        """Append body blocks in batches of MAX_BLOCKS_PER_REQUEST, preserving their order.
+
+        `blocks.children.append` is not idempotent either: a 5xx or a timeout
+        may come after Notion appended the batch. `existing` is the number of
+        blocks on the page before the first batch; after such an error the
+        blocks are counted again and the batch is only resent if it is
+        missing. Rate limited batches were not applied and are resent directly.
+        """
+        for start in range(0, len(blocks), MAX_BLOCKS_PER_REQUEST):
+            batch = blocks[start:start + MAX_BLOCKS_PER_REQUEST]
+            for attempt in range(settings.NOTION_MAX_RETRIES + 1):
+                try:
+                    await self._call(self.client.blocks.children.append, retries=0, block_id=page_id, children=batch)
+                    break
+                except (HTTPResponseError, RequestTimeoutError) as e:
+                    if not self._is_retryable(e) or attempt == settings.NOTION_MAX_RETRIES:
+                        raise
+                    if getattr(e, "status", None) != 429:
+                        count = len(await self._list_block_ids(page_id))
+                        if count == existing + len(batch):
+                            logger.info(f"Blocks were appended to page {page_id} despite the error, continuing.")
+                            break
+                        if count != existing:
+                            logger.error(f"Page {page_id} has {count} blocks, expected {existing}; not appending again.")
+                            raise
+                    delay = self._retry_delay(e, attempt)
+                    logger.warning(f"Appending blocks to Notion failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+            existing += len(batch)
+
     def _split_text_into_rich_text_chunks(self, text: str, max_length: int = 2000) -> list[Dict[str, Any]]:
         """Splits a long string into a list of Notion rich text objects, each under max_length."""
         chunks = []
@@ -44,14 +218,63 @@ class NotionPublisher(Publisher):
         # Adding 'type': 'text' to ensure compatibility
         return [{"type": "text", "text": {"content": chunk["text"]["content"]}} for chunk in chunks]
 
+    def _format_body_blocks(self, digest: DailyDigest) -> List[Dict[str, Any]]:
+        """Format the summary and original content into page body blocks."""
+        blocks = []
+        sections = [("Summary", digest.analysis_summary.summary)]
+        if digest.core_content.related_urls:
+            sections.append(("Related Coverage", "\n".join(digest.core_content.related_urls)))
+        analysis = self._format_analysis(digest)
+        if analysis:
+            sections.append(("Analysis", analysis))
+        sections.append(("Original Content", digest.core_content.original_content))
+        for heading, text in sections:
+            blocks.append({
+                "object": "block",
+                "type": "heading_2",
+                "heading_2": {"rich_text": [{"type": "text", "text": {"content": heading}}]},
+            })
+            for paragraph in text.split("\n"):
+                if not paragraph.strip():
+                    continue
+                # One block per rich text chunk keeps every block under Notion's size limits
+                for chunk in self._split_text_into_rich_text_chunks(paragraph):
+                    blocks.append({
+                        "object": "block",
+                        "type": "paragraph",
+                        "paragraph": {"rich_text": [chunk]},
+                    })
+        return blocks
+
+    @staticmethod
+    def _format_analysis(digest: DailyDigest) -> str:
+        """Render the structured analysis fields (if any were filled) as text lines."""
+        analysis = digest.analysis_summary
+        lines = []
+        if analysis.category:
+            secondary = f" ({', '.join(analysis.category.secondary)})" if analysis.category.secondary else ""
+            lines.append(f"Category: {analysis.category.primary}{secondary}")
+        if analysis.sentiment:
+            score = f" ({analysis.sentiment.score:+.2f})" if analysis.sentiment.score is not None else ""
+            lines.append(f"Sentiment: {analysis.sentiment.label}{score}")
+        if analysis.key_entities:
+            for label, names in (
+                ("Persons", analysis.key_entities.persons),
+                ("Organizations", analysis.key_entities.organizations),
+                ("Locations", analysis.key_entities.locations),
+            ):
+                if names:
+                    lines.append(f"{label}: {', '.join(names)}")
+        lines.extend(f"Claim ({claim.verification_status}): {claim.claim}" for claim in analysis.factual_claims)
+        return "\n".join(lines)
 
     def _format_properties(self, digest: DailyDigest) -> Dict[str, Any]:
-        logger.debug(f"Formatting properties for digest {digest.unique_id}.")
+        logger.debug("Formatting properties for digest %s.", digest.unique_id)
         """Format the digest into Notion page properties."""
         # This is a simplified example. You will need to customize this based on your
         # Notion database schema.
         return {
-            "Title": {"title": [{"text": {"content": digest.core_content.title}}]},            
+            "Title": {"title": [{"text": {"content": digest.core_content.title}}]},
             "URL": {"url": digest.core_content.url},
             "Summary": {"rich_text": self._split_text_into_rich_text_chunks(digest.analysis_summary.summary)},
             "Keywords": {"rich_text": [{"text": {"content": ", ".join(digest.analysis_summary.keywords)}}]},
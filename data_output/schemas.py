@@ -43,6 +43,8 @@ class CoreContent(BaseModel):
     media_type: str
     language: str
     original_content: str
+    # Earlier coverage of the same story (near-duplicate articles)
+    related_urls: List[str] = []
 
 
 class AnalysisSummary(BaseModel):
@@ -54,6 +56,11 @@ class AnalysisSummary(BaseModel):
     factual_claims: List[FactualClaim] = []
 
 
+class StoryAnalysis(AnalysisSummary):
+    """Structured LLM response covering an article and its comments in one call."""
+    comment_summary: Optional[str] = None
+
+
 class DailyDigest(BaseModel):
     unique_id: str
     retrieval_info: RetrievalInfo
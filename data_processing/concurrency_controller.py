@@ -0,0 +1,110 @@
+import asyncio
+import time
+from collections import deque
+from typing import Deque, Optional
+
+from utils.logger import get_logger
+from utils.metrics import LLM_CONCURRENCY_LIMIT, LLM_IN_FLIGHT, LLM_QUEUE_DEPTH
+
+logger = get_logger(__name__)
+
+OK = "ok"
+OVERLOADED = "overloaded"
+FAILED = "failed"
+
+
+class AdaptiveConcurrencyController:
+    """Limits in-flight LLM requests with additive-increase/multiplicative-decrease.
+
+    Every request whose latency is within the target raises the limit by
+    `increase / limit`, i.e. by up to `increase` per round trip, as long as
+    at least half of the current limit is in use. A request rejected for
+    overload (429, 5xx or a timeout) multiplies the limit by `backoff`;
+    requests that were already in flight when the limit was cut do not cut
+    it again, so one burst of rejections counts as a single congestion event.
+    Other failures leave the limit unchanged.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        increase: float = 1.0,
+        backoff: float = 0.5,
+        latency_target: Optional[float] = None,
+    ):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_target = latency_target
+        self._limit = float(min(self.maximum, max(self.minimum, initial)))
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = float("-inf")
+        self._update_gauges()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    async def acquire(self) -> float:
+        """Wait for a slot and return the time it was granted, to be passed to `release`."""
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            self._update_gauges()
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.cancelled():
+                    if waiter in self._waiters:
+                        self._waiters.remove(waiter)
+                else:
+                    # The slot was handed over just before the cancellation
+                    self._in_flight -= 1
+                    self._wake()
+                self._update_gauges()
+                raise
+        self._update_gauges()
+        return time.monotonic()
+
+    def release(self, started: float, outcome: str, latency: Optional[float] = None):
+        """Free the slot of a request and adapt the limit to its outcome."""
+        # Only grow a limit that is being used, or it would climb without bound
+        saturated = self._in_flight * 2 >= self.limit
+        self._in_flight -= 1
+        if outcome == OVERLOADED:
+            if started >= self._last_decrease:
+                previous = self.limit
+                self._limit = max(float(self.minimum), self._limit * self.backoff)
+                self._last_decrease = time.monotonic()
+                logger.info(f"LLM provider is overloaded, concurrency limit {previous} -> {self.limit}.")
+        elif outcome == OK and saturated:
+            if self.latency_target is None or latency is None or latency <= self.latency_target:
+                self._limit = min(float(self.maximum), self._limit + self.increase / self._limit)
+        self._wake()
+        self._update_gauges()
+
+    def _wake(self):
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    def _update_gauges(self):
+        LLM_CONCURRENCY_LIMIT.set(self.limit)
+        LLM_IN_FLIGHT.set(self._in_flight)
+        LLM_QUEUE_DEPTH.set(self.queue_depth)
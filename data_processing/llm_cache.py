@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters of a cache since it was opened or the current run started."""
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LLMCache:
+    """Content-addressed cache of LLM completions with a TTL and LRU eviction."""
+
+    def __init__(self, path: str, ttl: float, max_entries: int):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                completion TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_completions_access ON completions (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model: str, system_message: str, prompt: str, params: Dict[str, Any]) -> str:
+        """Hash everything that influences a completion into a cache key."""
+        payload = json.dumps(
+            {"model": model, "system": system_message, "prompt": prompt, "params": params},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return a cached completion that is younger than the TTL."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT completion FROM completions WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl),
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                return None
+            self._conn.execute("UPDATE completions SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats.hits += 1
+        return row[0]
+
+    def put(self, key: str, model: str, completion: str):
+        """Store a completion, evicting expired and least recently used entries."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)",
+                (key, model, completion, now, now),
+            )
+            cursor = self._conn.execute("DELETE FROM completions WHERE created_at <= ?", (now - self.ttl,))
+            self.stats.evictions += cursor.rowcount
+            cursor = self._conn.execute(
+                """
+                DELETE FROM completions WHERE key IN (
+                    SELECT key FROM completions ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            self.stats.evictions += cursor.rowcount
+            self._conn.commit()
+
+    def describe(self) -> Dict[str, Any]:
+        """Entry counts per model and the number of expired entries, for cache inspection."""
+        with self._lock:
+            rows = self._conn.execute("SELECT model, COUNT(*) FROM completions GROUP BY model").fetchall()
+            expired = self._conn.execute(
+                "SELECT COUNT(*) FROM completions WHERE created_at <= ?", (time.time() - self.ttl,)
+            ).fetchone()[0]
+        return {"entries": sum(count for _, count in rows), "expired": expired, "by_model": dict(rows)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,12 +1,31 @@
-from typing import List, Dict, Any, Optional
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
 
-from openai import AsyncOpenAI
+import httpx
+from openai import APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
+from pydantic import ValidationError
 
 from config.settings import settings
-from config.llm_params import LLM_MODELS, LLM_SETTINGS
+from config.llm_params import LLM_MODEL_PRICES, LLM_MODELS, LLM_SETTINGS
 from config.prompts import PROMPTS
+from data_output.schemas import StoryAnalysis
 from data_processing.base import Processor
+from data_processing.concurrency_controller import FAILED, OK, OVERLOADED, AdaptiveConcurrencyController
+from data_processing.llm_cache import CacheStats, LLMCache
+from data_processing.model_router import ModelRouter
+from data_processing.text_chunker import chunk_text, estimate_tokens, truncate_to_tokens
 from utils.logger import get_logger
+from utils.metrics import (
+    LLM_COST,
+    LLM_FIRST_TOKEN,
+    LLM_HEDGES,
+    LLM_REQUEST_DURATION,
+    LLM_REQUESTS,
+    LLM_TOKENS,
+    percentile,
+)
 
 logger = get_logger(__name__)
 
@@ -19,23 +38,110 @@ class LLMSummarizer(Processor):
             api_key=settings.LLM_API_KEY,
             base_url=settings.LLM_BASE_URL,
         )
+        # Hedged requests go to a second endpoint if one is configured
+        self.hedge_client = (
+            AsyncOpenAI(
+                api_key=settings.LLM_HEDGE_API_KEY or settings.LLM_API_KEY,
+                base_url=settings.LLM_HEDGE_BASE_URL,
+            )
+            if settings.LLM_HEDGE_BASE_URL
+            else self.client
+        )
+        self._first_token_times: Dict[str, Deque[float]] = {}
+        self.cache = (
+            LLMCache(settings.LLM_CACHE_PATH, settings.LLM_CACHE_TTL, settings.LLM_CACHE_MAX_ENTRIES)
+            if settings.LLM_CACHE_ENABLED
+            else None
+        )
+        # Shared by every request of this summarizer; a hedged request takes a slot of its own
+        self.concurrency = (
+            AdaptiveConcurrencyController(
+                initial=settings.LLM_CONCURRENCY_INITIAL,
+                minimum=settings.LLM_CONCURRENCY_MIN,
+                maximum=settings.LLM_CONCURRENCY_MAX,
+                backoff=settings.LLM_CONCURRENCY_BACKOFF,
+                latency_target=settings.LLM_CONCURRENCY_LATENCY_TARGET,
+            )
+            if settings.LLM_ADAPTIVE_CONCURRENCY
+            else None
+        )
+        self.router = (
+            ModelRouter(
+                task_models=LLM_MODELS,
+                prices=LLM_MODEL_PRICES,
+                small_input_tokens=settings.LLM_ROUTER_SMALL_INPUT_TOKENS,
+                latency_target=settings.LLM_ROUTER_LATENCY_TARGET,
+                max_error_rate=settings.LLM_ROUTER_MAX_ERROR_RATE,
+                window_seconds=settings.LLM_ROUTER_WINDOW_SECONDS,
+                min_samples=settings.LLM_ROUTER_MIN_SAMPLES,
+                cost_ceiling=settings.LLM_COST_CEILING,
+            )
+            if settings.LLM_ROUTING_ENABLED
+            else None
+        )
+
+    def start_run(self):
+        """Reset the per-run state kept by a long-lived summarizer: spend and cache statistics."""
+        if self.router:
+            self.router.reset_spent()
+        if self.cache:
+            self.cache.stats = CacheStats()
+
+    def _choose_model(self, task: str, text: str) -> str:
+        """Route a request to a model, or use the configured model when routing is disabled."""
+        if self.router:
+            return self.router.choose(task, estimate_tokens(text))
+        return LLM_MODELS[task]
 
     async def summarize_content(
-        self, content: str, model: str = LLM_MODELS["summarize_content"]
+        self, content: str, model: Optional[str] = None
     ) -> Optional[str]:
-        logger.debug(f"Summarizing content using model: {model}")
         """Summarize a single content string."""
         if not content:
             logger.info("No content provided for summarization.")
             return None
         
+        if estimate_tokens(content) > settings.LLM_STORY_TOKEN_BUDGET:
+            logger.info(
+                f"Content of ~{estimate_tokens(content)} tokens exceeds the story budget, "
+                f"truncating to {settings.LLM_STORY_TOKEN_BUDGET} tokens."
+            )
+            content = truncate_to_tokens(content, settings.LLM_STORY_TOKEN_BUDGET)
+        model = model or self._choose_model("summarize_content", content)
+        logger.debug("Summarizing content using model: %s", model)
+
+        if estimate_tokens(content) > settings.LLM_CHUNK_TOKENS:
+            return await self._summarize_in_chunks(content, model)
+
         prompt = PROMPTS["summarize_content"].format(content=content)
         return await self._get_completion(prompt, model)
 
+    async def _summarize_in_chunks(self, content: str, model: str) -> Optional[str]:
+        """Map-reduce summarization: summarize chunks in parallel, then merge them."""
+        chunks = chunk_text(content, settings.LLM_CHUNK_TOKENS)
+        logger.debug("Summarizing content in %d chunks using model: %s", len(chunks), model)
+        partial_summaries = await asyncio.gather(*[
+            self._get_completion(
+                PROMPTS["summarize_chunk"].format(index=index, total=len(chunks), content=chunk),
+                model,
+            )
+            for index, chunk in enumerate(chunks, start=1)
+        ])
+        partial_summaries = [summary for summary in partial_summaries if summary]
+        if not partial_summaries:
+            return None
+        if len(partial_summaries) == 1:
+            return partial_summaries[0]
+
+        merged = "\n\n".join(
+            f"Part {index}:\n{summary}" for index, summary in enumerate(partial_summaries, start=1)
+        )
+        prompt = PROMPTS["merge_summaries"].format(content=merged)
+        return await self._get_completion(prompt, model)
+
     async def summarize_comments(
-        self, comments: List[Dict[str, Any]], model: str = LLM_MODELS["summarize_comments"]
+        self, comments: List[Dict[str, Any]], model: Optional[str] = None
     ) -> Optional[str]:
-        logger.debug(f"Summarizing comments using model: {model}")
         """Summarize a list of comments."""
         if not comments:
             logger.info("No comments provided for summarization.")
@@ -45,34 +151,280 @@ class LLMSummarizer(Processor):
             comment.get("text", "") for comment in comments if comment.get("text")
         ]
         full_text = " ".join(comment_texts)
+        model = model or self._choose_model("summarize_comments", full_text)
+        logger.debug("Summarizing comments using model: %s", model)
         prompt = PROMPTS["summarize_comments"].format(content=full_text)
         return await self._get_completion(prompt, model)
 
-    async def _get_completion(self, prompt: str, model: str) -> Optional[str]:
-        logger.debug(f"Getting LLM completion for model: {model}, prompt length: {len(prompt)}")
+    async def analyze_story(
+        self,
+        content: str,
+        comments: List[Dict[str, Any]],
+        model: Optional[str] = None,
+    ) -> Optional[StoryAnalysis]:
+        """Summarize an article and its comments in one JSON-schema call.
+
+        Returns None when the article needs map-reduce summarization or the
+        response does not validate, so the caller can fall back to
+        `summarize_content` and `summarize_comments`.
+        """
+        if not content:
+            logger.info("No content provided for analysis.")
+            return None
+        comment_text = "\n".join(comment["text"] for comment in comments if comment.get("text"))
+        if estimate_tokens(content) + estimate_tokens(comment_text) > settings.LLM_CHUNK_TOKENS:
+            logger.info("Story is too long for a single structured call, using separate summaries.")
+            return None
+        model = model or self._choose_model("analyze_story", content + comment_text)
+        logger.debug("Analyzing story using model: %s", model)
+
+        prompt = PROMPTS["analyze_story"].format(content=content, comments=comment_text or "(no comments)")
+        response_format = {
+            "type": "json_schema",
+            "json_schema": {"name": "story_analysis", "schema": StoryAnalysis.model_json_schema()},
+        }
+        completion = await self._get_completion(prompt, model, response_format=response_format)
+        if not completion:
+            return None
+        try:
+            return StoryAnalysis.model_validate_json(self._strip_code_fence(completion))
+        except ValidationError as e:
+            logger.warning(f"Structured LLM response did not match the schema: {e.error_count()} errors.")
+            return None
+
+    @staticmethod
+    def _strip_code_fence(text: str) -> str:
+        """Remove a ```json ... ``` wrapper some models put around JSON output."""
+        text = text.strip()
+        if text.startswith("```"):
+            text = text.split("\n", 1)[1] if "\n" in text else ""
+            text = text.rsplit("```", 1)[0]
+        return text
+
+    async def _get_completion(
+        self,
+        prompt: str,
+        model: str,
+        response_format: Optional[Dict[str, Any]] = None,
+        allow_fallback: bool = True,
+    ) -> Optional[str]:
+        logger.debug("Getting LLM completion for model: %s, prompt length: %d", model, len(prompt))
         """Get completion from the LLM."""
+        system_message = PROMPTS["system_message"]
+        params = {
+            "max_tokens": LLM_SETTINGS["max_tokens"],
+            "temperature": LLM_SETTINGS["temperature"],
+            "top_p": LLM_SETTINGS["top_p"],
+        }
+        if response_format:
+            params["response_format"] = response_format
+        cache_key = None
+        if self.cache:
+            cache_key = LLMCache.make_key(model, system_message, prompt, params)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("LLM cache hit for model: %s", model)
+                LLM_REQUESTS.inc(model=model, outcome="cache_hit")
+                return cached
+
+        messages = [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt},
+        ]
+        start = time.perf_counter()
         try:
-            response = await self.client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": PROMPTS["system_message"]},
-                    {"role": "user", "content": prompt},
-                ],
-                max_tokens=LLM_SETTINGS["max_tokens"],
-                temperature=LLM_SETTINGS["temperature"],
-                top_p=LLM_SETTINGS["top_p"],
-                timeout=settings.LLM_TIMEOUT,
-            )
-            # logger.debug(f"Full response: {response}")
-            if hasattr(response, 'choices') and response.choices:
-                return response.choices[0].message.content
+            completion, usage = await self._limited_request(self._request, model, messages, params)
+            latency = time.perf_counter() - start
+            LLM_REQUEST_DURATION.observe(latency, model=model)
+            cost = self._record_usage(model, usage)
+            if self.router:
+                self.router.record(model, latency, ok=True, cost=cost)
+            if completion:
+                if self.cache:
+                    self.cache.put(cache_key, model, completion)
+                LLM_REQUESTS.inc(model=model, outcome="ok")
+                return completion
             else:
-                logger.error(f"LLM response did not contain expected 'choices' attribute or was empty. Full response: {response}")
+                LLM_REQUESTS.inc(model=model, outcome="error")
+                logger.error(f"LLM response from {model} was empty.")
                 return None
+        except APITimeoutError:
+            LLM_REQUESTS.inc(model=model, outcome="timeout")
+            if self.router:
+                self.router.record(model, time.perf_counter() - start, ok=False)
+            fallback = self.router.cheaper(model) if self.router and allow_fallback else None
+            if fallback:
+                logger.warning(f"LLM request to {model} timed out, retrying with {fallback}.")
+                return await self._get_completion(prompt, fallback, response_format, allow_fallback=False)
+            logger.error(f"LLM request to {model} timed out after {settings.LLM_TIMEOUT}s.")
+            return None
         except Exception as e:
+            LLM_REQUESTS.inc(model=model, outcome="error")
+            if self.router:
+                self.router.record(model, time.perf_counter() - start, ok=False)
             logger.error(f"Error getting completion from LLM: {e}")
             return None
 
+    async def _limited_request(self, request: Callable[..., Awaitable[Any]], *args) -> Any:
+        """Run `request(*args)` in a slot of the adaptive concurrency limit, reporting overload back to it."""
+        if not self.concurrency:
+            return await request(*args)
+        started = await self.concurrency.acquire()
+        outcome = FAILED
+        try:
+            result = await request(*args)
+            outcome = OK
+            return result
+        except (APITimeoutError, RateLimitError, InternalServerError):
+            outcome = OVERLOADED
+            raise
+        finally:
+            self.concurrency.release(started, outcome, latency=time.monotonic() - started)
+
+    async def _request(
+        self, model: str, messages: List[Dict[str, str]], params: Dict[str, Any]
+    ) -> Tuple[Optional[str], Any]:
+        """Run one completion and return its text and usage.
+
+        With hedging, a duplicate request is fired when the first token of
+        the primary one is later than the observed p90; whichever finishes
+        first wins and the other one is cancelled. The hedged request waits
+        for a concurrency slot of its own, so hedging never exceeds the
+        adaptive limit.
+        """
+        if not settings.LLM_STREAMING:
+            response = await self.client.chat.completions.create(
+                model=model, messages=messages, timeout=settings.LLM_TIMEOUT, **params
+            )
+            choices = getattr(response, "choices", None)
+            return (choices[0].message.content if choices else None), getattr(response, "usage", None)
+
+        first_token = asyncio.Event()
+        primary = asyncio.create_task(self._stream(self.client, model, messages, params, first_token))
+        hedge_delay = self._hedge_delay(model)
+        if hedge_delay is None:
+            return await primary
+
+        first_token_wait = asyncio.create_task(first_token.wait())
+        try:
+            await asyncio.wait({primary, first_token_wait}, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        finally:
+            first_token_wait.cancel()
+        if primary.done() or first_token.is_set():
+            return await primary
+
+        logger.info(f"No first token from {model} after {hedge_delay:.1f}s, sending a hedged request.")
+        LLM_HEDGES.inc(model=model, outcome="fired")
+        hedge = asyncio.create_task(
+            self._limited_request(self._stream, self.hedge_client, model, messages, params, asyncio.Event())
+        )
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        LLM_HEDGES.inc(model=model, outcome="hedge_won" if task is hedge else "primary_won")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _stream(
+        self,
+        client: AsyncOpenAI,
+        model: str,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any],
+        first_token: asyncio.Event,
+    ) -> Tuple[Optional[str], Any]:
+        """Stream a completion, collecting its chunks and measuring the time to the first token.
+
+        A stream that times out or is cancelled (hedged away) before its
+        first token still contributes its elapsed time to the hedge delay
+        samples, so that slow requests do not bias the delay low.
+        """
+        start = time.perf_counter()
+        try:
+            return await self._read_stream(client, model, messages, params, first_token, start)
+        except (APITimeoutError, asyncio.CancelledError):
+            if not first_token.is_set():
+                self._first_token_times.setdefault(model, deque(maxlen=100)).append(time.perf_counter() - start)
+            raise
+
+    async def _read_stream(
+        self,
+        client: AsyncOpenAI,
+        model: str,
+        messages: List[Dict[str, str]],
+        params: Dict[str, Any],
+        first_token: asyncio.Event,
+        start: float,
+    ) -> Tuple[Optional[str], Any]:
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            timeout=settings.LLM_TIMEOUT,
+            stream=True,
+            stream_options={"include_usage": True},
+            **params,
+        )
+        parts: List[str] = []
+        usage = None
+        try:
+            async for chunk in stream:
+                if getattr(chunk, "usage", None):
+                    usage = chunk.usage
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                if not first_token.is_set():
+                    first_token.set()
+                    elapsed = time.perf_counter() - start
+                    LLM_FIRST_TOKEN.observe(elapsed, model=model)
+                    self._first_token_times.setdefault(model, deque(maxlen=100)).append(elapsed)
+                parts.append(chunk.choices[0].delta.content)
+        except (httpx.TimeoutException, httpx.RemoteProtocolError) as e:
+            # Errors while reading the body bypass the SDK's mapping to APITimeoutError
+            try:
+                request = e.request
+            except RuntimeError:
+                request = None
+            raise APITimeoutError(request=request) from e
+        finally:
+            await stream.close()
+        return "".join(parts) or None, usage
+
+    def _hedge_delay(self, model: str) -> Optional[float]:
+        """Seconds to wait for a first token before hedging, or None if hedging is off."""
+        if not settings.LLM_HEDGE_ENABLED:
+            return None
+        samples = self._first_token_times.get(model, ())
+        if len(samples) < settings.LLM_HEDGE_MIN_SAMPLES:
+            return settings.LLM_HEDGE_INITIAL_DELAY
+        return percentile(list(samples), settings.LLM_HEDGE_QUANTILE)
+
+    @staticmethod
+    def _record_usage(model: str, usage: Any) -> float:
+        """Account prompt/completion tokens and return their estimated cost from the API usage field."""
+        if usage is None:
+            return 0.0
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        LLM_TOKENS.inc(prompt_tokens, model=model, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, model=model, kind="completion")
+        prices = LLM_MODEL_PRICES.get(model)
+        if not prices:
+            return 0.0
+        cost = (prompt_tokens * prices["prompt"] + completion_tokens * prices["completion"]) / 1_000_000
+        LLM_COST.inc(cost, model=model)
+        return cost
+
     async def process(self, raw_data: Dict[str, Any]) -> Any:
         # This method is part of the abstract base class, but the main logic
         # will be in a higher-level orchestrator that calls summarize_content
@@ -0,0 +1,64 @@
+import hashlib
+import re
+from typing import List, Optional, Sequence, Set
+
+_WORD_RE = re.compile(r"\w+")
+EMPTY_BIN = 1 << 64
+# Keeps borrowed values distinct from the bin they were borrowed from
+DENSIFY_OFFSET = 1 << 58
+
+
+def shingles(text: str, size: int) -> Set[str]:
+    """Every run of `size` consecutive lowercase words of a text."""
+    words = _WORD_RE.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(text: str, num_perm: int, shingle_size: int, min_words: int = 0) -> Optional[List[int]]:
+    """One-permutation MinHash signature of the word shingles of a text.
+
+    Each shingle is hashed once; the hash picks one of `num_perm` bins and
+    the bin keeps its smallest value. Empty bins borrow the value of the
+    next non-empty bin (rotation densification), so short texts still get
+    comparable signatures. Returns None for texts shorter than `min_words`.
+    Runs in the extraction executor, so it must stay a picklable top-level
+    function.
+    """
+    if len(_WORD_RE.findall(text)) < max(min_words, 1):
+        return None
+    bins = [EMPTY_BIN] * num_perm
+    for shingle in shingles(text, shingle_size):
+        value = int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+        index, value = value % num_perm, value // num_perm
+        if value < bins[index]:
+            bins[index] = value
+    signature = list(bins)
+    for index in range(num_perm):
+        distance = 1
+        while signature[index] == EMPTY_BIN:
+            borrowed = bins[(index + distance) % num_perm]
+            if borrowed != EMPTY_BIN:
+                signature[index] = (borrowed + distance * DENSIFY_OFFSET) % EMPTY_BIN
+            distance += 1
+    return signature
+
+
+def estimate_similarity(first: Sequence[int], second: Sequence[int]) -> float:
+    """Estimated Jaccard similarity of two signatures: the fraction of equal positions."""
+    if not first or len(first) != len(second):
+        return 0.0
+    return sum(1 for a, b in zip(first, second) if a == b) / len(first)
+
+
+def band_keys(signature: Sequence[int], bands: int) -> List[str]:
+    """LSH bucket keys, one per band; similar signatures share at least one with high probability."""
+    rows = len(signature) // bands
+    return [
+        hashlib.blake2b(
+            ",".join(str(value) for value in signature[band * rows:(band + 1) * rows]).encode(),
+            digest_size=8,
+        ).hexdigest()
+        for band in range(bands)
+    ]
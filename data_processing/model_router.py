@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from utils.logger import get_logger
+from utils.metrics import LLM_ROUTES, percentile
+
+logger = get_logger(__name__)
+
+# Completion tokens assumed when estimating the cost of a request up front
+EXPECTED_COMPLETION_TOKENS = 1000
+
+
+class ModelRouter:
+    """Picks the model for each LLM request.
+
+    Models are ranked from cheapest to most expensive by their prompt price.
+    A task starts from its configured model and is moved to a cheaper tier
+    when the input is small, when the model's recent p95 latency or error
+    rate is unhealthy, or when the request would exceed the run's cost
+    ceiling. Health is judged on a time window, so a downgraded model is
+    tried again once its bad samples have aged out.
+    """
+
+    def __init__(
+        self,
+        task_models: Dict[str, str],
+        prices: Dict[str, Dict[str, float]],
+        small_input_tokens: int,
+        latency_target: float,
+        max_error_rate: float,
+        window_seconds: float,
+        min_samples: int,
+        cost_ceiling: Optional[float] = None,
+    ):
+        self.task_models = task_models
+        self.prices = prices
+        self.tiers: List[str] = sorted(prices, key=lambda model: prices[model]["prompt"])
+        self.small_input_tokens = small_input_tokens
+        self.latency_target = latency_target
+        self.max_error_rate = max_error_rate
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.cost_ceiling = cost_ceiling
+        self.spent = 0.0
+        # model -> (timestamp, latency, ok) of recent requests
+        self._samples: Dict[str, Deque[Tuple[float, float, bool]]] = {}
+        self._lock = threading.Lock()
+
+    def choose(self, task: str, prompt_tokens: int) -> str:
+        """Return the model to use for a request of `task` with about `prompt_tokens` input tokens."""
+        model = self.task_models[task]
+        reason = "default"
+        if prompt_tokens <= self.small_input_tokens and self.cheaper(model):
+            model, reason = self.cheaper(model), "small_input"
+        while not self.is_healthy(model) and self.cheaper(model):
+            model, reason = self.cheaper(model), "unhealthy"
+        if self.cost_ceiling is not None:
+            while self.spent + self.estimate_cost(model, prompt_tokens) > self.cost_ceiling and self.cheaper(model):
+                model, reason = self.cheaper(model), "cost_ceiling"
+        LLM_ROUTES.inc(task=task, model=model, reason=reason)
+        return model
+
+    def cheaper(self, model: str) -> Optional[str]:
+        """The next cheaper model tier, or None for the cheapest (or an unknown) model."""
+        if model not in self.tiers:
+            return None
+        index = self.tiers.index(model)
+        return self.tiers[index - 1] if index > 0 else None
+
+    def estimate_cost(self, model: str, prompt_tokens: int) -> float:
+        prices = self.prices.get(model)
+        if not prices:
+            return 0.0
+        return (prompt_tokens * prices["prompt"] + EXPECTED_COMPLETION_TOKENS * prices["completion"]) / 1_000_000
+
+    def reset_spent(self):
+        """Start a new run: the cost ceiling applies to what is spent from now on."""
+        with self._lock:
+            self.spent = 0.0
+
+    def record(self, model: str, latency: float, ok: bool, cost: float = 0.0):
+        """Record the outcome of a request to `model`."""
+        with self._lock:
+            self.spent += cost
+            self._samples.setdefault(model, deque(maxlen=200)).append((time.monotonic(), latency, ok))
+
+    def is_healthy(self, model: str) -> bool:
+        """Whether the recent p95 latency and error rate of a model are within the targets."""
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            samples = [sample for sample in self._samples.get(model, ()) if sample[0] >= cutoff]
+        if len(samples) < self.min_samples:
+            return True
+        error_rate = sum(1 for _, _, ok in samples if not ok) / len(samples)
+        p95 = percentile([latency for _, latency, ok in samples if ok], 0.95)
+        if error_rate > self.max_error_rate or (p95 is not None and p95 > self.latency_target):
+            logger.debug("Model %s is unhealthy: p95 %s s, error rate %.0f%%.", model, p95, error_rate * 100)
+            return False
+        return True
@@ -0,0 +1,56 @@
+import math
+import re
+from typing import List, Tuple
+
+# Rough average for English prose with BPE-style tokenizers
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text without calling a tokenizer."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut a text down to roughly max_tokens, preferring a paragraph boundary."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    return text[:cut if cut > max_chars // 2 else max_chars]
+
+
+def chunk_text(text: str, max_tokens: int) -> List[str]:
+    """Split a text into chunks of at most max_tokens estimated tokens.
+
+    Paragraphs are kept together where possible; longer paragraphs are split
+    on sentence boundaries and, as a last resort, at a hard character limit.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    # (separator, text): pieces of one chunk are re-joined the way they were
+    # split, with a newline between paragraphs and a space between sentences
+    pieces: List[Tuple[str, str]] = []
+    for paragraph in text.split("\n"):
+        if len(paragraph) <= max_chars:
+            pieces.append(("\n", paragraph))
+            continue
+        separator = "\n"
+        for sentence in _SENTENCE_END.split(paragraph):
+            for start in range(0, len(sentence), max_chars):
+                pieces.append((separator if start == 0 else "", sentence[start:start + max_chars]))
+            separator = " "
+
+    chunks: List[str] = []
+    current = ""
+    for separator, piece in pieces:
+        if current and len(current) + len(separator) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ""
+        current = f"{current}{separator}{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return [chunk for chunk in chunks if chunk.strip()]
@@ -1,15 +1,22 @@
 from utils.proxy_manager import get_proxy_settings
 
+import argparse
 import asyncio
-import hashlib
+import os
+import signal
+import socket
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-
-import aiohttp
+from functools import cached_property
+from typing import TYPE_CHECKING, List, Optional, Set
 
 from config.settings import settings
-from data_acquisition.hackernews import HackerNewsDataSource
-from data_acquisition.web_scraper import WebScraper
-from data_output.notion_publisher import NotionPublisher
+from data_output.dedup_index import DedupIndex, make_content_hash, make_unique_id
+from data_output.digest_archive import RESUMMARIZED, DigestArchive
+from data_output.near_duplicate_index import NearDuplicateIndex
 from data_output.schemas import (
     AnalysisSummary,
     CoreContent,
@@ -17,83 +24,603 @@ from data_output.schemas import (
     RetrievalInfo,
     SourceOutlet,
 )
-from data_processing.llm_summarizer import LLMSummarizer
-from notification.telegram_notifier import TelegramNotifier
+from data_processing.minhash import minhash_signature
+from utils.checkpoint_store import EXTRACTED, FETCHED, PUBLISHED, SKIPPED, SUMMARIZED, CheckpointStore
+from utils.content_spool import ContentSpool
 from utils.logger import get_logger
+from utils.metrics import NEAR_DUPLICATES, metrics
+from utils.pipeline import Pipeline, Stage
+from utils.registry import LazyRegistry
+from utils.work_queue import FAILED, Job, WorkQueue
+
+if TYPE_CHECKING:
+    import aiohttp
 
 logger = get_logger(__name__)
 
+COMMENT_SUMMARY_HEADER = "\n\n--- Comment Summary ---\n"
+
+# Client libraries (openai, notion_client, telegram, trafilatura) are only
+# imported once the subsystem that needs them is first used
+subsystems = LazyRegistry()
+subsystems.register("hackernews", "data_acquisition.hackernews:HackerNewsDataSource")
+subsystems.register("web_scraper", "data_acquisition.web_scraper:WebScraper")
+subsystems.register("llm_summarizer", "data_processing.llm_summarizer:LLMSummarizer")
+subsystems.register("notion_publisher", "data_output.notion_publisher:NotionPublisher")
+subsystems.register("telegram_notifier", "notification.telegram_notifier:TelegramNotifier")
+
+
+@dataclass
+class StoryContext:
+    """Intermediate state of a single story as it moves through the pipeline.
+
+    Fields that are already set (e.g. when resuming from a checkpoint) make
+    the corresponding stage skip its work.
+    """
+    story_id: Optional[int]
+    story_data: Optional[dict] = None
+    original_content: Optional[str] = None
+    content_hash: Optional[str] = None
+    comments: List[dict] = field(default_factory=list)
+    summary: Optional[str] = None
+    analysis: Optional[AnalysisSummary] = None
+    # Last stage the story reached, recorded even when checkpoints are disabled
+    stage: Optional[str] = None
+    fingerprint: Optional[List[int]] = None
+    # Article summary reused from a near-duplicate; its comments are still summarized
+    article_summary: Optional[str] = None
+    related_urls: List[str] = field(default_factory=list)
+    digest: Optional[DailyDigest] = None
+
 
 class Orchestrator:
     """Orchestrates the entire news digest generation process."""
 
-    def __init__(self, session: aiohttp.ClientSession):
-        self.data_source = HackerNewsDataSource(session=session)
-        self.llm_summarizer = LLMSummarizer()
-        self.publisher = NotionPublisher(database_id=settings.NOTION_DATABASE_ID)
-        self.notifier = TelegramNotifier(chat_id=settings.TELEGRAM_CHAT_ID)
+    def __init__(self, session: "aiohttp.ClientSession"):
+        self.dedup_index = DedupIndex(settings.DEDUP_INDEX_PATH) if settings.DEDUP_ENABLED else None
+        self.near_duplicates = (
+            NearDuplicateIndex(
+                settings.NEAR_DUPLICATE_INDEX_PATH, settings.MINHASH_BANDS, settings.NEAR_DUPLICATE_RETENTION_DAYS
+            )
+            if settings.NEAR_DUPLICATE_ENABLED
+            else None
+        )
+        self.archive = (
+            DigestArchive(settings.ARCHIVE_DIR, settings.ARCHIVE_SEGMENT_MAX_BYTES) if settings.ARCHIVE_ENABLED else None
+        )
+        self.checkpoints = (
+            CheckpointStore(settings.CHECKPOINT_PATH, settings.CHECKPOINT_KEEP_RUNS)
+            if settings.CHECKPOINT_ENABLED
+            else None
+        )
+        # Memory-bounded mode keeps article bodies on disk between stages
+        self.spool = ContentSpool(settings.MEMORY_SPOOL_DIR) if settings.MEMORY_BOUNDED else None
+        self.run_id: Optional[int] = None
         self.session = session
 
-    async def run(self):
-        """Run the orchestration process."""
+    # Components are created on first access so that commands which only need
+    # some of them never import the others' client libraries.
+    @cached_property
+    def data_source(self):
+        return subsystems.load("hackernews")(session=self.session)
+
+    @cached_property
+    def llm_summarizer(self):
+        return subsystems.load("llm_summarizer")()
+
+    @cached_property
+    def publisher(self):
+        return subsystems.load("notion_publisher")(database_id=settings.NOTION_DATABASE_ID)
+
+    @cached_property
+    def notifier(self):
+        return subsystems.load("telegram_notifier")(chat_id=settings.TELEGRAM_CHAT_ID)
+
+    async def sync_dedup_index(self):
+        """Seed the dedup index with the stories already present in Notion."""
+        if not self.dedup_index:
+            logger.warning("Dedup index is disabled, nothing to sync.")
+            return
+        urls = await self.publisher.fetch_published_urls()
+        added = self.dedup_index.record_urls(urls)
+        logger.info(f"Synced dedup index from Notion: {len(urls)} pages, {added} new entries.")
+
+    async def dry_run(self):
+        """List the stories a run would process, without scraping, summarizing or publishing."""
+        story_ids = await self.data_source.fetch_top_story_ids(settings.TOP_N_NEWS)
+        stories = await asyncio.gather(
+            *(self.data_source.fetch_story_details(story_id) for story_id in story_ids)
+        )
+        for story_id, story_data in zip(story_ids, stories):
+            url = (story_data or {}).get("url")
+            if not story_data:
+                status = "missing"
+            elif not url:
+                status = "skip: no url"
+            elif self.dedup_index and self.dedup_index.has_unique_id(make_unique_id(url)):
+                status = "skip: published"
+            else:
+                status = "process"
+            title = (story_data or {}).get("title", "")
+            print(f"{status:<16} {story_id:>10}  {title}  {url or ''}")
+
+    async def run(
+        self,
+        resume: bool = False,
+        story_ids: Optional[List[int]] = None,
+        notify_success: bool = True,
+    ) -> List[StoryContext]:
+        """Run the orchestration process and return the published stories.
+
+        With `resume`, the unfinished stories of the last run are picked up
+        from the stage they reached instead of fetching a new front page.
+        `story_ids` processes the given stories instead of the front page.
+        """
         logger.info("Starting Daily News Digest generation...")
+        started_at = time.time()
+        contexts: List[StoryContext] = []
+        published: List[StoryContext] = []
         try:
-            stories = await self.data_source.fetch_top_stories(settings.TOP_N_NEWS)
-            for story_data in stories:
-                if not story_data.get("url"):
-                    continue
+            # The daemon keeps one summarizer; the cost ceiling and cache stats are per run
+            self.llm_summarizer.start_run()
+            contexts = self._load_resumable_stories() if resume else None
+            if contexts is None:
+                if story_ids is None:
+                    story_ids = await self.data_source.fetch_top_story_ids(settings.TOP_N_NEWS)
+                if self.checkpoints:
+                    self.run_id = self.checkpoints.start_run(story_ids)
+                contexts = [StoryContext(story_id=story_id) for story_id in story_ids]
 
-                digest = await self.process_story(story_data)
-                if digest:
-                    await self.publisher.publish(digest)
+            published = await Pipeline(self.stages()).run(contexts)
+            logger.info(f"Published {len(published)} of {len(contexts)} stories.")
+            if self.llm_summarizer.cache:
+                stats = self.llm_summarizer.cache.stats
+                logger.info(
+                    f"LLM cache: {stats.hits} hits, {stats.misses} misses "
+                    f"({stats.hit_rate:.0%} hit rate), {stats.evictions} evictions."
+                )
 
-            await self.notifier.send_notification(
-                "Daily News Digest generation completed successfully.", "SUCCESS"
-            )
+            if notify_success:
+                await self.notifier.send_notification(
+                    "Daily News Digest generation completed successfully.", "SUCCESS"
+                )
         except Exception as e:
             logger.error(f"An error occurred during orchestration: {e}", exc_info=True)
             await self.notifier.send_notification(f"An error occurred: {e}", "ERROR")
+        finally:
+            if self.spool:
+                self.spool.clear()
+            self._write_run_report(started_at, len(contexts or []), len(published))
+        return published
+
+    async def resummarize_archive(
+        self,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        domain: Optional[str] = None,
+    ) -> int:
+        """Summarize archived stories again with the current prompts and models.
+
+        Article bodies and comments come from the archive, so nothing is
+        scraped; the new digests are added to the archive as re-summarized
+        versions next to the published ones, not published.
+        """
+        if not self.archive:
+            logger.warning("The digest archive is disabled, nothing to re-summarize.")
+            return 0
+
+        async def resummarize(story) -> Optional[StoryContext]:
+            core = story.digest.core_content
+            context = StoryContext(
+                story_id=None,
+                story_data={
+                    "title": core.title,
+                    "url": core.url,
+                    "by": core.author[0] if core.author else "",
+                    "time": int(core.publication_date.timestamp()) if core.publication_date else 0,
+                },
+                original_content=core.original_content,
+                comments=story.comments,
+            )
+            if await self._summarize_stage(context) is None:
+                return None
+            # The story was retrieved when it was published, not now
+            context.digest.retrieval_info = story.digest.retrieval_info
+            await asyncio.to_thread(self.archive.add, context.digest, context.comments, kind=RESUMMARIZED)
+            return context
+
+        stories = list(self.archive.query(since=since, until=until, domain=domain))
+        pipeline = Pipeline([Stage("resummarize", resummarize, settings.PIPELINE_SUMMARIZE_CONCURRENCY)])
+        done = await pipeline.run(stories)
+        logger.info(f"Re-summarized {len(done)} of {len(stories)} archived stories.")
+        return len(done)
+
+    async def run_daemon(self, stop: Optional[asyncio.Event] = None, max_cycles: Optional[int] = None):
+        """Poll the front page every DAEMON_INTERVAL seconds and process the stories entering it.
+
+        The HTTP session, API clients and local stores stay open between
+        cycles. Each cycle diffs topstories.json against the previous
+        snapshot, so an unchanged front page costs a single request. With
+        DAEMON_WATCH_UPDATES, front-page stories that were not published yet
+        are retried once updates.json reports them as changed.
+        """
+        stop = stop or asyncio.Event()
+        snapshot: Set[int] = set()
+        unpublished: Set[int] = set()
+        cycle = 0
+        logger.info(f"Starting daemon mode, polling the front page every {settings.DAEMON_INTERVAL}s.")
+        while not stop.is_set():
+            cycle += 1
+            started = time.monotonic()
+            metrics.reset()
+            try:
+                story_ids = await self.data_source.fetch_top_story_ids(settings.TOP_N_NEWS)
+                entering = [story_id for story_id in story_ids if story_id not in snapshot]
+                if settings.DAEMON_WATCH_UPDATES and unpublished:
+                    updated = await self.data_source.fetch_updated_item_ids()
+                    entering += [
+                        story_id for story_id in story_ids
+                        if story_id in unpublished and story_id in updated and story_id in snapshot
+                    ]
+                if story_ids:
+                    snapshot = set(story_ids)
+                if entering:
+                    logger.info(f"Cycle {cycle}: {len(entering)} new or updated stories on the front page.")
+                    published = await self.run(story_ids=entering, notify_success=False)
+                    unpublished = (unpublished | set(entering)) - {context.story_id for context in published}
+                    unpublished &= snapshot
+                else:
+                    logger.debug("Cycle %d: front page unchanged.", cycle)
+            except Exception as e:
+                logger.error(f"Daemon cycle {cycle} failed: {e}", exc_info=True)
+
+            if max_cycles is not None and cycle >= max_cycles:
+                break
+            delay = max(0.0, settings.DAEMON_INTERVAL - (time.monotonic() - started))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        logger.info(f"Daemon mode stopped after {cycle} cycles.")
+
+    def _write_run_report(self, started_at: float, stories: int, published: int):
+        """Export the metrics collected during this run."""
+        try:
+            metrics.write_report(
+                textfile_path=settings.METRICS_TEXTFILE_PATH,
+                json_path=settings.METRICS_JSON_PATH,
+                extra={
+                    "run_id": self.run_id,
+                    "started_at": started_at,
+                    "duration_seconds": time.time() - started_at,
+                    "stories": stories,
+                    "published": published,
+                },
+            )
+        except OSError as e:
+            logger.error(f"Failed to write the run report: {e}")
+
+    def _load_resumable_stories(self) -> Optional[List[StoryContext]]:
+        """Rebuild the contexts of the last run's unfinished stories, or None if there is nothing to resume."""
+        if not self.checkpoints:
+            logger.warning("Checkpoints are disabled, starting a new run instead of resuming.")
+            return None
+        run_id = self.checkpoints.latest_run()
+        pending = self.checkpoints.pending_stories(run_id) if run_id else []
+        if not pending:
+            logger.info("No unfinished run to resume, starting a new run.")
+            return None
+
+        self.run_id = run_id
+        logger.info(f"Resuming run {run_id} with {len(pending)} unfinished stories.")
+        return [
+            StoryContext(
+                story_id=checkpoint.story_id,
+                story_data=checkpoint.story_data,
+                original_content=checkpoint.original_content,
+                comments=checkpoint.comments,
+                summary=checkpoint.summary,
+            )
+            for checkpoint in pending
+        ]
+
+    def stages(self) -> List[Stage]:
+        """The pipeline stages a story goes through, from the URL check to publishing."""
+        return [
+            Stage("fetch", self._fetch_stage, settings.PIPELINE_FETCH_CONCURRENCY),
+            Stage("scrape", self._scrape_stage, settings.PIPELINE_SCRAPE_CONCURRENCY),
+            Stage("fingerprint", self._fingerprint_stage, settings.PIPELINE_FINGERPRINT_CONCURRENCY),
+            Stage("summarize", self._summarize_stage, settings.PIPELINE_SUMMARIZE_CONCURRENCY),
+            Stage("publish", self._publish_stage, settings.PIPELINE_PUBLISH_CONCURRENCY),
+        ]
+
+    def _checkpoint(self, context: StoryContext, stage: str, **artifacts):
+        """Record the progress of a story in the current run, if checkpointing is enabled."""
+        context.stage = stage
+        if self.checkpoints and self.run_id is not None and context.story_id is not None:
+            self.checkpoints.save(self.run_id, context.story_id, stage, **artifacts)
 
     async def process_story(self, story_data: dict) -> DailyDigest | None:
         """Process a single story."""
+        context = await self._scrape_stage(StoryContext(story_id=story_data.get("id"), story_data=story_data))
+        if context:
+            context = await self._fingerprint_stage(context)
+            context = await self._summarize_stage(context)
+        return context.digest if context else None
+
+    async def process_job(self, story_data: dict) -> StoryContext:
+        """Run a single story through every stage, from the URL check to publishing."""
+        context = StoryContext(story_id=story_data.get("id"), story_data=story_data)
+        try:
+            for stage in self.stages():
+                if await stage.handler(context) is None:
+                    break
+        finally:
+            if self.spool:
+                self.spool.discard(str(context.story_id))
+        return context
+
+    async def run_workers(self, workers: int):
+        """Queue the front page and process it with `workers` local worker processes.
+
+        Workers started with `--queue-worker` on other hosts sharing
+        QUEUE_PATH join in on the same jobs.
+        """
+        queue = self._open_work_queue()
+        try:
+            stories = await self.data_source.fetch_top_stories(settings.TOP_N_NEWS)
+            queued = queue.enqueue({str(story["id"]): story for story in stories})
+            logger.info(f"Queued {queued} of {len(stories)} stories, starting {workers} worker processes.")
+            processes = [
+                await asyncio.create_subprocess_exec(sys.executable, os.path.abspath(__file__), "--queue-worker")
+                for _ in range(workers)
+            ]
+            exit_codes = await asyncio.gather(*(process.wait() for process in processes))
+            counts = queue.counts()
+        finally:
+            queue.close()
+
+        crashed = sum(1 for code in exit_codes if code != 0)
+        logger.info(f"Worker processes finished ({crashed} crashed), jobs by status: {counts}.")
+        if crashed or counts[FAILED]:
+            await self.notifier.send_notification(
+                f"Digest workers finished with {counts[FAILED]} failed stories and {crashed} crashed workers.",
+                "ERROR",
+            )
+        else:
+            await self.notifier.send_notification(
+                "Daily News Digest generation completed successfully.", "SUCCESS"
+            )
+
+    async def work_queue(self) -> int:
+        """Claim and process jobs from the shared work queue until it is drained; returns the jobs done."""
+        queue = self._open_work_queue()
+        owner = f"{socket.gethostname()}:{os.getpid()}"
+        try:
+            done = await asyncio.gather(*(
+                self._queue_worker(queue, f"{owner}:{slot}") for slot in range(settings.QUEUE_WORKER_CONCURRENCY)
+            ))
+        finally:
+            queue.close()
+        logger.info(f"Queue worker {owner} completed {sum(done)} jobs.")
+        return sum(done)
+
+    async def _queue_worker(self, queue: WorkQueue, owner: str) -> int:
+        """Process jobs one at a time; waits while other workers still hold leases that may expire.
+
+        Queue calls may wait for other processes' SQLite locks, so they run in
+        threads to keep in-flight stories and lease heartbeats going.
+        """
+        done = 0
+        while True:
+            job = await asyncio.to_thread(queue.claim, owner)
+            if job is None:
+                if not await asyncio.to_thread(queue.has_unfinished):
+                    return done
+                await asyncio.sleep(settings.QUEUE_POLL_INTERVAL)
+                continue
+            heartbeat = asyncio.create_task(self._renew_lease(queue, job, owner))
+            try:
+                context = await self.process_job(job.payload)
+            except Exception as e:
+                logger.error(f"Job {job.key} failed: {e}", exc_info=True)
+                await asyncio.to_thread(queue.fail, job, owner, str(e))
+                continue
+            finally:
+                heartbeat.cancel()
+            if context.stage in (PUBLISHED, SKIPPED):
+                done += await asyncio.to_thread(queue.complete, job, owner)
+            else:
+                await asyncio.to_thread(queue.fail, job, owner, f"stopped after stage {context.stage or 'queued'}")
+
+    @staticmethod
+    async def _renew_lease(queue: WorkQueue, job: Job, owner: str):
+        """Keep a job leased while it is being processed."""
+        while True:
+            await asyncio.sleep(queue.visibility_timeout / 3)
+            if not await asyncio.to_thread(queue.renew, job, owner):
+                logger.warning(f"Lost the lease of job {job.key}.")
+                return
+
+    @staticmethod
+    def _open_work_queue() -> WorkQueue:
+        return WorkQueue(settings.QUEUE_PATH, settings.QUEUE_VISIBILITY_TIMEOUT, settings.QUEUE_MAX_ATTEMPTS)
+
+    async def _fetch_stage(self, context: StoryContext) -> Optional[StoryContext]:
+        """Fetch story details; stories without an external URL are dropped."""
+        if context.story_data is None:
+            context.story_data = await self.data_source.fetch_story_details(context.story_id)
+            if not context.story_data:
+                return None
+            self._checkpoint(context, FETCHED, story_data=context.story_data)
+        if not context.story_data.get("url"):
+            self._checkpoint(context, SKIPPED)
+            return None
+        return context
+
+    async def _scrape_stage(self, context: StoryContext) -> Optional[StoryContext]:
+        """Fetch the article content and the top comments of a story."""
+        story_data = context.story_data
         url = story_data.get("url")
+        if self.dedup_index and await asyncio.to_thread(self.dedup_index.has_unique_id, make_unique_id(url)):
+            logger.info(f"Skipping already published story: {story_data.get('title')}")
+            self._checkpoint(context, SKIPPED)
+            return None
+        if context.original_content is not None:
+            return context
         logger.info(f"Processing story: {story_data.get('title')}")
 
-        content_task = WebScraper.fetch_and_extract_content(self.session, url)
+        content_task = subsystems.load("web_scraper").fetch_and_extract_content(self.session, url)
         comments_task = self.data_source.fetch_comments(
             story_data.get("kids", []), settings.TOP_M_COMMENTS
         )
         original_content, comments = await asyncio.gather(content_task, comments_task)
 
         if not original_content:
-            logger.warning(f"Could not fetch or extract content from {url}")
+            # http_get has already retried transient errors; paywalls, PDFs and
+            # empty pages will not extract on a later attempt either
+            logger.warning(f"Could not fetch or extract content from {url}, skipping it.")
+            self._checkpoint(context, SKIPPED)
             return None
+        content_hash = make_content_hash(original_content)
+        if self.dedup_index and await asyncio.to_thread(self.dedup_index.has_content_hash, content_hash):
+            logger.info(f"Skipping story with already published content: {url}")
+            self._checkpoint(context, SKIPPED)
+            return None
+
+        context.content_hash = content_hash
+        context.comments = comments
+        self._checkpoint(context, EXTRACTED, original_content=original_content, comments=comments)
+        if self.spool:
+            self.spool.put(str(context.story_id), original_content)
+        else:
+            context.original_content = original_content
+        return context
 
-        summary_task = self.llm_summarizer.summarize_content(original_content)
-        comment_summary_task = self.llm_summarizer.summarize_comments(comments)
-        summary, comment_summary = await asyncio.gather(
-            summary_task, comment_summary_task
+    def _content(self, context: StoryContext) -> str:
+        """The article body of a story, read back from the spool in memory-bounded mode."""
+        if context.original_content is not None:
+            return context.original_content
+        return self.spool.get(str(context.story_id))
+
+    async def _fingerprint_stage(self, context: StoryContext) -> StoryContext:
+        """Reuse the summary of an already summarized near-duplicate article, if there is one."""
+        if not self.near_duplicates or context.summary is not None:
+            return context
+        url = context.story_data.get("url")
+        loop = asyncio.get_running_loop()
+        context.fingerprint = await loop.run_in_executor(
+            subsystems.load("web_scraper").get_executor(),
+            minhash_signature,
+            self._content(context),
+            settings.MINHASH_NUM_PERM,
+            settings.MINHASH_SHINGLE_SIZE,
+            settings.NEAR_DUPLICATE_MIN_WORDS,
+        )
+        if context.fingerprint is None:
+            return context
+        match = await asyncio.to_thread(
+            self.near_duplicates.find, context.fingerprint, settings.NEAR_DUPLICATE_THRESHOLD
         )
+        if match and match.url != url:
+            logger.info(f"{url} is a near-duplicate ({match.similarity:.0%}) of {match.url}, reusing its summary.")
+            NEAR_DUPLICATES.inc()
+            # Entries written before only article summaries were stored also hold the comment summary
+            context.article_summary = match.summary.split(COMMENT_SUMMARY_HEADER)[0]
+            context.related_urls = [match.url]
+        return context
 
-        if not summary:
-            logger.warning(f"Could not summarize content for {url}")
-            return None
+    async def _summarize_stage(self, context: StoryContext) -> Optional[StoryContext]:
+        """Summarize the article and its comments into a DailyDigest."""
+        url = context.story_data.get("url")
+        if context.summary is None:
+            content = self._content(context)
+            summary = comment_summary = None
+            if context.article_summary:
+                summary = context.article_summary
+                comment_summary = await self.llm_summarizer.summarize_comments(context.comments)
+            elif settings.LLM_STRUCTURED_OUTPUT:
+                analysis = await self.llm_summarizer.analyze_story(content, context.comments)
+                if analysis:
+                    summary, comment_summary = analysis.summary, analysis.comment_summary
+                    context.analysis = AnalysisSummary.model_construct(
+                        **{name: getattr(analysis, name) for name in AnalysisSummary.model_fields}
+                    )
+            if summary is None:
+                summary_task = self.llm_summarizer.summarize_content(content)
+                comment_summary_task = self.llm_summarizer.summarize_comments(context.comments)
+                summary, comment_summary = await asyncio.gather(
+                    summary_task, comment_summary_task
+                )
 
-        final_summary = (
-            f"{summary}\n\n--- Comment Summary ---\n"
-            f"{comment_summary or 'No comments to summarize.'}"
+            if not summary:
+                logger.warning(f"Could not summarize content for {url}")
+                return None
+
+            context.summary = f"{summary}{COMMENT_SUMMARY_HEADER}{comment_summary or 'No comments to summarize.'}"
+            self._checkpoint(context, SUMMARIZED, summary=context.summary)
+            if self.near_duplicates and context.fingerprint and not context.article_summary:
+                await asyncio.to_thread(
+                    self.near_duplicates.add,
+                    make_unique_id(url),
+                    url,
+                    context.fingerprint,
+                    summary,
+                    title=context.story_data.get("title"),
+                )
+
+        # In memory-bounded mode the body is only attached for publishing
+        context.digest = self._create_digest(
+            context.story_data, context.summary, context.original_content or "", url, context.analysis
         )
+        context.digest.core_content.related_urls = context.related_urls
+        return context
 
-        return self._create_digest(story_data, final_summary, original_content, url)
+    async def _publish_stage(self, context: StoryContext) -> Optional[StoryContext]:
+        """Publish the digest; only successfully published stories are kept."""
+        digest = context.digest
+        if self.spool and context.original_content is None:
+            digest.core_content.original_content = self._content(context)
+        try:
+            if not await self.publisher.publish(digest):
+                return None
+            self._checkpoint(context, PUBLISHED)
+            # The local stores are SQLite files shared with other worker processes, kept off the event loop
+            if self.dedup_index:
+                await asyncio.to_thread(
+                    self.dedup_index.record,
+                    digest.unique_id,
+                    digest.core_content.url,
+                    content_hash=context.content_hash or make_content_hash(digest.core_content.original_content),
+                    title=digest.core_content.title,
+                )
+            if self.archive:
+                try:
+                    await asyncio.to_thread(self.archive.add, digest, context.comments)
+                except (OSError, sqlite3.Error) as e:
+                    logger.error(f"Failed to archive {digest.core_content.url}: {e}")
+            return context
+        finally:
+            if self.spool:
+                # Published or not, the story is finished: drop its body and comments
+                digest.core_content.original_content = ""
+                context.original_content = None
+                context.comments = []
+                self.spool.discard(str(context.story_id))
 
     def _create_digest(
-        self, story_data, summary, original_content, url
+        self, story_data, summary, original_content, url, analysis: Optional[AnalysisSummary] = None
     ) -> DailyDigest:
-        """Create a DailyDigest object from the processed data."""
+        """Create a DailyDigest object from the processed data.
+
+        CoreContent holds the fields taken from the HN API and is validated;
+        the other models only hold values produced by the pipeline itself and
+        are built with `model_construct`, skipping validation.
+        """
         now = datetime.now(timezone.utc)
-        return DailyDigest(
-            unique_id=hashlib.md5(url.encode()).hexdigest(),
-            retrieval_info=RetrievalInfo(
+        return DailyDigest.model_construct(
+            unique_id=make_unique_id(url),
+            retrieval_info=RetrievalInfo.model_construct(
                 retrieved_date=now, source_type="Hacker News API"
             ),
             core_content=CoreContent(
@@ -103,26 +630,176 @@ class Orchestrator:
                     story_data.get("time", 0), tz=timezone.utc
                 ),
                 author=[story_data.get("by", "")],
-                source_outlet=SourceOutlet(
+                source_outlet=SourceOutlet.model_construct(
                     name="Hacker News", domain="news.ycombinator.com"
                 ),
                 media_type="Text Article",
                 language="en",
                 original_content=original_content,
             ),
-            analysis_summary=AnalysisSummary(
-                summary=summary,
-                keywords=[],  # Keyword extraction could be a future feature
+            analysis_summary=(
+                analysis.model_copy(update={"summary": summary})
+                if analysis
+                else AnalysisSummary.model_construct(summary=summary)
             ),
         )
 
 
-async def main():
+def inspect_local_stores():
+    """Print the state of the local caches, dedup index and checkpoints."""
+    from data_acquisition.extraction_profiles import ExtractionProfileStore
+    from data_processing.llm_cache import LLMCache
+    from utils.http_cache import HttpCache
+
+    stores = [
+        ("LLM cache", settings.LLM_CACHE_PATH,
+         lambda: LLMCache(settings.LLM_CACHE_PATH, settings.LLM_CACHE_TTL, settings.LLM_CACHE_MAX_ENTRIES)),
+        ("HTTP cache", settings.HTTP_CACHE_PATH,
+         lambda: HttpCache(settings.HTTP_CACHE_PATH, settings.HTTP_CACHE_MAX_BYTES, settings.HTTP_CACHE_DEFAULT_TTL)),
+        ("Dedup index", settings.DEDUP_INDEX_PATH, lambda: DedupIndex(settings.DEDUP_INDEX_PATH)),
+        ("Near-duplicate index", settings.NEAR_DUPLICATE_INDEX_PATH,
+         lambda: NearDuplicateIndex(settings.NEAR_DUPLICATE_INDEX_PATH, settings.MINHASH_BANDS)),
+        ("Work queue", settings.QUEUE_PATH, Orchestrator._open_work_queue),
+        ("Digest archive", settings.ARCHIVE_DIR,
+         lambda: DigestArchive(settings.ARCHIVE_DIR, settings.ARCHIVE_SEGMENT_MAX_BYTES)),
+        ("Extraction profiles", settings.EXTRACTION_PROFILES_PATH,
+         lambda: ExtractionProfileStore(settings.EXTRACTION_PROFILES_PATH, settings.EXTRACTION_PROFILE_MAX_FAILURES)),
+    ]
+    for name, path, open_store in stores:
+        if not os.path.exists(path):
+            print(f"{name}: not created ({path})")
+            continue
+        store = open_store()
+        try:
+            details = ", ".join(f"{key}={value}" for key, value in store.describe().items())
+        finally:
+            store.close()
+        print(f"{name}: {details} ({path}, {os.path.getsize(path)} bytes)")
+
+    if not os.path.exists(settings.CHECKPOINT_PATH):
+        print(f"Checkpoints: not created ({settings.CHECKPOINT_PATH})")
+        return
+    checkpoints = CheckpointStore(settings.CHECKPOINT_PATH, settings.CHECKPOINT_KEEP_RUNS)
+    try:
+        run_id = checkpoints.latest_run()
+        pending = len(checkpoints.pending_stories(run_id)) if run_id else 0
+    finally:
+        checkpoints.close()
+    print(f"Checkpoints: latest_run={run_id}, unfinished_stories={pending} ({settings.CHECKPOINT_PATH})")
+
+
+def query_archive(since: Optional[datetime], until: Optional[datetime], domain: Optional[str]):
+    """Print the archived stories published in [since, until), optionally from one domain."""
+    if not os.path.exists(settings.ARCHIVE_DIR):
+        print(f"Digest archive: not created ({settings.ARCHIVE_DIR})")
+        return
+    archive = DigestArchive(settings.ARCHIVE_DIR, settings.ARCHIVE_SEGMENT_MAX_BYTES)
+    try:
+        for story in archive.query(since=since, until=until, domain=domain):
+            core = story.digest.core_content
+            published = core.publication_date.strftime("%Y-%m-%d %H:%M") if core.publication_date else "-"
+            print(f"{published}  {story.kind:<12}  {len(core.original_content):>8} chars  {core.title}  {core.url}")
+    finally:
+        archive.close()
+
+
+def parse_date(value: str) -> datetime:
+    """Parse an ISO date or datetime given on the command line; naive values are taken as UTC."""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate the daily Hacker News digest.")
+    parser.add_argument(
+        "--sync-notion",
+        action="store_true",
+        help="Seed the local dedup index with the pages already in Notion before running.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the unfinished stories of the last run from their checkpoints.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only list the stories that would be processed; nothing is scraped, summarized or published.",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and process the stories entering the front page every DAEMON_INTERVAL seconds.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        metavar="N",
+        help="Queue the front page in the shared work queue and process it with N worker processes.",
+    )
+    parser.add_argument(
+        "--queue-worker",
+        action="store_true",
+        help="Process jobs from the shared work queue (QUEUE_PATH) until it is drained.",
+    )
+    parser.add_argument(
+        "--archive-query",
+        action="store_true",
+        help="List archived stories matching --since/--until/--domain, then exit.",
+    )
+    parser.add_argument(
+        "--resummarize",
+        action="store_true",
+        help="Summarize archived stories matching --since/--until/--domain again, without scraping or publishing.",
+    )
+    parser.add_argument("--since", type=parse_date, help="Only archived stories published at or after this date.")
+    parser.add_argument("--until", type=parse_date, help="Only archived stories published before this date.")
+    parser.add_argument("--domain", help="Only archived stories from this article domain.")
+    parser.add_argument(
+        "--inspect-cache",
+        action="store_true",
+        help="Print the state of the local caches, dedup index and checkpoints, then exit.",
+    )
+    return parser.parse_args()
+
+
+async def main(args: argparse.Namespace):
     """Main entry point for the application."""
+    if args.inspect_cache:
+        inspect_local_stores()
+        return
+    if args.archive_query:
+        query_archive(args.since, args.until, args.domain)
+        return
+
+    import aiohttp
+
     proxy_url = get_proxy_settings()
     async with aiohttp.ClientSession(proxy=proxy_url) as session:
-        orchestrator = Orchestrator(session=session)        
-        await orchestrator.run()
+        orchestrator = Orchestrator(session=session)
+        try:
+            if args.sync_notion:
+                await orchestrator.sync_dedup_index()
+            if args.dry_run:
+                await orchestrator.dry_run()
+            elif args.resummarize:
+                await orchestrator.resummarize_archive(args.since, args.until, args.domain)
+            elif args.workers:
+                await orchestrator.run_workers(args.workers)
+            elif args.queue_worker:
+                await orchestrator.work_queue()
+            elif args.daemon:
+                stop = asyncio.Event()
+                loop = asyncio.get_running_loop()
+                for signum in (signal.SIGINT, signal.SIGTERM):
+                    loop.add_signal_handler(signum, stop.set)
+                await orchestrator.run_daemon(stop)
+            else:
+                await orchestrator.run(resume=args.resume)
+        finally:
+            if subsystems.is_loaded("web_scraper"):
+                subsystems.load("web_scraper").shutdown()
 
 
 if __name__ == "__main__":
@@ -130,4 +807,4 @@ if __name__ == "__main__":
         logger.error("Main application entry point is disabled in TEST_MODE. To run the application, set TEST_MODE=False in your environment.")
         exit
     else:
-        asyncio.run(main())
+        asyncio.run(main(parse_args()))
@@ -1,5 +1,4 @@
 from telegram import Bot
-from telegram.ext import Updater
 
 from config.settings import settings
 from notification.base import Notifier
@@ -16,7 +15,7 @@ class TelegramNotifier(Notifier):
         self.chat_id = chat_id
 
     async def send_notification(self, message: str, status: str) -> bool:
-        logger.debug(f"Attempting to send {status} notification to Telegram with message: {message}")
+        logger.debug("Attempting to send %s notification to Telegram with message: %s", status, message)
         """Send a notification to Telegram."""
         try:
             full_message = f"[{status.upper()}] {message}"
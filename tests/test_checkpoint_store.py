@@ -0,0 +1,39 @@
+import pytest
+
+from utils.checkpoint_store import EXTRACTED, PUBLISHED, QUEUED, SKIPPED, SUMMARIZED, CheckpointStore
+from config.settings import settings
+
+
+@pytest.fixture
+def checkpoint_store(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"), keep_runs=2)
+    yield store
+    store.close()
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_checkpoint_store_returns_pending_stories_with_artifacts(checkpoint_store):
+    run_id = checkpoint_store.start_run([3, 1, 2, 4])
+    checkpoint_store.save(run_id, 1, EXTRACTED, story_data={"id": 1}, original_content="body", comments=[{"id": 9}])
+    checkpoint_store.save(run_id, 1, SUMMARIZED, summary="summary")
+    checkpoint_store.save(run_id, 2, PUBLISHED)
+    checkpoint_store.save(run_id, 4, SKIPPED)
+
+    pending = checkpoint_store.pending_stories(run_id)
+    assert [checkpoint.story_id for checkpoint in pending] == [3, 1]
+    assert pending[0].stage == QUEUED
+    assert pending[0].story_data is None
+    assert pending[1].stage == SUMMARIZED
+    assert pending[1].story_data == {"id": 1}
+    assert pending[1].original_content == "body"
+    assert pending[1].comments == [{"id": 9}]
+    assert pending[1].summary == "summary"
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_checkpoint_store_prunes_old_runs(checkpoint_store):
+    first = checkpoint_store.start_run([1])
+    checkpoint_store.start_run([2])
+    latest = checkpoint_store.start_run([3])
+    assert checkpoint_store.latest_run() == latest
+    assert checkpoint_store.pending_stories(first) == []
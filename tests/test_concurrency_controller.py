@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from data_processing.concurrency_controller import FAILED, OK, OVERLOADED, AdaptiveConcurrencyController
+from config.settings import settings
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_controller_queues_requests_above_the_limit():
+    controller = AdaptiveConcurrencyController(initial=2, minimum=1, maximum=8)
+    first = await controller.acquire()
+    await controller.acquire()
+    waiter = asyncio.create_task(controller.acquire())
+    await asyncio.sleep(0)
+    assert controller.in_flight == 2 and controller.queue_depth == 1
+
+    controller.release(first, FAILED)
+    await waiter
+    assert controller.in_flight == 2 and controller.queue_depth == 0
+    assert controller.limit == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_controller_increases_additively_and_backs_off_once_per_burst():
+    controller = AdaptiveConcurrencyController(initial=4, minimum=1, maximum=64, latency_target=1.0)
+    for _ in range(40):
+        slots = [await controller.acquire() for _ in range(controller.limit)]
+        for started in slots:
+            controller.release(started, OK, latency=0.1)
+    assert 20 <= controller.limit <= 30
+
+    limit = controller.limit
+    slots = [await controller.acquire() for _ in range(limit)]
+    for started in slots:
+        controller.release(started, OVERLOADED)
+    assert controller.limit == limit // 2
+
+    # Slow responses do not raise the limit
+    limit = controller.limit
+    slots = [await controller.acquire() for _ in range(limit)]
+    for started in slots:
+        controller.release(started, OK, latency=5.0)
+    assert controller.limit == limit
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_controller_converges_to_provider_capacity():
+    capacity = 12
+    controller = AdaptiveConcurrencyController(initial=2, minimum=1, maximum=64)
+    in_flight = 0
+    limits = []
+
+    async def call():
+        nonlocal in_flight
+        started = await controller.acquire()
+        in_flight += 1
+        overloaded = in_flight > capacity
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        controller.release(started, OVERLOADED if overloaded else OK, latency=0.001)
+        limits.append(controller.limit)
+
+    await asyncio.gather(*[call() for _ in range(2000)])
+    # AIMD saw-tooths just below the capacity
+    average = sum(limits[-1000:]) / 1000
+    assert capacity / 2 <= average <= capacity
+    assert max(limits[-1000:]) <= capacity + 2
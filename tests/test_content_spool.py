@@ -0,0 +1,46 @@
+import fcntl
+
+import pytest
+
+from utils.content_spool import LOCK_FILE, ContentSpool
+from config.settings import settings
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_spool_round_trip_discard_and_clear(tmp_path):
+    spool = ContentSpool(str(tmp_path))
+    spool.put("story-1", "Article body")
+    spool.put("story-2", "Another body")
+    assert spool.get("story-1") == "Article body"
+
+    spool.discard("story-1")
+    spool.discard("story-1")
+    with pytest.raises(FileNotFoundError):
+        spool.get("story-1")
+    spool.clear()
+    assert [path.name for path in (tmp_path / spool.directory).iterdir()] == [LOCK_FILE]
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_spool_only_sweeps_unlocked_directories(tmp_path):
+    stale = tmp_path / "host-101"
+    stale.mkdir()
+    (stale / LOCK_FILE).touch()
+    (stale / "story-1.txt").write_text("Left behind by a crash")
+    # Locked by a process that is still running, possibly on another host
+    live = tmp_path / "host-102"
+    live.mkdir()
+    live_lock = open(live / LOCK_FILE, "a")
+    fcntl.flock(live_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    # Not created by a spool
+    other = tmp_path / "other"
+    other.mkdir()
+
+    try:
+        ContentSpool(str(tmp_path))
+    finally:
+        live_lock.close()
+
+    assert not stale.exists()
+    assert live.exists() and other.exists()
+
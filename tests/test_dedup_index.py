@@ -0,0 +1,39 @@
+import pytest
+
+from data_output.dedup_index import DedupIndex, make_content_hash, make_unique_id
+from config.settings import settings
+
+
+@pytest.fixture
+def dedup_index(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite3"))
+    yield index
+    index.close()
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_dedup_index_records_published_stories(dedup_index):
+    unique_id = make_unique_id("http://test.com/a")
+    content_hash = make_content_hash("article body")
+    assert not dedup_index.has_unique_id(unique_id)
+
+    dedup_index.record(unique_id, "http://test.com/a", content_hash=content_hash, title="A")
+    assert dedup_index.has_unique_id(unique_id)
+    assert dedup_index.has_content_hash(content_hash)
+    assert not dedup_index.has_content_hash(make_content_hash("another body"))
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_dedup_index_record_urls_keeps_existing_entries(dedup_index):
+    content_hash = make_content_hash("article body")
+    dedup_index.record(make_unique_id("http://test.com/a"), "http://test.com/a", content_hash=content_hash)
+
+    added = dedup_index.record_urls(["http://test.com/a", "http://test.com/b"])
+    assert added == 1
+    assert dedup_index.has_unique_id(make_unique_id("http://test.com/b"))
+    assert dedup_index.has_content_hash(content_hash)
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_dedup_index_is_shared_in_wal_mode(dedup_index):
+    assert dedup_index._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
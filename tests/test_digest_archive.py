@@ -0,0 +1,67 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from data_output.digest_archive import PUBLISHED, RESUMMARIZED, DigestArchive
+from data_output.schemas import AnalysisSummary, CoreContent, DailyDigest, RetrievalInfo, SourceOutlet
+from config.settings import settings
+
+
+def make_digest(unique_id, url, body, day):
+    return DailyDigest(
+        unique_id=unique_id,
+        retrieval_info=RetrievalInfo(retrieved_date=datetime(2026, 10, day, tzinfo=timezone.utc), source_type="test"),
+        core_content=CoreContent(
+            title=f"Story {unique_id}",
+            url=url,
+            publication_date=datetime(2026, 10, day, tzinfo=timezone.utc),
+            source_outlet=SourceOutlet(name="Hacker News", domain="news.ycombinator.com"),
+            media_type="Text Article",
+            language="en",
+            original_content=body,
+        ),
+        analysis_summary=AnalysisSummary(summary=f"summary {unique_id}"),
+    )
+
+
+@pytest.fixture
+def archive(tmp_path):
+    archive = DigestArchive(str(tmp_path / "archive"), segment_max_bytes=1024)
+    yield archive
+    archive.close()
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_archive_round_trip_and_body_dedup(archive):
+    body = "article body " * 500
+    content_hash = archive.add(make_digest("a", "http://a.com/1", body, 1), comments=[{"text": "a comment"}])
+    archive.add(make_digest("b", "http://b.com/1", body, 2))
+
+    story = archive.get("a")
+    assert story.digest == make_digest("a", "http://a.com/1", body, 1)
+    assert story.comments == [{"text": "a comment"}]
+    assert archive.get_body(content_hash) == body
+    assert archive.get("missing") is None
+    description = archive.describe()
+    assert description["digests"] == 2 and description["bodies"] == 1
+    assert description["segment_bytes"] < description["body_bytes"]
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_archive_range_and_domain_queries(archive):
+    for day in range(1, 11):
+        domain = "a.com" if day % 2 else "b.com"
+        archive.add(make_digest(str(day), f"http://{domain}/{day}", f"body {day} " * 200, day))
+    # Queries only return the latest version of a story
+    archive.add(make_digest("3", "http://a.com/3", "updated body", 3), kind=RESUMMARIZED)
+
+    since, until = datetime(2026, 10, 3, tzinfo=timezone.utc), datetime(2026, 10, 8, tzinfo=timezone.utc)
+    assert [story.digest.unique_id for story in archive.query(since=since, until=until)] == ["3", "4", "5", "6", "7"]
+    assert [story.digest.unique_id for story in archive.query(domain="b.com", limit=2)] == ["2", "4"]
+    assert archive.get("3").digest.core_content.original_content == "updated body"
+    assert archive.get("3").kind == RESUMMARIZED
+    assert archive.get("3", kind=PUBLISHED).digest.core_content.original_content == "body 3 " * 200
+    assert archive.describe()["versions"] == 11
+    # Small segments are rotated
+    assert len([name for name in os.listdir(archive.directory) if name.startswith("digests-")]) > 1
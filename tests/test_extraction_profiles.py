@@ -0,0 +1,113 @@
+import pytest
+
+from data_acquisition.extraction_profiles import (
+    EMPTY,
+    FULL,
+    PROFILE,
+    ExtractionProfileStore,
+    ProfilePlan,
+    json_ld_article_body,
+    learn_selector,
+    parse_html,
+    profile_domain,
+    select_text,
+)
+from data_acquisition.web_scraper import _extract_main_content
+from config.settings import settings
+
+PARAGRAPHS = [f"This is paragraph number {i} of a reasonably long test article body." for i in range(30)]
+ARTICLE_HTML = (
+    "<html><body><nav><a href='/'>Home</a></nav><div class='layout'><div class='story-body'>"
+    + "".join(f"<p>{paragraph}</p>" for paragraph in PARAGRAPHS)
+    + "<script>var tracking = 1;</script></div><aside>Related links</aside></div></body></html>"
+)
+
+
+@pytest.fixture
+def profiles(tmp_path):
+    store = ExtractionProfileStore(str(tmp_path / "extraction_profiles.sqlite3"), max_failures=2)
+    yield store
+    store.close()
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_learned_selector_extracts_the_article():
+    selector = learn_selector(ARTICLE_HTML, "\n".join(PARAGRAPHS))
+    assert selector == "//div[@class='story-body']"
+    content = select_text(parse_html(ARTICLE_HTML), selector, min_chars=200)
+    assert content.splitlines() == PARAGRAPHS
+    assert select_text(parse_html(ARTICLE_HTML), selector, min_chars=10_000) is None
+    # Too little text to locate the article reliably
+    assert learn_selector(ARTICLE_HTML, PARAGRAPHS[0]) is None
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_select_text_drops_tables_and_link_lists():
+    page = ARTICLE_HTML.replace("<script>", "<table><tr><td>Infobox row</td></tr></table><script>")
+    content = select_text(parse_html(page), "//div[@class='story-body']", min_chars=200)
+    assert "Infobox" not in content
+    links = "".join(f"<li><a href='/{i}'>Another long link title number {i}</a></li>" for i in range(30))
+    index_page = f"<html><body><ul class='index'>{links}</ul></body></html>"
+    assert select_text(parse_html(index_page), "//ul[@class='index']", min_chars=200) is None
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_verification_rejects_a_selector_matching_the_wrong_container():
+    teaser = "".join(f"<p>Unrelated teaser number {i} pointing at some other article.</p>" for i in range(10))
+    page = ARTICLE_HTML.replace("<aside>Related links</aside>", f"<div class='teasers'>{teaser}</div>")
+    # A selector that would have been accepted without verification
+    assert _extract_main_content(page, "//div[@class='teasers']", min_chars=200).tier == PROFILE
+    verified = _extract_main_content(page, "//div[@class='teasers']", verify=True, min_chars=200)
+    assert verified.tier == FULL and "paragraph number 29" in verified.content
+    assert _extract_main_content(page, "//div[@class='story-body']", verify=True, min_chars=200).tier == PROFILE
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_json_ld_article_body_and_domains():
+    html = (
+        '<html><head><script type="application/ld+json">'
+        '[{"@type": "WebSite"}, {"@graph": [{"@type": "NewsArticle", "articleBody": "Rendered later."}]}]'
+        "</script></head><body><div id='root'></div></body></html>"
+    )
+    assert json_ld_article_body(parse_html(html)) == "Rendered later."
+    assert json_ld_article_body(parse_html(ARTICLE_HTML)) is None
+    assert profile_domain("https://www.Example.com/a?b=c") == "example.com"
+    assert profile_domain("not a url") is None
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_profiles_record_tiers_and_drop_failing_selectors(profiles):
+    profiles.record("example.com", FULL, learned_selector="//article")
+    profiles.record("example.com", PROFILE, tried_selector=True)
+    profiles.record("example.com", PROFILE, tried_selector=True)
+    profiles.record("example.com", EMPTY)
+    stats = profiles.stats("example.com")
+    assert stats["selector"] == "//article"
+    assert (stats[PROFILE], stats[FULL], stats[EMPTY]) == (2, 1, 1)
+    assert stats["success_rate"] == 0.75 and stats["profile_rate"] == 0.5
+
+    profiles.record("example.com", FULL, tried_selector=True)
+    assert profiles.selector("example.com") == "//article"
+    profiles.record("example.com", FULL, tried_selector=True)
+    assert profiles.selector("example.com") is None
+    assert profiles.describe() == {
+        "domains": 1, "selectors": 0, PROFILE: 2, FULL: 3, "fallback": 0, EMPTY: 1,
+    }
+    with pytest.raises(ValueError):
+        profiles.record("example.com", "unknown")
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_profiles_learn_only_for_frequent_domains(profiles):
+    assert profiles.plan("example.com", learn_after=3, verify_every=0) == ProfilePlan(None, False, False)
+    profiles.record("example.com", FULL)
+    profiles.record("example.com", FULL)
+    assert profiles.plan("example.com", learn_after=3, verify_every=0).learn
+    # Learning failed: the domain is not tried again
+    profiles.record("example.com", FULL, tried_learning=True)
+    assert not profiles.plan("example.com", learn_after=3, verify_every=0).learn
+
+    profiles.record("other.com", FULL, tried_learning=True, learned_selector="//article")
+    profiles.record("other.com", PROFILE, tried_selector=True)
+    assert profiles.plan("other.com", learn_after=3, verify_every=2) == ProfilePlan("//article", False, True)
+    assert not profiles.plan("other.com", learn_after=3, verify_every=3).verify
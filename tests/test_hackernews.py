@@ -0,0 +1,86 @@
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from unittest.mock import MagicMock
+
+from data_acquisition.hackernews import HackerNewsDataSource
+from utils import http_client
+from config.settings import settings
+
+# Top-level comments 1..50; comment 2 has a large reply subtree, 3 is deleted.
+THREAD = {i: {"id": i, "text": f"comment {i}"} for i in range(1, 51)}
+THREAD[2]["kids"] = list(range(100, 120))
+THREAD[3] = {"id": 3, "deleted": True}
+THREAD.update({i: {"id": i, "text": f"reply {i}"} for i in range(100, 120)})
+
+
+@pytest.fixture
+def data_source(monkeypatch):
+    source = HackerNewsDataSource(session=MagicMock())
+    requested = []
+
+    async def fake_fetch_comment(comment_id):
+        requested.append(comment_id)
+        return THREAD.get(comment_id)
+
+    monkeypatch.setattr(source, "_fetch_comment", fake_fetch_comment)
+    source.requested = requested
+    return source
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_fetch_comments_respects_request_budget(data_source, monkeypatch):
+    monkeypatch.setattr(settings, "COMMENT_CRAWL_BUDGET", 15)
+    comments = await data_source.fetch_comments(list(range(1, 51)), 5)
+    assert len(data_source.requested) == 15
+    assert len(comments) == 5
+    assert all(not comment.get("deleted") for comment in comments)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_fetch_comments_prioritizes_busy_subtrees(data_source, monkeypatch):
+    monkeypatch.setattr(settings, "COMMENT_CRAWL_BUDGET", 15)
+    monkeypatch.setattr(settings, "COMMENT_CRAWL_CONCURRENCY", 1)
+    comments = await data_source.fetch_comments(list(range(1, 51)), 5)
+    # The top replies of comment 2 outrank low-ranked top-level comments
+    assert 100 in data_source.requested
+    assert 50 not in data_source.requested
+    assert comments[0]["id"] == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_fetch_comments_respects_max_depth(data_source, monkeypatch):
+    monkeypatch.setattr(settings, "COMMENT_CRAWL_MAX_DEPTH", 0)
+    await data_source.fetch_comments([1, 2], 5)
+    assert sorted(data_source.requested) == [1, 2]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_settled_comment_is_revalidated_and_gains_replies(monkeypatch, tmp_path):
+    monkeypatch.setattr(http_client, "_host_policies", {})
+    monkeypatch.setattr(http_client, "_http_cache", None)
+    monkeypatch.setattr(settings, "HTTP_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "HTTP_CACHE_PATH", str(tmp_path / "http_cache.sqlite3"))
+    monkeypatch.setattr(settings, "HTTP_CACHE_DEFAULT_TTL", 0)
+    # Posted a day ago, long past the edit window
+    comment = {"id": 1, "text": "old comment", "time": int(time.time()) - 24 * 60 * 60, "kids": [2]}
+
+    async def handler(request):
+        return web.json_response(comment)
+
+    app = web.Application()
+    app.router.add_get("/v0/item/1.json", handler)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        source = HackerNewsDataSource(session)
+        source.BASE_URL = str(server.make_url("/v0"))
+        assert (await source._fetch_comment(1))["kids"] == [2]
+        comment["kids"] = [2, 3]
+        assert (await source._fetch_comment(1))["kids"] == [2, 3]
+    http_client.get_http_cache().close()
@@ -0,0 +1,82 @@
+import sqlite3
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from utils import http_client
+from utils.http_cache import HttpCache
+from config.settings import settings
+
+
+@pytest.fixture
+def http_cache(tmp_path, monkeypatch):
+    cache = HttpCache(str(tmp_path / "cache.sqlite3"), max_bytes=1024, default_ttl=60)
+    monkeypatch.setattr(http_client, "_http_cache", cache)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_http_cache_evicts_least_recently_used(http_cache):
+    http_cache.put("http://a/1", b"x" * 400)
+    http_cache.put("http://a/2", b"y" * 400)
+    assert http_cache.get("http://a/1") is not None  # 1 is now more recent than 2
+    http_cache.put("http://a/3", b"z" * 400)
+    assert http_cache.get("http://a/2") is None
+    assert http_cache.get("http://a/1").body == b"x" * 400
+    assert http_cache.get("http://a/3") is not None
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_http_cache_immutable_entries_never_expire(http_cache):
+    http_cache.default_ttl = -1
+    http_cache.put("http://a/stale", b"1")
+    http_cache.put("http://a/forever", b"2", immutable=True)
+    assert not http_cache.get("http://a/stale").is_fresh()
+    assert http_cache.get("http://a/forever").is_fresh()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_http_get_revalidates_with_etag(http_cache):
+    requests = []
+
+    async def handler(request):
+        requests.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.json_response({"id": 1}, headers={"ETag": '"v1"'})
+
+    app = web.Application()
+    app.router.add_get("/item", handler)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        url = str(server.make_url("/item"))
+        assert await http_client.http_get(session, url) == {"id": 1}
+        assert await http_client.http_get(session, url) == {"id": 1}
+        assert requests == [None]  # second call served fresh from the cache
+
+        http_cache.default_ttl = -1
+        http_cache.put(url, b'{"id": 1}', etag='"v1"')
+        assert await http_client.http_get(session, url) == {"id": 1}
+        assert requests == [None, '"v1"']
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_http_get_survives_cache_errors(http_cache, monkeypatch):
+    def locked(*args, **kwargs):
+        raise sqlite3.OperationalError("database is locked")
+
+    async def handler(request):
+        return web.json_response({"id": 1})
+
+    app = web.Application()
+    app.router.add_get("/item", handler)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        url = str(server.make_url("/item"))
+        monkeypatch.setattr(http_cache, "put", locked)
+        assert await http_client.http_get(session, url) == {"id": 1}
+        monkeypatch.setattr(http_cache, "get", locked)
+        assert await http_client.http_get(session, url) == {"id": 1}
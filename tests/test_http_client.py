@@ -0,0 +1,231 @@
+import asyncio
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from utils import http_client
+from utils.rate_limiter import CircuitBreaker, TokenBucket
+from config.settings import settings
+
+
+@pytest.fixture(autouse=True)
+def fresh_host_policies(monkeypatch):
+    monkeypatch.setattr(http_client, "_host_policies", {})
+    monkeypatch.setattr(http_client, "_http_cache", None)
+    monkeypatch.setattr(settings, "HTTP_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "HTTP_BACKOFF_BASE", 0.01)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, capacity=5)
+    start = time.monotonic()
+    for _ in range(15):
+        await bucket.acquire()
+    # 5 tokens are available immediately, the remaining 10 take ~0.1s
+    assert time.monotonic() - start >= 0.09
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_circuit_breaker_opens_and_half_opens():
+    breaker = CircuitBreaker("host", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()  # trial request
+    assert not breaker.allow_request()  # only one trial at a time
+    breaker.record_success()
+    assert breaker.allow_request()
+    assert not breaker.is_open
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_cancelled_trial_request_does_not_keep_the_circuit_open(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_CIRCUIT_RESET_TIMEOUT", 0.0)
+    started = asyncio.Event()
+
+    async def handler(request):
+        started.set()
+        await asyncio.sleep(10)
+        return web.json_response({})
+
+    async def ok(request):
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/slow", handler)
+    app.router.add_get("/ok", ok)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        breaker = http_client.get_host_policy(str(server.make_url("/"))).breaker
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        assert breaker.is_open
+
+        trial = asyncio.create_task(http_client.http_get(session, str(server.make_url("/slow"))))
+        await started.wait()
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        assert await http_client.http_get(session, str(server.make_url("/ok"))) == {"ok": True}
+    assert not breaker.is_open
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_http_get_retries_transient_errors():
+    attempts = []
+
+    async def handler(request):
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            return web.Response(status=503, headers={"Retry-After": "0.1"})
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/flaky", handler)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        result = await http_client.http_get(session, str(server.make_url("/flaky")))
+    assert result == {"ok": True}
+    assert len(attempts) == 3
+    assert attempts[1] - attempts[0] >= 0.1
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_http_get_does_not_retry_client_errors():
+    attempts = []
+
+    async def handler(request):
+        attempts.append(request)
+        return web.Response(status=403)
+
+    app = web.Application()
+    app.router.add_get("/forbidden", handler)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        assert await http_client.http_get(session, str(server.make_url("/forbidden"))) is None
+    assert len(attempts) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_http_get_limits_concurrency_per_host(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_HOST_CONCURRENCY", 2)
+    in_flight = []
+    peak = []
+
+    async def handler(request):
+        in_flight.append(request)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.02)
+        in_flight.pop()
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_get("/item", handler)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        url = str(server.make_url("/item"))
+        await asyncio.gather(*[http_client.http_get(session, url) for _ in range(6)])
+    assert max(peak) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_http_get_streams_and_caps_text():
+    async def handler(request):
+        # Chunked, so the size is not known before the body is read
+        response = web.StreamResponse(headers={"Content-Type": "text/html; charset=utf-8"})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        for _ in range(10):
+            await response.write(("é" * 100).encode("utf-8"))
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/page", handler)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        text = await http_client.http_get(
+            session, str(server.make_url("/page")), response_type="text", max_bytes=101
+        )
+    # 101 bytes hold 50 two-byte characters; the dangling byte is replaced
+    assert text.startswith("é" * 50)
+    assert len(text) <= 51
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_http_get_does_not_cache_truncated_text(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "HTTP_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "HTTP_CACHE_PATH", str(tmp_path / "http_cache.sqlite3"))
+    requests = []
+
+    async def handler(request):
+        requests.append(request.path)
+        if request.path == "/short":
+            return web.Response(text="short", content_type="text/html")
+        # Chunked, so the cap is only hit while reading
+        response = web.StreamResponse(headers={"Content-Type": "text/html"})
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        await response.write(b"x" * 1000)
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/long", handler)
+    app.router.add_get("/short", handler)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        for _ in range(2):
+            for path in ("/long", "/short"):
+                await http_client.http_get(session, str(server.make_url(path)), response_type="text", max_bytes=100)
+    http_client.get_http_cache().close()
+
+    assert requests == ["/long", "/short", "/long"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_http_get_rejects_declared_oversized_bodies():
+    requested = []
+
+    async def handler(request):
+        requested.append(request.path)
+        return web.Response(text="x" * 1000, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/large", handler)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        url = str(server.make_url("/large"))
+        assert await http_client.http_get(session, url, response_type="text", max_bytes=100) is None
+        assert await http_client.http_get(session, url, response_type="text", max_bytes=1000) == "x" * 1000
+    assert requested == ["/large", "/large"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_http_get_rejects_unwanted_content_types():
+    async def handler(request):
+        return web.Response(body=b"%PDF-1.7", content_type="application/pdf")
+
+    app = web.Application()
+    app.router.add_get("/paper.pdf", handler)
+    async with TestServer(app) as server, aiohttp.ClientSession() as session:
+        result = await http_client.http_get(
+            session, str(server.make_url("/paper.pdf")), response_type="text", content_types=["text/html"]
+        )
+    assert result is None
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_sniff_charset_from_meta_tag():
+    assert http_client._sniff_charset(b'<html><head><meta charset="iso-8859-1">') == "iso-8859-1"
+    assert http_client._sniff_charset(b"<html><head><meta charset=bogus>") is None
+    assert http_client._sniff_charset(b"<html>") is None
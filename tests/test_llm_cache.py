@@ -0,0 +1,42 @@
+import pytest
+
+from data_processing.llm_cache import LLMCache
+from config.settings import settings
+
+
+@pytest.fixture
+def llm_cache(tmp_path):
+    cache = LLMCache(str(tmp_path / "llm_cache.sqlite3"), ttl=60, max_entries=2)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_llm_cache_key_depends_on_all_inputs():
+    params = {"temperature": 0.6, "top_p": 1}
+    key = LLMCache.make_key("model-a", "system", "prompt", params)
+    assert key == LLMCache.make_key("model-a", "system", "prompt", dict(reversed(params.items())))
+    assert key != LLMCache.make_key("model-b", "system", "prompt", params)
+    assert key != LLMCache.make_key("model-a", "system", "prompt", {"temperature": 0.7, "top_p": 1})
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_llm_cache_hits_misses_and_eviction(llm_cache):
+    assert llm_cache.get("k1") is None
+    llm_cache.put("k1", "model", "summary 1")
+    llm_cache.put("k2", "model", "summary 2")
+    assert llm_cache.get("k1") == "summary 1"
+    llm_cache.put("k3", "model", "summary 3")  # evicts k2, the least recently used
+
+    assert llm_cache.get("k2") is None
+    assert llm_cache.get("k3") == "summary 3"
+    assert llm_cache.stats.hits == 2
+    assert llm_cache.stats.misses == 2
+    assert llm_cache.stats.evictions == 1
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_llm_cache_expires_entries(llm_cache):
+    llm_cache.put("k1", "model", "summary")
+    llm_cache.ttl = 0
+    assert llm_cache.get("k1") is None
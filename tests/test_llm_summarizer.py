@@ -1,4 +1,10 @@
+import asyncio
+
+import httpx
 import pytest
+from openai import APITimeoutError
+from unittest.mock import AsyncMock, MagicMock
+
 from data_processing.llm_summarizer import LLMSummarizer
 from config.settings import settings
 
@@ -24,3 +30,166 @@ async def test_llm_model_availability(model_name, content_type):
     elif content_type == "comments":
         summary = await summarizer.summarize_comments(test_comments, model=model_name)
         assert isinstance(summary, str) and len(summary) > 0, f"Expected non-empty summary for model {model_name}"
+
+
+STRUCTURED_RESPONSE = """```json
+{"summary": "Article summary.", "comment_summary": "Readers agree.", "keywords": ["rust", "kernel"],
+ "category": {"primary": "Technology", "secondary": ["Linux"]},
+ "sentiment": {"label": "positive", "score": 0.6},
+ "key_entities": {"persons": ["Linus Torvalds"], "organizations": [], "locations": []},
+ "factual_claims": [{"claim": "Rust was merged.", "verification_status": "verified"}]}
+```"""
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_analyze_story_parses_structured_response(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    summarizer = LLMSummarizer()
+    summarizer._get_completion = AsyncMock(return_value=STRUCTURED_RESPONSE)
+
+    analysis = await summarizer.analyze_story("An article.", [{"text": "A comment."}])
+    assert analysis.summary == "Article summary."
+    assert analysis.comment_summary == "Readers agree."
+    assert analysis.category.primary == "Technology"
+    assert analysis.key_entities.persons == ["Linus Torvalds"]
+    assert summarizer._get_completion.call_args.kwargs["response_format"]["type"] == "json_schema"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_analyze_story_returns_none_for_invalid_or_long_input(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    summarizer = LLMSummarizer()
+    summarizer._get_completion = AsyncMock(return_value='{"keywords": "not a list"}')
+    assert await summarizer.analyze_story("An article.", []) is None
+
+    summarizer._get_completion.reset_mock()
+    long_content = "word " * (settings.LLM_CHUNK_TOKENS * 4)
+    assert await summarizer.analyze_story(long_content, []) is None
+    summarizer._get_completion.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_timeout_falls_back_to_cheaper_model(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_ROUTING_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_STREAMING", False)
+    summarizer = LLMSummarizer()
+    response = MagicMock(usage=None, choices=[MagicMock(message=MagicMock(content="fallback summary"))])
+    summarizer.client = MagicMock()
+    summarizer.client.chat.completions.create = AsyncMock(
+        side_effect=[APITimeoutError(request=httpx.Request("POST", "http://llm")), response]
+    )
+
+    assert await summarizer.summarize_content("word " * 3000) == "fallback summary"
+    models = [call.kwargs["model"] for call in summarizer.client.chat.completions.create.call_args_list]
+    assert models == ["gemini-2.5-pro", "gemini-2.5-flash"]
+    # The timeout also halved the adaptive concurrency limit
+    assert summarizer.concurrency.limit == settings.LLM_CONCURRENCY_INITIAL // 2
+    assert summarizer.concurrency.in_flight == 0
+
+
+class FakeStream:
+    """Async iterator standing in for an openai AsyncStream."""
+
+    def __init__(self, text, delay):
+        self.text = text
+        self.delay = delay
+        self.closed = False
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.delay)
+        yield MagicMock(usage=None, choices=[MagicMock(delta=MagicMock(content=self.text))])
+        yield MagicMock(usage=MagicMock(prompt_tokens=10, completion_tokens=5), choices=[])
+
+    async def close(self):
+        self.closed = True
+
+
+class StalledStream(FakeStream):
+    """A stream whose connection times out before the first token."""
+
+    async def __aiter__(self):
+        raise httpx.ReadTimeout("timed out", request=httpx.Request("POST", "http://llm"))
+        yield
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_stream_timeout_falls_back_and_backs_off(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_ROUTING_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_STREAMING", True)
+    summarizer = LLMSummarizer()
+    stalled = StalledStream("", delay=0)
+    summarizer.client = MagicMock()
+    summarizer.client.chat.completions.create = AsyncMock(side_effect=[stalled, FakeStream("fallback summary", delay=0)])
+
+    assert await summarizer.summarize_content("word " * 3000) == "fallback summary"
+    models = [call.kwargs["model"] for call in summarizer.client.chat.completions.create.call_args_list]
+    assert models == ["gemini-2.5-pro", "gemini-2.5-flash"]
+    assert stalled.closed
+    assert summarizer.concurrency.limit == settings.LLM_CONCURRENCY_INITIAL // 2
+    # The stalled stream still counts towards the hedge delay
+    assert len(summarizer._first_token_times["gemini-2.5-pro"]) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_streamed_completion_records_first_token(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_STREAMING", True)
+    summarizer = LLMSummarizer()
+    stream = FakeStream("streamed summary", delay=0)
+    summarizer.client = MagicMock()
+    summarizer.client.chat.completions.create = AsyncMock(return_value=stream)
+
+    assert await summarizer.summarize_content("An article.", model="gemini-2.5-flash") == "streamed summary"
+    assert summarizer.client.chat.completions.create.call_args.kwargs["stream"] is True
+    assert len(summarizer._first_token_times["gemini-2.5-flash"]) == 1
+    assert stream.closed
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_hedged_request_wins_and_cancels_slow_primary(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_STREAMING", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_INITIAL_DELAY", 0.05)
+    summarizer = LLMSummarizer()
+    slow, fast = FakeStream("slow", delay=5), FakeStream("fast", delay=0)
+    summarizer.client = summarizer.hedge_client = MagicMock()
+    summarizer.client.chat.completions.create = AsyncMock(side_effect=[slow, fast])
+
+    assert await summarizer.summarize_content("An article.", model="gemini-2.5-flash") == "fast"
+    assert summarizer.client.chat.completions.create.await_count == 2
+    await asyncio.sleep(0)
+    assert slow.closed
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_hedged_request_takes_its_own_concurrency_slot(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_STREAMING", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_HEDGE_INITIAL_DELAY", 0.05)
+    monkeypatch.setattr(settings, "LLM_ADAPTIVE_CONCURRENCY", True)
+    summarizer = LLMSummarizer()
+    in_flight = []
+    streams = iter([FakeStream("slow", delay=5), FakeStream("fast", delay=0)])
+
+    async def create(**kwargs):
+        in_flight.append(summarizer.concurrency.in_flight)
+        return next(streams)
+
+    summarizer.client = summarizer.hedge_client = MagicMock()
+    summarizer.client.chat.completions.create = AsyncMock(side_effect=create)
+
+    assert await summarizer.summarize_content("An article.", model="gemini-2.5-flash") == "fast"
+    await asyncio.sleep(0)
+    assert in_flight == [1, 2]
+    assert summarizer.concurrency.in_flight == 0
@@ -0,0 +1,114 @@
+import io
+import json
+import logging
+import multiprocessing
+import queue
+import sys
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueListener
+
+import pytest
+
+from utils.logger import (
+    DebugRateLimitFilter,
+    DeferredFormatQueueHandler,
+    JsonFormatter,
+    configure_worker_logging,
+    get_logger,
+)
+from config.settings import settings
+
+
+def _record(msg, *args, level=logging.DEBUG, name="test"):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_debug_rate_limit_samples_per_call_site():
+    log_filter = DebugRateLimitFilter(limit=2, window=60)
+    passed = [log_filter.filter(_record("Fetching comment %s.", i)) for i in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    # Other call sites and higher levels are not affected
+    assert log_filter.filter(_record("Fetching story %s.", 1))
+    assert log_filter.filter(_record("Fetching comment %s.", 6, level=logging.INFO))
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_debug_rate_limit_reports_suppressed_count():
+    log_filter = DebugRateLimitFilter(limit=1, window=0.0)
+    log_filter.filter(_record("Item %s."))
+    log_filter.window = 60
+    assert not log_filter.filter(_record("Item %s.", 2))
+    assert not log_filter.filter(_record("Item %s.", 3))
+    log_filter.window = 0.0
+
+    record = _record("Item %s.", 4)
+    assert log_filter.filter(record)
+    assert record.getMessage() == "Item 4. (2 similar messages suppressed)"
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_json_formatter():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = logging.LogRecord("test", logging.ERROR, __file__, 7, "Failed %s", ("x",), sys.exc_info())
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["level"] == "ERROR"
+    assert entry["logger"] == "test"
+    assert entry["line"] == 7
+    assert entry["message"] == "Failed x"
+    assert "ValueError: boom" in entry["exc_info"]
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_records_are_formatted_on_the_listener_thread():
+    formatting_threads = []
+
+    class RecordingFormatter(JsonFormatter):
+        def format(self, record):
+            formatting_threads.append(threading.current_thread())
+            return super().format(record)
+
+    stream = io.StringIO()
+    target = logging.StreamHandler(stream)
+    target.setFormatter(RecordingFormatter())
+    handler = DeferredFormatQueueHandler(queue.SimpleQueue())
+    listener = QueueListener(handler.queue, target)
+    logger = logging.getLogger("test.deferred_format")
+    logger.propagate = False
+    logger.addHandler(handler)
+    listener.start()
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.exception("Failed %s", "x")
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+
+    entry = json.loads(stream.getvalue())
+    assert entry["message"] == "Failed x"
+    assert "ValueError: boom" in entry["exc_info"]
+    assert formatting_threads and threading.current_thread() not in formatting_threads
+
+
+def _log_in_worker(marker):
+    get_logger("tests.worker").warning(marker)
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_forked_pool_workers_write_their_records():
+    # Configures the queue handler and its listener in this process before forking
+    get_logger("tests.parent")
+    marker = f"logged from a worker {uuid.uuid4()}"
+    context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=configure_worker_logging) as executor:
+        executor.submit(_log_in_worker, marker).result(timeout=10)
+    with open(settings.LOG_FILE, encoding="utf-8") as f:
+        assert marker in f.read()
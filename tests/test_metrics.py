@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from utils.metrics import MetricsRegistry, current_rss_bytes, percentile
+from config.settings import settings
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_percentile():
+    assert percentile([], 0.5) is None
+    assert percentile([5, 1, 3, 2, 4], 0.5) == 3
+    assert percentile(list(range(1, 101)), 0.95) == 95
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_prometheus_export():
+    registry = MetricsRegistry()
+    requests = registry.counter("test_requests_total", "Requests.")
+    latency = registry.histogram("test_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    requests.inc(host="a")
+    requests.inc(2, host="a")
+    latency.observe(0.05, stage="fetch")
+    latency.observe(0.5, stage="fetch")
+
+    text = registry.to_prometheus()
+    assert 'test_requests_total{host="a"} 3' in text
+    assert 'test_latency_seconds_bucket{stage="fetch",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{stage="fetch",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{stage="fetch",le="+Inf"} 2' in text
+    assert 'test_latency_seconds_count{stage="fetch"} 2' in text
+    assert "# TYPE test_latency_seconds histogram" in text
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_write_json_report(tmp_path):
+    registry = MetricsRegistry()
+    latency = registry.histogram("test_latency_seconds", "Latency.")
+    with latency.time(stage="publish"):
+        pass
+    path = tmp_path / "report.json"
+    registry.write_report(json_path=str(path), extra={"run_id": 7})
+
+    report = json.loads(path.read_text())
+    assert report["run_id"] == 7
+    series = report["histograms"]["test_latency_seconds"][0]
+    assert series["labels"] == {"stage": "publish"}
+    assert series["count"] == 1
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_gauge_set_max_keeps_peak():
+    registry = MetricsRegistry()
+    peak = registry.gauge("test_peak_bytes", "Peak.")
+    for value in (5, 9, 3):
+        peak.set_max(value, stage="scrape")
+    assert peak.value(stage="scrape") == 9
+    assert current_rss_bytes() is None or current_rss_bytes() > 0
@@ -0,0 +1,67 @@
+import pytest
+
+from data_processing.model_router import ModelRouter
+from config.settings import settings
+
+PRICES = {
+    "pro": {"prompt": 1.25, "completion": 10.0},
+    "flash": {"prompt": 0.30, "completion": 2.50},
+    "lite": {"prompt": 0.10, "completion": 0.40},
+}
+
+
+def make_router(**overrides):
+    options = dict(
+        task_models={"summarize_content": "pro", "summarize_comments": "flash"},
+        prices=PRICES,
+        small_input_tokens=1000,
+        latency_target=10.0,
+        max_error_rate=0.3,
+        window_seconds=300,
+        min_samples=3,
+    )
+    options.update(overrides)
+    return ModelRouter(**options)
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_router_uses_cheaper_model_for_small_inputs():
+    router = make_router()
+    assert router.tiers == ["lite", "flash", "pro"]
+    assert router.choose("summarize_content", 5000) == "pro"
+    assert router.choose("summarize_content", 500) == "flash"
+    assert router.choose("summarize_comments", 500) == "lite"
+    assert router.cheaper("lite") is None
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_router_avoids_slow_or_failing_models():
+    router = make_router()
+    for _ in range(3):
+        router.record("pro", latency=30.0, ok=True)
+    assert not router.is_healthy("pro")
+    assert router.choose("summarize_content", 5000) == "flash"
+
+    for _ in range(3):
+        router.record("flash", latency=1.0, ok=False)
+    assert router.choose("summarize_content", 5000) == "lite"
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_router_recovers_after_window():
+    router = make_router(window_seconds=0.0)
+    for _ in range(3):
+        router.record("pro", latency=30.0, ok=True)
+    assert router.choose("summarize_content", 5000) == "pro"
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_router_respects_cost_ceiling():
+    router = make_router(cost_ceiling=0.02)
+    assert router.choose("summarize_content", 5000) == "pro"
+    router.record("pro", latency=1.0, ok=True, cost=0.015)
+    # 5000 prompt + 1000 completion tokens on pro would cost ~0.016 more
+    assert router.choose("summarize_content", 5000) == "flash"
+    # A new run (e.g. the next daemon cycle) gets the full budget again
+    router.reset_spent()
+    assert router.choose("summarize_content", 5000) == "pro"
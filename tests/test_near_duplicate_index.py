@@ -0,0 +1,65 @@
+import random
+import time
+
+import pytest
+
+from data_output.near_duplicate_index import NearDuplicateIndex
+from data_processing.minhash import estimate_similarity, minhash_signature
+from config.settings import settings
+
+
+def make_text(seed, words=600):
+    rng = random.Random(seed)
+    return " ".join(f"word{rng.randint(0, 5000)}" for _ in range(words))
+
+
+def edit_text(text, every=50):
+    words = text.split()
+    return " ".join("changed" if i % every == 0 else word for i, word in enumerate(words))
+
+
+@pytest.fixture
+def near_duplicates(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "near_duplicates.sqlite3"), bands=16)
+    yield index
+    index.close()
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_minhash_estimates_similarity():
+    text = make_text(1)
+    signature = minhash_signature(text, 64, 5)
+    assert estimate_similarity(signature, minhash_signature(text, 64, 5)) == 1.0
+    assert estimate_similarity(signature, minhash_signature(edit_text(text), 64, 5)) >= 0.6
+    assert estimate_similarity(signature, minhash_signature(make_text(2), 64, 5)) <= 0.1
+    assert minhash_signature("too short", 64, 5, min_words=100) is None
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_near_duplicate_index_finds_similar_stories(near_duplicates):
+    text = make_text(1)
+    near_duplicates.add("a", "http://test.com/a", minhash_signature(text, 64, 5), "summary a", title="A")
+    near_duplicates.add("b", "http://test.com/b", minhash_signature(make_text(2), 64, 5), "summary b")
+
+    match = near_duplicates.find(minhash_signature(edit_text(text, every=100), 64, 5), threshold=0.6)
+    assert match.url == "http://test.com/a"
+    assert match.summary == "summary a"
+    assert near_duplicates.find(minhash_signature(make_text(3), 64, 5), threshold=0.6) is None
+    assert near_duplicates.describe() == {"entries": 2}
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_near_duplicate_index_prunes_expired_stories(tmp_path, monkeypatch):
+    index = NearDuplicateIndex(str(tmp_path / "near_duplicates.sqlite3"), bands=16, retention_days=1)
+    text = make_text(1)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now - 2 * 24 * 60 * 60)
+    index.add("a", "http://test.com/a", minhash_signature(text, 64, 5), "summary a")
+    monkeypatch.setattr(time, "time", lambda: now)
+    # Expired stories are no longer matched, even before they are pruned
+    assert index.find(minhash_signature(text, 64, 5), threshold=0.6) is None
+
+    index.add("b", "http://test.com/b", minhash_signature(make_text(2), 64, 5), "summary b")
+    assert index.describe() == {"entries": 1}
+    assert index._conn.execute("SELECT COUNT(DISTINCT unique_id) FROM lsh_buckets").fetchone()[0] == 1
+    index.close()
@@ -79,3 +79,123 @@ async def test_publish_with_long_summary(notion_publisher_for_integration_test):
     # We can only assert on the success of the publish operation.
     result = await notion_publisher_for_integration_test.publish(digest)
     assert result is True
+
+
+def _make_digest(original_content: str) -> DailyDigest:
+    return DailyDigest(
+        unique_id="test_id",
+        retrieval_info=RetrievalInfo(retrieved_date=datetime.now(), source_type="test_source"),
+        core_content=CoreContent(
+            title="Test Title",
+            url="http://test.com",
+            publication_date=datetime.now(),
+            source_outlet=SourceOutlet(name="Test Outlet", domain="testoutlet.com"),
+            media_type="article",
+            language="en",
+            original_content=original_content,
+        ),
+        analysis_summary=AnalysisSummary(summary="A summary."),
+    )
+
+
+@pytest.fixture
+def async_mock_publisher(monkeypatch):
+    monkeypatch.setattr(settings, "NOTION_RATE_LIMIT", 1000)
+    publisher = NotionPublisher(database_id="test_db_id")
+    client = AsyncMock()
+    client.databases.retrieve.return_value = {"data_sources": [{"id": "ds_id"}]}
+    client.pages.create.return_value = {"id": "new_page"}
+    client.blocks.children.list.return_value = {"results": [{"id": "old_block"}], "has_more": False}
+    publisher.client = client
+    return publisher
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_publish_creates_page_and_appends_remaining_blocks(async_mock_publisher):
+    client = async_mock_publisher.client
+    client.data_sources.query.return_value = {"results": []}
+    # 250 paragraphs + 2 headings + 1 summary paragraph = 253 blocks
+    digest = _make_digest("\n".join(f"paragraph {i}" for i in range(250)))
+
+    assert await async_mock_publisher.publish(digest) is True
+    assert len(client.pages.create.call_args.kwargs["children"]) == 100
+    appended = [call.kwargs["children"] for call in client.blocks.children.append.call_args_list]
+    assert [len(batch) for batch in appended] == [100, 53]
+    assert appended[-1][-1]["paragraph"]["rich_text"][0]["text"]["content"] == "paragraph 249"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_publish_updates_existing_page(async_mock_publisher):
+    client = async_mock_publisher.client
+    client.data_sources.query.return_value = {"results": [{"id": "existing_page"}]}
+
+    assert await async_mock_publisher.publish(_make_digest("content")) is True
+    client.pages.create.assert_not_called()
+    assert client.pages.update.call_args.kwargs["page_id"] == "existing_page"
+    client.blocks.delete.assert_awaited_once_with(block_id="old_block")
+    assert client.blocks.children.append.call_args.kwargs["block_id"] == "existing_page"
+    # The new body is appended before the old blocks are deleted
+    calls = [call[0] for call in client.mock_calls]
+    assert calls.index("blocks.children.append") < calls.index("blocks.delete")
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_failed_create_is_not_repeated_once_the_page_exists(async_mock_publisher, monkeypatch):
+    from notion_client.errors import APIResponseError
+
+    monkeypatch.setattr(settings, "HTTP_BACKOFF_BASE", 0.0)
+    client = async_mock_publisher.client
+    bad_gateway = APIResponseError(
+        code="internal_server_error", status=502, message="bad gateway", headers={}, raw_body_text=""
+    )
+    client.pages.create.side_effect = bad_gateway
+    # Not found before the create; the failed create did store the page
+    client.data_sources.query.side_effect = [{"results": []}, {"results": [{"id": "created_page"}]}]
+
+    assert await async_mock_publisher.publish(_make_digest("content")) is True
+    assert client.pages.create.await_count == 1
+    assert client.pages.update.call_args.kwargs["page_id"] == "created_page"
+    assert client.blocks.children.append.call_args.kwargs["block_id"] == "created_page"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_call_retries_rate_limited_requests(async_mock_publisher):
+    from notion_client.errors import APIResponseError
+
+    rate_limited = APIResponseError(
+        code="rate_limited", status=429, message="slow down", headers={"Retry-After": "0"}, raw_body_text=""
+    )
+    method = AsyncMock(side_effect=[rate_limited, {"ok": True}])
+    assert await async_mock_publisher._call(method, page_id="p") == {"ok": True}
+    assert method.await_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_failed_append_is_not_repeated_once_the_blocks_exist(async_mock_publisher, monkeypatch):
+    from notion_client.errors import APIResponseError
+
+    monkeypatch.setattr(settings, "HTTP_BACKOFF_BASE", 0.0)
+    client = async_mock_publisher.client
+    client.data_sources.query.return_value = {"results": [{"id": "existing_page"}]}
+    bad_gateway = APIResponseError(
+        code="internal_server_error", status=502, message="bad gateway", headers={}, raw_body_text=""
+    )
+    rate_limited = APIResponseError(
+        code="rate_limited", status=429, message="slow down", headers={"Retry-After": "0"}, raw_body_text=""
+    )
+    # The first batch is applied despite the 502, the second one is rate limited once
+    client.blocks.children.append.side_effect = [bad_gateway, rate_limited, {}]
+    old_blocks = {"results": [{"id": "old_block"}], "has_more": False}
+    after_first_batch = {"results": [{"id": f"block_{i}"} for i in range(101)], "has_more": False}
+    client.blocks.children.list.side_effect = [old_blocks, after_first_batch]
+    digest = _make_digest("\n".join(f"paragraph {i}" for i in range(150)))
+
+    assert await async_mock_publisher.publish(digest) is True
+    appended = [len(call.kwargs["children"]) for call in client.blocks.children.append.call_args_list]
+    assert appended == [100, 53, 53]
+    client.blocks.delete.assert_awaited_once_with(block_id="old_block")
@@ -0,0 +1,242 @@
+import os
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from data_acquisition.web_scraper import WebScraper
+from data_output.digest_archive import PUBLISHED, RESUMMARIZED
+from data_output.schemas import StoryAnalysis
+from main import Orchestrator
+from config.settings import settings
+from utils.content_spool import ContentSpool
+
+STORIES = {
+    1: {"id": 1, "title": "Story 1", "url": "http://test.com/1", "time": 0, "kids": [11]},
+    2: {"id": 2, "title": "Ask HN: no url", "time": 0},
+    3: {"id": 3, "title": "Story 3", "url": "http://test.com/3", "time": 0},
+}
+
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DEDUP_INDEX_PATH", str(tmp_path / "dedup.sqlite3"))
+    monkeypatch.setattr(settings, "CHECKPOINT_PATH", str(tmp_path / "checkpoints.sqlite3"))
+    monkeypatch.setattr(settings, "NEAR_DUPLICATE_INDEX_PATH", str(tmp_path / "near_duplicates.sqlite3"))
+    monkeypatch.setattr(settings, "ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "METRICS_JSON_PATH", str(tmp_path / "run_report.json"))
+    monkeypatch.setattr(
+        WebScraper, "fetch_and_extract_content", AsyncMock(side_effect=lambda session, url: f"content of {url}")
+    )
+
+    orchestrator = Orchestrator(session=MagicMock())
+    orchestrator.data_source = MagicMock()
+    orchestrator.data_source.fetch_top_story_ids = AsyncMock(return_value=list(STORIES))
+    orchestrator.data_source.fetch_story_details = AsyncMock(side_effect=lambda story_id: STORIES[story_id])
+    orchestrator.data_source.fetch_comments = AsyncMock(return_value=[{"text": "a comment"}])
+    orchestrator.llm_summarizer = MagicMock(cache=None)
+    orchestrator.llm_summarizer.summarize_content = AsyncMock(return_value="summary")
+    orchestrator.llm_summarizer.summarize_comments = AsyncMock(return_value="comment summary")
+    orchestrator.publisher = MagicMock()
+    orchestrator.publisher.publish = AsyncMock(return_value=True)
+    orchestrator.notifier = MagicMock()
+    orchestrator.notifier.send_notification = AsyncMock(return_value=True)
+    return orchestrator
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_run_publishes_stories_with_urls(orchestrator):
+    await orchestrator.run()
+    published = sorted(call.args[0].core_content.url for call in orchestrator.publisher.publish.call_args_list)
+    assert published == ["http://test.com/1", "http://test.com/3"]
+    assert "--- Comment Summary ---" in orchestrator.publisher.publish.call_args.args[0].analysis_summary.summary
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_run_skips_already_published_stories(orchestrator):
+    await orchestrator.run()
+    orchestrator.publisher.publish.reset_mock()
+    orchestrator.llm_summarizer.summarize_content.reset_mock()
+
+    await orchestrator.run()
+    orchestrator.publisher.publish.assert_not_called()
+    orchestrator.llm_summarizer.summarize_content.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_resume_only_redoes_unfinished_work(orchestrator):
+    orchestrator.publisher.publish.return_value = False
+    await orchestrator.run()
+    assert orchestrator.llm_summarizer.summarize_content.await_count == 2
+
+    orchestrator.publisher.publish.reset_mock(return_value=True)
+    orchestrator.publisher.publish.return_value = True
+    orchestrator.data_source.fetch_top_story_ids.reset_mock()
+    WebScraper.fetch_and_extract_content.reset_mock()
+    orchestrator.llm_summarizer.summarize_content.reset_mock()
+
+    await orchestrator.run(resume=True)
+    orchestrator.data_source.fetch_top_story_ids.assert_not_called()
+    WebScraper.fetch_and_extract_content.assert_not_called()
+    orchestrator.llm_summarizer.summarize_content.assert_not_called()
+    assert orchestrator.publisher.publish.await_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_structured_output_fills_analysis_and_falls_back(orchestrator, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_STRUCTURED_OUTPUT", True)
+    analysis = StoryAnalysis(summary="structured", comment_summary="comments", keywords=["a", "b"])
+    orchestrator.llm_summarizer.analyze_story = AsyncMock(side_effect=[analysis, None])
+
+    await orchestrator.run()
+    digests = {call.args[0].analysis_summary.summary: call.args[0] for call in orchestrator.publisher.publish.call_args_list}
+    structured = next(digest for summary, digest in digests.items() if summary.startswith("structured"))
+    assert structured.analysis_summary.keywords == ["a", "b"]
+    assert "comments" in structured.analysis_summary.summary
+    # The story whose structured call failed went through the two-call path
+    assert orchestrator.llm_summarizer.summarize_content.await_count == 1
+    assert any(summary.startswith("summary") for summary in digests)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_near_duplicate_reuses_summary(orchestrator, monkeypatch):
+    monkeypatch.setattr(settings, "NEAR_DUPLICATE_MIN_WORDS", 10)
+    body = " ".join(f"word{i}" for i in range(300))
+    monkeypatch.setattr(
+        WebScraper, "fetch_and_extract_content", AsyncMock(side_effect=lambda session, url: f"{body} via {url}")
+    )
+
+    orchestrator.data_source.fetch_comments = AsyncMock(
+        side_effect=lambda kids, limit: [{"text": f"comment on {kids}"}]
+    )
+    orchestrator.llm_summarizer.summarize_comments = AsyncMock(
+        side_effect=lambda comments: f"discussion: {comments[0]['text']}"
+    )
+
+    orchestrator.data_source.fetch_top_story_ids.return_value = [1]
+    await orchestrator.run()
+    orchestrator.data_source.fetch_top_story_ids.return_value = [3]
+    await orchestrator.run()
+    assert orchestrator.llm_summarizer.summarize_content.await_count == 1
+    assert orchestrator.llm_summarizer.summarize_comments.await_count == 2
+    first, second = [call.args[0] for call in orchestrator.publisher.publish.call_args_list]
+    assert first.core_content.related_urls == [] and second.core_content.related_urls == ["http://test.com/1"]
+    assert first.analysis_summary.summary.endswith("discussion: comment on [11]")
+    assert second.analysis_summary.summary.endswith("discussion: comment on []")
+    assert second.analysis_summary.summary.count("--- Comment Summary ---") == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_daemon_processes_only_stories_entering_the_front_page(orchestrator, monkeypatch):
+    monkeypatch.setattr(settings, "DAEMON_INTERVAL", 0)
+    monkeypatch.setitem(STORIES, 4, {"id": 4, "title": "Story 4", "url": "http://test.com/4", "time": 0})
+    orchestrator.data_source.fetch_top_story_ids = AsyncMock(side_effect=[[1, 2, 3], [1, 2, 3], [4, 1, 3]])
+
+    await orchestrator.run_daemon(max_cycles=3)
+    fetched = [call.args[0] for call in orchestrator.data_source.fetch_story_details.call_args_list]
+    assert fetched == [1, 2, 3, 4]
+    published = sorted(call.args[0].core_content.url for call in orchestrator.publisher.publish.call_args_list)
+    assert published == ["http://test.com/1", "http://test.com/3", "http://test.com/4"]
+    orchestrator.notifier.send_notification.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_daemon_retries_unpublished_stories_when_updated(orchestrator, monkeypatch):
+    monkeypatch.setattr(settings, "DAEMON_INTERVAL", 0)
+    monkeypatch.setattr(settings, "DAEMON_WATCH_UPDATES", True)
+    orchestrator.data_source.fetch_top_story_ids = AsyncMock(return_value=[1, 3])
+    orchestrator.data_source.fetch_updated_item_ids = AsyncMock(side_effect=[set(), {3}])
+    orchestrator.publisher.publish = AsyncMock(side_effect=lambda digest: digest.core_content.url.endswith("1"))
+
+    await orchestrator.run_daemon(max_cycles=3)
+    fetched = [call.args[0] for call in orchestrator.data_source.fetch_story_details.call_args_list]
+    assert fetched == [1, 3, 3]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_queue_worker_drains_jobs_and_retries_failures(orchestrator, monkeypatch, tmp_path):
+    from utils.work_queue import DONE, FAILED, WorkQueue
+
+    monkeypatch.setattr(settings, "QUEUE_PATH", str(tmp_path / "work_queue.sqlite3"))
+    monkeypatch.setattr(settings, "QUEUE_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(settings, "QUEUE_POLL_INTERVAL", 0.01)
+    queue = WorkQueue(settings.QUEUE_PATH, visibility_timeout=60, max_attempts=2)
+    queue.enqueue({str(story_id): story for story_id, story in STORIES.items()})
+    orchestrator.publisher.publish = AsyncMock(side_effect=lambda digest: digest.core_content.url.endswith("1"))
+
+    assert await orchestrator.work_queue() == 2
+    counts = queue.counts()
+    queue.close()
+    # Story 2 has no URL and is done; story 3 failed to publish on both attempts
+    assert counts[DONE] == 2 and counts[FAILED] == 1
+    assert orchestrator.publisher.publish.await_count == 3
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_queue_worker_does_not_retry_unextractable_articles(orchestrator, monkeypatch, tmp_path):
+    from utils.work_queue import DONE, WorkQueue
+
+    monkeypatch.setattr(settings, "QUEUE_PATH", str(tmp_path / "work_queue.sqlite3"))
+    monkeypatch.setattr(settings, "QUEUE_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(
+        WebScraper, "fetch_and_extract_content",
+        AsyncMock(side_effect=lambda session, url: None if url.endswith("3") else f"content of {url}"),
+    )
+    queue = WorkQueue(settings.QUEUE_PATH, visibility_timeout=60, max_attempts=3)
+    queue.enqueue({str(story_id): story for story_id, story in STORIES.items()})
+
+    assert await orchestrator.work_queue() == 3
+    assert queue.counts()[DONE] == 3
+    queue.close()
+    assert WebScraper.fetch_and_extract_content.await_count == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_published_stories_are_archived_and_can_be_resummarized(orchestrator):
+    await orchestrator.run()
+    assert orchestrator.archive.describe()["digests"] == 2
+    WebScraper.fetch_and_extract_content.reset_mock()
+    orchestrator.llm_summarizer.summarize_content = AsyncMock(return_value="new summary")
+
+    assert await orchestrator.resummarize_archive() == 2
+    WebScraper.fetch_and_extract_content.assert_not_called()
+    stories = list(orchestrator.archive.query())
+    assert all(story.digest.analysis_summary.summary.startswith("new summary") for story in stories)
+    assert all(story.kind == RESUMMARIZED for story in stories)
+    assert stories[0].comments == [{"text": "a comment"}]
+    # The published versions are kept, including when they were retrieved
+    description = orchestrator.archive.describe()
+    assert description["digests"] == 2 and description["versions"] == 4
+    published = orchestrator.archive.get(stories[0].digest.unique_id, kind=PUBLISHED)
+    assert not published.digest.analysis_summary.summary.startswith("new summary")
+    assert published.digest.retrieval_info == stories[0].digest.retrieval_info
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_memory_bounded_mode_spools_content_until_publishing(orchestrator, tmp_path):
+    orchestrator.spool = ContentSpool(str(tmp_path / "spool"))
+    published = {}
+
+    async def publish(digest):
+        published[digest.core_content.url] = digest.core_content.original_content
+        return True
+
+    orchestrator.publisher.publish = AsyncMock(side_effect=publish)
+    contexts = await orchestrator.run()
+
+    assert published == {url: f"content of {url}" for url in ("http://test.com/1", "http://test.com/3")}
+    assert all(context.original_content is None for context in contexts)
+    assert all(context.digest.core_content.original_content == "" for context in contexts)
+    assert os.listdir(orchestrator.spool.directory) == [".lock"]
+    assert orchestrator.archive.get(contexts[0].digest.unique_id).digest.core_content.original_content
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from utils.metrics import STAGE_PEAK_RSS, current_rss_bytes
+from utils.pipeline import Pipeline, Stage
+from config.settings import settings
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_pipeline_runs_items_through_all_stages():
+    async def double(x):
+        return x * 2
+
+    async def add_one(x):
+        return x + 1
+
+    pipeline = Pipeline([Stage("double", double, 2), Stage("add_one", add_one, 3)])
+    results = await pipeline.run(range(10))
+    assert sorted(results) == [x * 2 + 1 for x in range(10)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_pipeline_drops_none_and_failed_items():
+    async def keep_even(x):
+        if x == 4:
+            raise ValueError("boom")
+        return x if x % 2 == 0 else None
+
+    async def identity(x):
+        return x
+
+    pipeline = Pipeline([Stage("filter", keep_even, 2), Stage("identity", identity, 1)])
+    results = await pipeline.run(range(8))
+    assert sorted(results) == [0, 2, 6]
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_pipeline_overlaps_stages():
+    async def slow(x):
+        await asyncio.sleep(0.05)
+        return x
+
+    # 8 items through two stages of 4 workers each: sequential processing would
+    # take 16 * 0.05s, a pipelined run takes roughly 3 * 0.05s.
+    pipeline = Pipeline([Stage("a", slow, 4), Stage("b", slow, 4)])
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    results = await pipeline.run(range(8))
+    assert sorted(results) == list(range(8))
+    assert loop.time() - start < 0.4
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_pipeline_records_peak_rss_per_stage():
+    async def allocate(x):
+        return bytearray(1024 * 1024)
+
+    async def keep(x):
+        return len(x)
+
+    await Pipeline([Stage("allocate", allocate), Stage("keep", keep)]).run(range(3))
+    if current_rss_bytes() is not None:
+        assert STAGE_PEAK_RSS.value(stage="allocate") > 0
+        assert STAGE_PEAK_RSS.value(stage="keep") > 0
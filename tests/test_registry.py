@@ -0,0 +1,27 @@
+import sys
+
+import pytest
+
+from utils.registry import LazyRegistry
+from config.settings import settings
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_lazy_registry_imports_on_first_load(monkeypatch):
+    monkeypatch.delitem(sys.modules, "colorsys", raising=False)
+    registry = LazyRegistry()
+    registry.register("colors", "colorsys:rgb_to_hsv")
+
+    assert "colorsys" not in sys.modules
+    assert not registry.is_loaded("colors")
+    assert registry.load("colors") is sys.modules["colorsys"].rgb_to_hsv
+    assert registry.loaded() == ["colors"]
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_lazy_registry_rejects_bad_targets():
+    registry = LazyRegistry()
+    with pytest.raises(ValueError):
+        registry.register("bad", "colorsys.rgb_to_hsv")
+    with pytest.raises(KeyError):
+        registry.load("missing")
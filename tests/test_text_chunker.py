@@ -0,0 +1,49 @@
+import pytest
+
+from data_processing.text_chunker import CHARS_PER_TOKEN, chunk_text, estimate_tokens, truncate_to_tokens
+from config.settings import settings
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a" * CHARS_PER_TOKEN * 10) == 10
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_chunk_text_keeps_short_text_whole():
+    text = "First paragraph.\nSecond paragraph."
+    assert chunk_text(text, max_tokens=100) == [text]
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_chunk_text_respects_token_limit():
+    paragraphs = [f"Paragraph {i} " + "word " * 50 for i in range(20)]
+    chunks = chunk_text("\n".join(paragraphs), max_tokens=100)
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 100 for chunk in chunks)
+    assert all(f"Paragraph {i} " in "".join(chunks) for i in range(20))
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_chunk_text_splits_oversized_paragraph():
+    chunks = chunk_text("x" * (CHARS_PER_TOKEN * 250), max_tokens=100)
+    assert [len(chunk) for chunk in chunks] == [400, 400, 200]
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_chunk_text_joins_sentences_with_spaces():
+    sentences = [f"Sentence {i} is about this." for i in range(40)]
+    paragraph = " ".join(sentences)
+    chunks = chunk_text(f"{paragraph}\nShort paragraph.", max_tokens=100)
+    assert len(chunks) > 1
+    assert all("\n" not in chunk for chunk in chunks[:-1])
+    assert chunks[-1].endswith(".\nShort paragraph.")
+    assert " ".join(chunks).replace("\n", " ") == f"{paragraph} Short paragraph."
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_truncate_to_tokens_prefers_paragraph_boundary():
+    text = "a" * 300 + "\n" + "b" * 300
+    assert truncate_to_tokens(text, max_tokens=100) == "a" * 300
+    assert truncate_to_tokens("short", max_tokens=100) == "short"
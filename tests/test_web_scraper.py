@@ -0,0 +1,94 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from data_acquisition.web_scraper import ExtractionDeadlineExceeded, WebScraper, _deadline
+from config.settings import settings
+
+ARTICLE_HTML = (
+    "<html><head><title>Test</title></head><body><article>"
+    + "".join(f"<p>This is paragraph number {i} of a reasonably long test article body.</p>" for i in range(30))
+    + "</article></body></html>"
+)
+
+
+@pytest.fixture(autouse=True)
+def extraction_profiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTION_PROFILES_PATH", str(tmp_path / "extraction_profiles.sqlite3"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_extract_content_runs_in_executor():
+    try:
+        content = await WebScraper.extract_content(ARTICLE_HTML, "http://test.com")
+    finally:
+        WebScraper.shutdown()
+    assert content is not None
+    assert "paragraph number 0" in content
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_extract_content_timeout_returns_none(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTION_EXECUTOR", "thread")
+    monkeypatch.setattr(settings, "EXTRACTION_TIMEOUT", 0.0)
+    monkeypatch.setattr(settings, "EXTRACTION_QUEUE_GRACE", 0.0)
+    try:
+        content = await WebScraper.extract_content(ARTICLE_HTML, "http://test.com")
+    finally:
+        WebScraper.shutdown()
+    assert content is None
+
+
+def _sleep_with_deadline(seconds, deadline):
+    with _deadline(deadline):
+        time.sleep(seconds)
+    return "finished"
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_extraction_deadline_frees_the_worker_process():
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(ExtractionDeadlineExceeded):
+            executor.submit(_sleep_with_deadline, 30, 0.2).result(timeout=10)
+        # The only worker is free again for the next job
+        assert executor.submit(_sleep_with_deadline, 0, 0.2).result(timeout=10) == "finished"
+    # Outside of a worker process the deadline does nothing
+    assert _sleep_with_deadline(0.3, 0.1) == "finished"
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_extract_content_learns_a_domain_profile(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTION_EXECUTOR", "thread")
+    monkeypatch.setattr(settings, "EXTRACTION_PROFILE_LEARN_AFTER", 2)
+    page = ARTICLE_HTML.replace("<article>", "<article class='post'>")
+    try:
+        contents = [await WebScraper.extract_content(page, "https://www.test.com/1")]
+        # One page is not enough to learn from
+        assert WebScraper.get_profiles().stats("test.com")["selector"] is None
+        contents += [await WebScraper.extract_content(page, f"https://test.com/{i}") for i in (2, 3)]
+        stats = WebScraper.get_profiles().stats("test.com")
+    finally:
+        WebScraper.shutdown()
+    assert all("paragraph number 29" in content for content in contents)
+    assert stats["selector"] == "//article[@class='post']"
+    assert (stats["full"], stats["profile"]) == (2, 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+async def test_waiting_for_a_worker_does_not_count_towards_the_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "EXTRACTION_EXECUTOR", "thread")
+    monkeypatch.setattr(settings, "EXTRACTION_WORKERS", 1)
+    monkeypatch.setattr(settings, "EXTRACTION_TIMEOUT", 0.5)
+    monkeypatch.setattr(settings, "EXTRACTION_QUEUE_GRACE", 5.0)
+    try:
+        # The single worker is busy for longer than the parse budget
+        WebScraper.get_executor().submit(time.sleep, 1.0)
+        content = await WebScraper.extract_content(ARTICLE_HTML, "http://test.com")
+    finally:
+        WebScraper.shutdown()
+    assert content is not None
@@ -0,0 +1,57 @@
+import pytest
+
+from utils.work_queue import DONE, FAILED, LEASED, PENDING, WorkQueue
+from config.settings import settings
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "work_queue.sqlite3")
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_jobs_are_claimed_once_and_completed(queue_path):
+    queue = WorkQueue(queue_path, visibility_timeout=60, max_attempts=3)
+    assert queue.enqueue({"1": {"id": 1}, "2": {"id": 2}}) == 2
+    other = WorkQueue(queue_path, visibility_timeout=60, max_attempts=3)
+
+    first, second = queue.claim("a"), other.claim("b")
+    assert {first.payload["id"], second.payload["id"]} == {1, 2}
+    assert queue.claim("a") is None
+    assert queue.counts()[LEASED] == 2
+
+    assert not queue.complete(second, "a")
+    assert queue.complete(first, "a") and other.complete(second, "b")
+    assert queue.counts()[DONE] == 2 and not queue.has_unfinished()
+    # Finished jobs are queued again, unfinished ones are left alone
+    assert queue.enqueue({"1": {"id": 1}, "3": {"id": 3}}) == 2
+    queue.claim("a")
+    assert queue.enqueue({"1": {"id": 1}}) == 0
+    queue.close()
+    other.close()
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_expired_leases_are_retried_up_to_max_attempts(queue_path):
+    queue = WorkQueue(queue_path, visibility_timeout=-1, max_attempts=2)
+    queue.enqueue({"1": {"id": 1}})
+
+    crashed = queue.claim("crashed-worker")
+    retried = queue.claim("b")
+    assert retried.job_id == crashed.job_id and retried.attempts == 2
+    assert not queue.complete(crashed, "crashed-worker")
+    # Out of attempts once the second lease expires too
+    assert queue.claim("c") is None
+    assert queue.counts()[FAILED] == 1
+    queue.close()
+
+
+@pytest.mark.skipif(not settings.TEST_MODE, reason="测试模式未启用")
+def test_failed_jobs_are_released_for_retry(queue_path):
+    queue = WorkQueue(queue_path, visibility_timeout=60, max_attempts=2)
+    queue.enqueue({"1": {"id": 1}})
+    assert queue.fail(queue.claim("a"), "a", "boom")
+    assert queue.counts()[PENDING] == 1
+    assert queue.fail(queue.claim("a"), "a", "boom again")
+    assert queue.counts()[FAILED] == 1 and queue.claim("a") is None
+    queue.close()
@@ -0,0 +1,148 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Stages a story moves through, in order
+QUEUED = "queued"
+FETCHED = "fetched"
+EXTRACTED = "extracted"
+SUMMARIZED = "summarized"
+PUBLISHED = "published"
+# Stories that were deliberately dropped (no URL, already published, ...)
+SKIPPED = "skipped"
+
+DONE_STAGES = (PUBLISHED, SKIPPED)
+
+
+@dataclass
+class StoryCheckpoint:
+    """The last recorded stage of a story and the artifacts produced so far."""
+    story_id: int
+    stage: str
+    story_data: Optional[Dict[str, Any]] = None
+    original_content: Optional[str] = None
+    comments: List[Dict[str, Any]] = field(default_factory=list)
+    summary: Optional[str] = None
+
+
+class CheckpointStore:
+    """Records per-story progress of each run so an interrupted run can be resumed."""
+
+    def __init__(self, path: str, keep_runs: int):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.keep_runs = keep_runs
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS stories (
+                run_id INTEGER NOT NULL,
+                story_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                stage TEXT NOT NULL,
+                story_json TEXT,
+                original_content TEXT,
+                comments_json TEXT,
+                summary TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, story_id)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def start_run(self, story_ids: List[int]) -> int:
+        """Register a new run with its story list and prune the oldest runs."""
+        now = time.time()
+        with self._lock:
+            run_id = self._conn.execute("INSERT INTO runs (started_at) VALUES (?)", (now,)).lastrowid
+            self._conn.executemany(
+                "INSERT INTO stories (run_id, story_id, position, stage, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [(run_id, story_id, position, QUEUED, now) for position, story_id in enumerate(story_ids)],
+            )
+            stale_runs = "SELECT run_id FROM runs ORDER BY run_id DESC LIMIT -1 OFFSET ?"
+            self._conn.execute(f"DELETE FROM stories WHERE run_id IN ({stale_runs})", (self.keep_runs,))
+            self._conn.execute(f"DELETE FROM runs WHERE run_id IN ({stale_runs})", (self.keep_runs,))
+            self._conn.commit()
+        return run_id
+
+    def latest_run(self) -> Optional[int]:
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(run_id) FROM runs").fetchone()
+        return row[0]
+
+    def save(
+        self,
+        run_id: int,
+        story_id: int,
+        stage: str,
+        story_data: Optional[Dict[str, Any]] = None,
+        original_content: Optional[str] = None,
+        comments: Optional[List[Dict[str, Any]]] = None,
+        summary: Optional[str] = None,
+    ):
+        """Record that a story reached `stage`, storing any artifacts that were passed in."""
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE stories SET
+                    stage = ?,
+                    story_json = COALESCE(?, story_json),
+                    original_content = COALESCE(?, original_content),
+                    comments_json = COALESCE(?, comments_json),
+                    summary = COALESCE(?, summary),
+                    updated_at = ?
+                WHERE run_id = ? AND story_id = ?
+                """,
+                (
+                    stage,
+                    json.dumps(story_data) if story_data is not None else None,
+                    original_content,
+                    json.dumps(comments) if comments is not None else None,
+                    summary,
+                    time.time(),
+                    run_id,
+                    story_id,
+                ),
+            )
+            self._conn.commit()
+
+    def pending_stories(self, run_id: int) -> List[StoryCheckpoint]:
+        """Return the stories of a run that were neither published nor skipped, in run order."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT story_id, stage, story_json, original_content, comments_json, summary
+                FROM stories WHERE run_id = ? AND stage NOT IN ({", ".join("?" * len(DONE_STAGES))})
+                ORDER BY position
+                """,
+                (run_id, *DONE_STAGES),
+            ).fetchall()
+        return [
+            StoryCheckpoint(
+                story_id=story_id,
+                stage=stage,
+                story_data=json.loads(story_json) if story_json else None,
+                original_content=original_content,
+                comments=json.loads(comments_json) if comments_json else [],
+                summary=summary,
+            )
+            for story_id, stage, story_json, original_content, comments_json, summary in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
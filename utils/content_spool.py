@@ -0,0 +1,91 @@
+import os
+import shutil
+import socket
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+LOCK_FILE = ".lock"
+
+
+class ContentSpool:
+    """Article bodies parked on disk between pipeline stages.
+
+    Used by the memory-bounded mode so that stories waiting in the stage
+    queues hold a key instead of the extracted text. Each process spools to
+    its own `<host>-<pid>` subdirectory, so worker processes never clear
+    each other's files, and holds an exclusive lock on a lock file in it for
+    as long as it runs. When a spool is created, subdirectories whose lock
+    can be taken belong to exited processes and are removed; directories
+    without a lock file are left alone.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.join(directory, f"{socket.gethostname()}-{os.getpid()}")
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = self._try_lock(self.directory)
+        self._sweep_stale(directory)
+
+    @staticmethod
+    def _try_lock(directory: str):
+        """Take the lock of a spool directory without blocking; returns the open lock file, or None."""
+        if fcntl is None:
+            return None
+        lock = open(os.path.join(directory, LOCK_FILE), "a")
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            return None
+        return lock
+
+    def _sweep_stale(self, directory: str):
+        if fcntl is None:
+            return
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if path == self.directory or not os.path.isfile(os.path.join(path, LOCK_FILE)):
+                continue
+            lock = self._try_lock(path)
+            if lock is None:
+                continue
+            try:
+                shutil.rmtree(path, ignore_errors=True)
+                logger.info(f"Removed the spool directory {name} of an exited process.")
+            finally:
+                lock.close()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def put(self, key: str, content: str):
+        tmp_path = f"{self._path(key)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, self._path(key))
+
+    def get(self, key: str) -> str:
+        with open(self._path(key), encoding="utf-8") as f:
+            return f.read()
+
+    def discard(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Remove every spooled body of this process, keeping its lock file."""
+        for name in os.listdir(self.directory):
+            if name == LOCK_FILE:
+                continue
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    """A response body stored in the HTTP cache with its validators."""
+    body: bytes
+    encoding: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: Optional[float]  # None means the entry never expires
+
+    def is_fresh(self) -> bool:
+        return self.expires_at is None or time.time() < self.expires_at
+
+
+class HttpCache:
+    """Persistent, size-bounded LRU cache of HTTP response bodies keyed by URL.
+
+    Entries expire after a per-host TTL and are then revalidated with
+    ETag/Last-Modified before the body is downloaded again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int,
+        default_ttl: float,
+        host_ttls: Optional[Dict[str, float]] = None,
+    ):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.host_ttls = host_ttls or {}
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                expires_at REAL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+        self._conn.commit()
+
+    def ttl_for(self, url: str) -> float:
+        """Return the configured TTL in seconds for the host of a URL."""
+        host = urlsplit(url).hostname or ""
+        return self.host_ttls.get(host, self.default_ttl)
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Return the cached entry for a URL (fresh or stale) and mark it as recently used."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, encoding, etag, last_modified, expires_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        return CachedResponse(*row)
+
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        encoding: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        immutable: bool = False,
+    ):
+        """Store a response body, evicting least recently used entries if needed."""
+        if len(body) > self.max_bytes:
+            logger.debug("Not caching %s: %d bytes exceeds the cache size.", url, len(body))
+            return
+        now = time.time()
+        expires_at = None if immutable else now + self.ttl_for(url)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, body, encoding, etag, last_modified, expires_at, now, len(body)),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url: str):
+        """Extend the lifetime of an entry after a successful revalidation (304)."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE url = ? AND expires_at IS NOT NULL",
+                (time.time() + self.ttl_for(url), time.time(), url),
+            )
+            self._conn.commit()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            evicted += 1
+        logger.debug("Evicted %d entries from the HTTP cache.", evicted)
+
+    def describe(self) -> Dict[str, Any]:
+        """Entry count, total size and number of stale entries, for cache inspection."""
+        with self._lock:
+            entries, total, stale = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(expires_at <= ?), 0) FROM responses",
+                (time.time(),),
+            ).fetchone()
+        return {"entries": entries, "bytes": total, "stale": stale}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
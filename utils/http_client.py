@@ -1,23 +1,286 @@
-from typing import Any, Dict, Optional
+import asyncio
+import codecs
+import json
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Collection, Dict, Optional, Tuple
+from urllib.parse import urlsplit
 
 import aiohttp
+from yarl import URL
+
+from config.settings import settings
+from utils.http_cache import HttpCache
 from utils.logger import get_logger
+from utils.metrics import HTTP_BYTES, HTTP_REQUEST_DURATION, HTTP_REQUESTS
+from utils.rate_limiter import CircuitBreaker, TokenBucket, backoff_delay, parse_retry_after
 
 logger = get_logger(__name__)
 
+# 500 is included: for GET requests a retry is safe and often succeeds
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+_http_cache: Optional[HttpCache] = None
+
+
+@dataclass
+class HostPolicy:
+    """Rate limit, concurrency limit and circuit breaker shared by all requests to one host."""
+    bucket: TokenBucket
+    semaphore: asyncio.Semaphore
+    breaker: CircuitBreaker
+
+
+_host_policies: Dict[str, HostPolicy] = {}
+
+
+class _RetryableResponse(Exception):
+    """Raised for responses that should be retried (429 and transient 5xx)."""
+
+    def __init__(self, status: int, retry_after: Optional[float]):
+        super().__init__(f"HTTP {status}")
+        self.retry_after = retry_after
+
+
+def get_http_cache() -> Optional[HttpCache]:
+    """Return the shared HTTP response cache, or None if caching is disabled."""
+    global _http_cache
+    if _http_cache is None and settings.HTTP_CACHE_ENABLED:
+        _http_cache = HttpCache(
+            settings.HTTP_CACHE_PATH,
+            max_bytes=settings.HTTP_CACHE_MAX_BYTES,
+            default_ttl=settings.HTTP_CACHE_DEFAULT_TTL,
+            host_ttls=settings.HTTP_CACHE_HOST_TTLS,
+        )
+    return _http_cache
+
+
+async def _cache_call(method: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run an HTTP cache operation off the event loop; a database error is logged and yields None."""
+    try:
+        return await asyncio.to_thread(method, *args, **kwargs)
+    except sqlite3.Error as e:
+        logger.warning(f"HTTP cache {method.__name__} failed, continuing uncached: {e}")
+        return None
+
+
+def get_host_policy(url: str) -> HostPolicy:
+    """Return the request policy for the host of a URL, creating it on first use."""
+    host = urlsplit(url).hostname or ""
+    if host not in _host_policies:
+        limits = settings.HTTP_HOST_LIMITS.get(host, {})
+        _host_policies[host] = HostPolicy(
+            bucket=TokenBucket(
+                rate=limits.get("rate", settings.HTTP_HOST_RATE),
+                capacity=limits.get("burst", settings.HTTP_HOST_BURST),
+            ),
+            semaphore=asyncio.Semaphore(int(limits.get("concurrency", settings.HTTP_HOST_CONCURRENCY))),
+            breaker=CircuitBreaker(
+                host,
+                failure_threshold=settings.HTTP_CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.HTTP_CIRCUIT_RESET_TIMEOUT,
+            ),
+        )
+    return _host_policies[host]
+
 
-async def http_get(session: aiohttp.ClientSession, url: str, params: Optional[Dict[str, Any]] = None, response_type: str = "json") -> Optional[Any]:
-    """Perform an asynchronous GET request using a provided session."""
+def _decode(body: bytes, encoding: Optional[str], response_type: str) -> Any:
+    """Decode a raw response body according to response_type."""
+    text = body.decode(encoding or "utf-8", errors="replace")
+    if response_type == "json":
+        return json.loads(text)
+    return text
+
+
+def _sniff_charset(chunk: bytes) -> Optional[str]:
+    """Find a <meta charset> declaration in the first bytes of a HTML document."""
+    match = _META_CHARSET.search(chunk[:4096])
+    if not match:
+        return None
+    charset = match.group(1).decode("ascii", errors="ignore")
     try:
-        async with session.get(url, params=params) as response:
-            response.raise_for_status()
-            if response_type == "json":
-                return await response.json()
-            elif response_type == "text":
-                return await response.text()
-            else:
-                logger.error(f"Unsupported response_type: {response_type}")
-                return None
-    except aiohttp.ClientError as e:
-        logger.error(f"Error fetching {url}: {e}")
+        codecs.lookup(charset)
+    except LookupError:
         return None
+    return charset
+
+
+async def _read_text_capped(response: aiohttp.ClientResponse, url: str, max_bytes: int) -> Tuple[str, str, int]:
+    """Stream a text body, decoding it chunk by chunk and stopping after max_bytes.
+
+    Returns the text, the encoding used and the number of bytes read.
+    """
+    encoding = response.charset
+    decoder = None
+    parts = []
+    received = 0
+    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+        if decoder is None:
+            encoding = encoding or _sniff_charset(chunk) or "utf-8"
+            try:
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+            except LookupError:
+                encoding = "utf-8"
+                decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        chunk = chunk[:max_bytes - received]
+        received += len(chunk)
+        parts.append(decoder.decode(chunk))
+        if received >= max_bytes:
+            logger.info(f"Stopped reading {url} after {max_bytes} bytes.")
+            break
+    if decoder is not None:
+        parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), encoding or "utf-8", received
+
+
+async def http_get(
+    session: aiohttp.ClientSession,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    response_type: str = "json",
+    immutable: Optional[Callable[[Any], bool]] = None,
+    max_bytes: Optional[int] = None,
+    content_types: Optional[Collection[str]] = None,
+) -> Optional[Any]:
+    """Perform an asynchronous GET request using a provided session.
+
+    When the HTTP cache is enabled, fresh entries are served from disk and
+    stale ones are revalidated with a conditional GET. Cache errors are
+    logged and the request proceeds as if uncached. `immutable` may be a
+    predicate on the decoded payload; if it returns True the entry never expires.
+
+    Requests are throttled per host, retried with exponential backoff on
+    connection errors, 429 and 5xx (honoring Retry-After), and short-circuited
+    while the host's circuit breaker is open.
+
+    `content_types` rejects responses whose Content-Type is not listed before
+    the body is read. With `max_bytes`, responses declaring a larger
+    Content-Length are rejected the same way; other text bodies are streamed
+    and decoded incrementally, and reading stops once the cap is reached.
+    Bodies that reach the cap are not cached.
+    """
+    if response_type not in ("json", "text"):
+        logger.error(f"Unsupported response_type: {response_type}")
+        return None
+
+    cache = get_http_cache()
+    cache_key = str(URL(url).update_query(params)) if params else url
+    cached = await _cache_call(cache.get, cache_key) if cache else None
+    host = urlsplit(url).hostname or ""
+    if cached and cached.is_fresh():
+        HTTP_REQUESTS.inc(host=host, status="cache_hit")
+        logger.debug("HTTP cache hit for %s", cache_key)
+        return _decode(cached.body, cached.encoding, response_type)
+
+    headers = {}
+    if cached:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
+    policy = get_host_policy(url)
+    for attempt in range(settings.HTTP_MAX_RETRIES + 1):
+        if not policy.breaker.allow_request():
+            logger.warning(f"Circuit open for {policy.breaker.name}, not fetching {url}")
+            return None
+        is_trial = policy.breaker.is_open
+
+        retry_after = None
+        try:
+            async with policy.semaphore:
+                await policy.bucket.acquire()
+                start = time.perf_counter()
+                async with session.get(url, params=params, headers=headers or None) as response:
+                    HTTP_REQUESTS.inc(host=host, status=response.status)
+                    if cached and response.status == 304:
+                        logger.debug("HTTP cache revalidated %s", cache_key)
+                        await _cache_call(cache.refresh, cache_key)
+                        policy.breaker.record_success()
+                        return _decode(cached.body, cached.encoding, response_type)
+                    if response.status in RETRYABLE_STATUSES:
+                        raise _RetryableResponse(
+                            response.status, parse_retry_after(response.headers.get("Retry-After"))
+                        )
+
+                    response.raise_for_status()
+                    if (
+                        content_types is not None
+                        and aiohttp.hdrs.CONTENT_TYPE in response.headers
+                        and response.content_type not in content_types
+                    ):
+                        logger.info(f"Skipping {url}: unsupported content type {response.content_type}")
+                        policy.breaker.record_success()
+                        return None
+                    etag = response.headers.get("ETag")
+                    last_modified = response.headers.get("Last-Modified")
+                    if response.content_length and max_bytes is not None and response.content_length > max_bytes:
+                        logger.info(f"Skipping {url}: {response.content_length} bytes exceeds the limit of {max_bytes}.")
+                        policy.breaker.record_success()
+                        return None
+                    if response_type == "text" and max_bytes is not None:
+                        # Chunked or misreported bodies are still cut off at max_bytes
+                        payload, encoding, received = await _read_text_capped(response, url, max_bytes)
+                        body = None
+                        truncated = received >= max_bytes
+                    else:
+                        body = await response.read()
+                        received = len(body)
+                        truncated = False
+                        encoding = response.get_encoding() if response_type == "text" else None
+                        payload = _decode(body, encoding, response_type)
+            HTTP_REQUEST_DURATION.observe(time.perf_counter() - start, host=host)
+            HTTP_BYTES.inc(received, host=host)
+            policy.breaker.record_success()
+
+            # A body cut off at max_bytes is not the resource, so it must not be served from the cache
+            if cache and not truncated:
+                if body is None:
+                    body = payload.encode(encoding, errors="replace")
+                await _cache_call(
+                    cache.put,
+                    cache_key,
+                    body,
+                    encoding=encoding,
+                    etag=etag,
+                    last_modified=last_modified,
+                    immutable=bool(immutable and payload and immutable(payload)),
+                )
+            return payload
+        except _RetryableResponse as e:
+            error = e
+            retry_after = e.retry_after
+        except aiohttp.ClientResponseError as e:
+            # Other HTTP errors (403, 404, ...) are final and say nothing about host health
+            policy.breaker.record_success()
+            logger.error(f"Error fetching {url}: {e}")
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            HTTP_REQUESTS.inc(host=host, status="error")
+            error = e
+        except ValueError as e:
+            policy.breaker.record_success()
+            logger.error(f"Error decoding response from {url}: {e}")
+            return None
+        except BaseException:
+            # Cancelled or failed in an unexpected way: let another request be the trial
+            if is_trial:
+                policy.breaker.release_trial()
+            raise
+
+        policy.breaker.record_failure()
+        if attempt == settings.HTTP_MAX_RETRIES:
+            logger.error(f"Error fetching {url} after {attempt + 1} attempts: {error!r}")
+            return None
+        if retry_after is not None:
+            delay = min(retry_after, settings.HTTP_BACKOFF_MAX)
+        else:
+            delay = backoff_delay(attempt, settings.HTTP_BACKOFF_BASE, settings.HTTP_BACKOFF_MAX)
+        logger.warning(f"Fetching {url} failed ({error!r}), retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+    return None
@@ -1,5 +1,13 @@
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional, Tuple
+
 from config.settings import settings
 
 
@@ -7,30 +15,163 @@ from config.settings import settings
 LOG_FORMAT = '[%(levelname)5s] - %(filename)s:%(lineno)d - %(message)s'
 LOG_FORMAT_EX = '[%(levelname)5s] %(asctime)s - %(name)s - %(filename)s:%(lineno)d - %(message)s'
 
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+# Set in worker processes, which write records directly instead of through the queue
+_worker_handlers: Optional[List[logging.Handler]] = None
+_config_lock = threading.Lock()
 
-def get_logger(name: str) -> logging.Logger:
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": record.created,
+            "level": record.levelname,
+            "logger": record.name,
+            "file": record.filename,
+            "line": record.lineno,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredFormatQueueHandler(QueueHandler):
+    """A QueueHandler that leaves all formatting to the listener thread.
+
+    The stock `prepare()` formats the message on the logging thread and
+    drops `exc_info`; this one only copies the record, keeping its args and
+    exception, so formatters see it as if they were called directly.
     """
-    Get a logger instance with configured handlers.
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return copy.copy(record)
+
+
+class DebugRateLimitFilter(logging.Filter):
+    """Lets at most `limit` DEBUG records per call site through in every `window` seconds.
+
+    Call sites are keyed by logger name and the unformatted message template,
+    so %-style calls on per-item paths (one per comment, request, ...) are
+    sampled while their distinct messages are not lost entirely. The number
+    of dropped records is appended to the next record let through.
     """
-    logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)  # Set the lowest level to capture all messages
 
-    # Avoid adding handlers multiple times
-    if not logger.handlers:
-        # Console handler
+    def __init__(self, limit: int, window: float):
+        super().__init__()
+        self.limit = limit
+        self.window = window
+        self._sites: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.limit <= 0:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            # [window start, records let through, records dropped]
+            site = self._sites.setdefault(key, [now, 0, 0])
+            if now - site[0] >= self.window:
+                site[0], site[1] = now, 0
+            if site[1] >= self.limit:
+                site[2] += 1
+                return False
+            site[1] += 1
+            dropped, site[2] = site[2], 0
+        if dropped:
+            record.msg = f"{record.msg} ({dropped} similar messages suppressed)"
+        return True
+
+
+def configure_logging() -> QueueHandler:
+    """Build the shared logging setup once and return its queue handler.
+
+    Module loggers only enqueue unformatted records; a single QueueListener
+    thread formats them and writes to the console and the rotating log file, so
+    no disk I/O happens on the event loop.
+    """
+    global _queue_handler, _listener
+    with _config_lock:
+        if _queue_handler is not None:
+            return _queue_handler
+
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.getLevelName(settings.LOG_LEVEL))  # Configurable log level
         console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        logger.addHandler(console_handler)
 
-        # File handler (optional, e.g., daily rotation or size-based rotation)
+        # Size-based rotation of the log file
         file_handler = RotatingFileHandler(
-            'app.log',
+            settings.LOG_FILE,
             maxBytes=10*1024*1024,  # 10 MB
-            backupCount=5
+            backupCount=5,
+            encoding="utf-8",
         )
-        file_handler.setLevel(logging.DEBUG)  # Log DEBUG level and above to file
-        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        logger.addHandler(file_handler)
+        file_handler.setLevel(logging.getLevelName(settings.LOG_FILE_LEVEL))
+        file_handler.setFormatter(JsonFormatter() if settings.LOG_JSON else logging.Formatter(LOG_FORMAT))
+
+        _queue_handler = DeferredFormatQueueHandler(queue.SimpleQueue())
+        _queue_handler.addFilter(DebugRateLimitFilter(settings.LOG_DEBUG_RATE_LIMIT, settings.LOG_DEBUG_RATE_WINDOW))
+        _listener = QueueListener(_queue_handler.queue, console_handler, file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+        return _queue_handler
+
+
+def configure_worker_logging():
+    """Make a forked worker process (e.g. of an extraction ProcessPoolExecutor) log directly.
+
+    A forked child inherits the queue handler but not the listener thread
+    that drains its queue, so its records would never be written. The
+    child's loggers get the listener's console and file handlers instead;
+    worker processes run no event loop, so writing in place is fine.
+    Meant to be used as the initializer of process pools.
+    """
+    global _worker_handlers
+    with _config_lock:
+        if _queue_handler is None or _listener is None or _worker_handlers is not None:
+            return
+        _worker_handlers = list(_listener.handlers)
+        for handler in _worker_handlers:
+            for log_filter in _queue_handler.filters:
+                handler.addFilter(log_filter)
+        loggers = [logging.getLogger(), *logging.Logger.manager.loggerDict.values()]
+        for logger in loggers:
+            if isinstance(logger, logging.Logger) and _queue_handler in logger.handlers:
+                logger.removeHandler(_queue_handler)
+                for handler in _worker_handlers:
+                    logger.addHandler(handler)
+
+
+def shutdown_logging():
+    """Flush pending records and stop the listener thread."""
+    global _queue_handler, _listener
+    with _config_lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        _queue_handler = None
+        _listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Get a logger instance attached to the shared queue-based handler.
+    """
+    logger = logging.getLogger(name)
+    # Records below every handler's level are rejected before any formatting happens
+    logger.setLevel(min(
+        logging.getLevelName(settings.LOG_LEVEL),
+        logging.getLevelName(settings.LOG_FILE_LEVEL),
+    ))
+
+    # Avoid adding handlers multiple times
+    if not logger.handlers:
+        for handler in _worker_handlers or [configure_logging()]:
+            logger.addHandler(handler)
 
     return logger
@@ -0,0 +1,306 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Raw observations kept per label set for exact percentiles in the JSON report
+MAX_SAMPLES = 10_000
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def percentile(samples: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where /proc is not available."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class Counter:
+    """A monotonically increasing value per label set."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def total(self) -> float:
+        return sum(self._values.values())
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def to_prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        lines.extend(f"{self.name}{_format_labels(key)} {value:g}" for key, value in sorted(self._values.items()))
+        return lines
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [{"labels": dict(key), "value": value} for key, value in sorted(self._values.items())]
+
+
+class Gauge:
+    """A value per label set that can go up and down (e.g. a concurrency limit)."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def set_max(self, value: float, **labels):
+        """Keep the largest value seen (e.g. a peak)."""
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = max(self._values.get(key, value), value)
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def to_prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        lines.extend(f"{self.name}{_format_labels(key)} {value:g}" for key, value in sorted(self._values.items()))
+        return lines
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [{"labels": dict(key), "value": value} for key, value in sorted(self._values.items())]
+
+
+class Histogram:
+    """Bucketed distribution of observations (e.g. latencies) per label set."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.setdefault(
+                key, {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0, "samples": []}
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+            if len(series["samples"]) < MAX_SAMPLES:
+                series["samples"].append(value)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """Observe the wall-clock duration of the enclosed block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self, **labels) -> List[float]:
+        series = self._series.get(_label_key(labels))
+        return list(series["samples"]) if series else []
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def to_prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            for bound, count in zip(self.buckets, series["counts"]):
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series['sum']:g}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+    def to_dict(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                "labels": dict(key),
+                "count": series["count"],
+                "sum": series["sum"],
+                "p50": percentile(series["samples"], 0.5),
+                "p95": percentile(series["samples"], 0.95),
+                "max": max(series["samples"], default=None),
+            }
+            for key, series in sorted(self._series.items())
+        ]
+
+
+class MetricsRegistry:
+    """Holds all metrics of the process and renders them as Prometheus text or JSON."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._metrics.setdefault(name, Gauge(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def reset(self):
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].to_prometheus())
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        report: Dict[str, Any] = {"counters": {}, "gauges": {}, "histograms": {}}
+        sections = {Counter: "counters", Gauge: "gauges", Histogram: "histograms"}
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            report[sections[type(metric)]][name] = metric.to_dict()
+        return report
+
+    def write_report(
+        self,
+        textfile_path: Optional[str] = None,
+        json_path: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ):
+        """Write the Prometheus textfile and/or JSON run report, each atomically."""
+        if textfile_path:
+            _write_atomic(textfile_path, self.to_prometheus())
+        if json_path:
+            report = {"generated_at": time.time(), **(extra or {}), **self.to_dict()}
+            _write_atomic(json_path, json.dumps(report, indent=2))
+
+
+def _write_atomic(path: str, content: str):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+metrics = MetricsRegistry()
+
+STAGE_DURATION = metrics.histogram(
+    "digest_stage_duration_seconds", "Time spent by a pipeline stage on one story."
+)
+# Stages overlap, so a stage's peak includes the memory held by the others at that moment
+STAGE_PEAK_RSS = metrics.gauge(
+    "digest_stage_peak_rss_bytes",
+    "Highest resident set size of the process while a pipeline stage was processing an item.",
+)
+STAGE_ITEMS = metrics.counter(
+    "digest_stage_items_total", "Stories handled by a pipeline stage, by outcome."
+)
+HTTP_REQUESTS = metrics.counter(
+    "digest_http_requests_total", "HTTP GET requests, by host and status."
+)
+HTTP_REQUEST_DURATION = metrics.histogram(
+    "digest_http_request_duration_seconds", "HTTP GET latency by host."
+)
+HTTP_BYTES = metrics.counter(
+    "digest_http_bytes_downloaded_total", "Response body bytes downloaded, by host."
+)
+HN_ITEMS = metrics.counter(
+    "digest_hn_items_fetched_total", "Hacker News items fetched, by kind."
+)
+NEAR_DUPLICATES = metrics.counter(
+    "digest_near_duplicates_total", "Stories that reused the summary of a near-duplicate article."
+)
+EXTRACTION_DURATION = metrics.histogram(
+    "digest_extraction_duration_seconds", "Article extraction time, including executor queueing, by tier."
+)
+EXTRACTIONS = metrics.counter(
+    "digest_extractions_total", "Article extractions, by outcome and extraction tier."
+)
+LLM_REQUEST_DURATION = metrics.histogram(
+    "digest_llm_request_duration_seconds", "LLM completion latency by model."
+)
+LLM_FIRST_TOKEN = metrics.histogram(
+    "digest_llm_first_token_seconds", "Time to the first streamed LLM token by model."
+)
+LLM_HEDGES = metrics.counter(
+    "digest_llm_hedges_total", "Hedged LLM requests, by model and outcome."
+)
+LLM_REQUESTS = metrics.counter(
+    "digest_llm_requests_total", "LLM completions, by model and outcome."
+)
+LLM_TOKENS = metrics.counter(
+    "digest_llm_tokens_total", "LLM tokens reported by the API usage field, by model and kind."
+)
+LLM_COST = metrics.counter(
+    "digest_llm_cost_usd_total", "Estimated LLM spend in USD, by model."
+)
+LLM_CONCURRENCY_LIMIT = metrics.gauge(
+    "digest_llm_concurrency_limit", "Current adaptive limit on in-flight LLM requests."
+)
+LLM_IN_FLIGHT = metrics.gauge(
+    "digest_llm_in_flight", "LLM requests currently in flight."
+)
+LLM_QUEUE_DEPTH = metrics.gauge(
+    "digest_llm_queue_depth", "LLM requests waiting for a concurrency slot."
+)
+LLM_ROUTES = metrics.counter(
+    "digest_llm_routes_total", "LLM model routing decisions, by task, model and reason."
+)
+NOTION_REQUEST_DURATION = metrics.histogram(
+    "digest_notion_request_duration_seconds", "Notion API latency by endpoint."
+)
+NOTION_REQUESTS = metrics.counter(
+    "digest_notion_requests_total", "Notion API calls, by endpoint and outcome."
+)
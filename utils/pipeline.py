@@ -0,0 +1,102 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+from utils.logger import get_logger
+from utils.metrics import STAGE_DURATION, STAGE_ITEMS, STAGE_PEAK_RSS, current_rss_bytes
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Stage:
+    """A single pipeline stage: an async handler run by `concurrency` workers.
+
+    The handler receives one item and returns the item for the next stage,
+    or None to drop it from the pipeline.
+    """
+    name: str
+    handler: Callable[[Any], Awaitable[Optional[Any]]]
+    concurrency: int = 1
+
+
+class Pipeline:
+    """Runs items through a chain of stages connected by bounded asyncio queues.
+
+    Every stage has its own queue and worker pool, so items overlap across
+    stages and a slow item only occupies one worker of one stage.
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: Optional[int] = None):
+        if not stages:
+            raise ValueError("Pipeline requires at least one stage.")
+        self.stages = stages
+        self.queue_size = queue_size
+
+    async def run(self, items: Iterable[Any]) -> List[Any]:
+        """Feed items through all stages and return the output of the last stage."""
+        queues = [
+            asyncio.Queue(maxsize=self.queue_size or 2 * stage.concurrency)
+            for stage in self.stages
+        ]
+        results: List[Any] = []
+        workers: List[List[asyncio.Task]] = []
+        for index, stage in enumerate(self.stages):
+            next_queue = queues[index + 1] if index + 1 < len(queues) else None
+            workers.append([
+                asyncio.create_task(self._worker(stage, queues[index], next_queue, results))
+                for _ in range(max(1, stage.concurrency))
+            ])
+
+        try:
+            for item in items:
+                await queues[0].put(item)
+            # Drain stage by stage: once a stage's queue is joined, everything it
+            # produced has already been handed to the next queue.
+            for index, queue in enumerate(queues):
+                await queue.join()
+                for task in workers[index]:
+                    task.cancel()
+                await asyncio.gather(*workers[index], return_exceptions=True)
+        finally:
+            for stage_workers in workers:
+                for task in stage_workers:
+                    task.cancel()
+        return results
+
+    @staticmethod
+    def _sample_rss(stage: Stage):
+        """Raise the stage's peak RSS to the current process RSS; sampled as a worker starts and finishes an item."""
+        rss = current_rss_bytes()
+        if rss is not None:
+            STAGE_PEAK_RSS.set_max(rss, stage=stage.name)
+
+    @staticmethod
+    async def _worker(
+        stage: Stage,
+        queue: asyncio.Queue,
+        next_queue: Optional[asyncio.Queue],
+        results: List[Any],
+    ):
+        """Consume items from a stage queue until cancelled."""
+        while True:
+            item = await queue.get()
+            start = time.perf_counter()
+            try:
+                Pipeline._sample_rss(stage)
+                output = await stage.handler(item)
+                STAGE_DURATION.observe(time.perf_counter() - start, stage=stage.name)
+                Pipeline._sample_rss(stage)
+                STAGE_ITEMS.inc(stage=stage.name, outcome="passed" if output is not None else "dropped")
+                if output is None:
+                    continue
+                if next_queue is not None:
+                    await next_queue.put(output)
+                else:
+                    results.append(output)
+            except Exception as e:
+                STAGE_ITEMS.inc(stage=stage.name, outcome="error")
+                logger.error(f"Stage '{stage.name}' failed on item: {e}", exc_info=True)
+            finally:
+                queue.task_done()
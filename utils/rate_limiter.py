@@ -0,0 +1,101 @@
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given either in seconds or as a HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+class TokenBucket:
+    """Async token bucket: allows `rate` acquisitions per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        while True:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """Stops sending requests to a failing host for a while.
+
+    After `failure_threshold` consecutive failures the circuit opens and all
+    requests are rejected. Once `reset_timeout` seconds have passed a single
+    trial request is let through (half-open); its outcome closes or re-opens
+    the circuit.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def allow_request(self) -> bool:
+        if self._opened_at is None:
+            return True
+        if self._trial_in_flight or time.monotonic() - self._opened_at < self.reset_timeout:
+            return False
+        self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        if self._opened_at is not None:
+            logger.info(f"Circuit for {self.name} closed again.")
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def release_trial(self):
+        """Give up a half-open trial that ended without an outcome (e.g. it was cancelled)."""
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self._failures += 1
+        if self._trial_in_flight or (self._opened_at is None and self._failures >= self.failure_threshold):
+            logger.warning(f"Circuit for {self.name} opened after {self._failures} consecutive failures.")
+            self._opened_at = time.monotonic()
+        self._trial_in_flight = False
@@ -0,0 +1,35 @@
+import importlib
+from typing import Any, Dict, List
+
+
+class LazyRegistry:
+    """Named subsystems that are only imported when first used.
+
+    Targets are "package.module:attribute" strings, so registering a
+    subsystem is free and commands that never touch it (dry runs, cache
+    inspection) never pay for importing its client library.
+    """
+
+    def __init__(self):
+        self._targets: Dict[str, str] = {}
+        self._loaded: Dict[str, Any] = {}
+
+    def register(self, name: str, target: str):
+        if ":" not in target:
+            raise ValueError(f"Target for '{name}' must look like 'package.module:attribute', got '{target}'.")
+        self._targets[name] = target
+
+    def load(self, name: str) -> Any:
+        """Import a subsystem on first use and return the registered attribute."""
+        if name not in self._loaded:
+            if name not in self._targets:
+                raise KeyError(f"Unknown subsystem '{name}'.")
+            module_name, attribute = self._targets[name].split(":", 1)
+            self._loaded[name] = getattr(importlib.import_module(module_name), attribute)
+        return self._loaded[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def loaded(self) -> List[str]:
+        return list(self._loaded)
@@ -0,0 +1,186 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """A claimed job: its payload and how many times it has been claimed so far."""
+    job_id: int
+    key: str
+    payload: Dict[str, Any]
+    attempts: int
+
+
+class WorkQueue:
+    """Durable job queue in a SQLite file, shared by worker processes.
+
+    Claiming a job leases it for `visibility_timeout` seconds; a job whose
+    lease expires (its worker crashed or hung) becomes claimable again, up
+    to `max_attempts` claims in total. Claims run in `BEGIN IMMEDIATE`
+    transactions, so processes on several hosts can share the file as long
+    as its file system provides working locks. WAL is deliberately not used,
+    as it does not work over network file systems.
+    """
+
+    def __init__(self, path: str, visibility_timeout: float, max_attempts: int):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_key TEXT NOT NULL UNIQUE,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                lease_owner TEXT,
+                lease_expires_at REAL,
+                last_error TEXT,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, job_id);
+            """
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def enqueue(self, jobs: Dict[str, Dict[str, Any]]) -> int:
+        """Add jobs by key and return how many were queued.
+
+        Finished or failed jobs with the same key are queued again; jobs that
+        are still pending or leased are left alone.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                f"""
+                INSERT INTO jobs (job_key, payload, status, updated_at) VALUES (?, ?, '{PENDING}', ?)
+                ON CONFLICT (job_key) DO UPDATE SET
+                    payload = excluded.payload, status = '{PENDING}', attempts = 0,
+                    lease_owner = NULL, lease_expires_at = NULL, last_error = NULL, updated_at = excluded.updated_at
+                WHERE jobs.status IN ('{DONE}', '{FAILED}')
+                """,
+                [(key, json.dumps(payload), now) for key, payload in jobs.items()],
+            )
+            return conn.total_changes - before
+
+    def claim(self, owner: str) -> Optional[Job]:
+        """Lease the oldest claimable job to `owner`, or return None if there is none."""
+        now = time.time()
+        with self._transaction() as conn:
+            # Expired leases of jobs that are out of attempts are not retried again
+            conn.execute(
+                f"""
+                UPDATE jobs SET status = '{FAILED}', lease_owner = NULL,
+                    last_error = COALESCE(last_error, 'lease expired'), updated_at = ?
+                WHERE status = '{LEASED}' AND lease_expires_at < ? AND attempts >= ?
+                """,
+                (now, now, self.max_attempts),
+            )
+            row = conn.execute(
+                f"""
+                SELECT job_id, job_key, payload, attempts FROM jobs
+                WHERE status = '{PENDING}' OR (status = '{LEASED}' AND lease_expires_at < ?)
+                ORDER BY job_id LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            job_id, key, payload, attempts = row
+            if attempts:
+                logger.info(f"Retrying job {key} (attempt {attempts + 1} of {self.max_attempts}).")
+            conn.execute(
+                f"""
+                UPDATE jobs SET status = '{LEASED}', lease_owner = ?, lease_expires_at = ?,
+                    attempts = attempts + 1, updated_at = ?
+                WHERE job_id = ?
+                """,
+                (owner, now + self.visibility_timeout, now, job_id),
+            )
+        return Job(job_id=job_id, key=key, payload=json.loads(payload), attempts=attempts + 1)
+
+    def renew(self, job: Job, owner: str) -> bool:
+        """Extend the lease of a job that is still being worked on; False if the lease was lost."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET lease_expires_at = ?, updated_at = ? "
+                f"WHERE job_id = ? AND lease_owner = ? AND status = '{LEASED}'",
+                (now + self.visibility_timeout, now, job.job_id, owner),
+            )
+        return cursor.rowcount > 0
+
+    def complete(self, job: Job, owner: str) -> bool:
+        """Mark a job as done; False if its lease had expired and another worker took it."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE jobs SET status = '{DONE}', lease_owner = NULL, lease_expires_at = NULL, updated_at = ? "
+                f"WHERE job_id = ? AND lease_owner = ? AND status = '{LEASED}'",
+                (time.time(), job.job_id, owner),
+            )
+        if not cursor.rowcount:
+            logger.warning(f"Lease of job {job.key} was lost before it completed.")
+        return cursor.rowcount > 0
+
+    def fail(self, job: Job, owner: str, error: str) -> bool:
+        """Release a failed job for a retry, or mark it failed once it is out of attempts."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"""
+                UPDATE jobs SET
+                    status = CASE WHEN attempts >= ? THEN '{FAILED}' ELSE '{PENDING}' END,
+                    lease_owner = NULL, lease_expires_at = NULL, last_error = ?, updated_at = ?
+                WHERE job_id = ? AND lease_owner = ? AND status = '{LEASED}'
+                """,
+                (self.max_attempts, error, time.time(), job.job_id, owner),
+            )
+        return cursor.rowcount > 0
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: 0 for status in (PENDING, LEASED, DONE, FAILED)} | dict(rows)
+
+    def has_unfinished(self) -> bool:
+        """Whether any job is still pending or leased."""
+        counts = self.counts()
+        return counts[PENDING] + counts[LEASED] > 0
+
+    def describe(self) -> Dict[str, Any]:
+        """Job counts by status, for inspection."""
+        return self.counts()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()